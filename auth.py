@@ -3,13 +3,17 @@ Authentication system with JWT and IP whitelist
 """
 
 from pydantic import BaseModel
-from database.client import MySQLService
+from database.client import AsyncMySQLService
 from database.entities.api_db_entities import TokenRequest, AuthResponse
 
 class AuthController(BaseModel):
+    service: AsyncMySQLService # by default we are using mysql service
 
-    @staticmethod
-    def authenticate_client(token_request: TokenRequest) -> AuthResponse:
-        """Authenticate client with credentials"""
-        service = MySQLService() # by default we are using mysql service
-        return service.auth_user(token_request.api_user)
+    class Config:
+        arbitrary_types_allowed = True
+
+    async def authenticate_client_async(self, token_request: TokenRequest) -> AuthResponse:
+        """Authenticate client with credentials or an API key without blocking the event loop"""
+        if token_request.api_key is not None:
+            return await self.service.auth_api_key(token_request.api_key)
+        return await self.service.auth_user(token_request.api_user)
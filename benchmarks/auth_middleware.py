@@ -0,0 +1,105 @@
+"""
+Throughput of the auth gate: the former @app.middleware("http") hook (BaseHTTPMiddleware) against AuthMiddleware
+Requests are driven straight through the ASGI interface, without sockets, so only the middleware cost is measured
+
+    python benchmarks/auth_middleware.py [requests]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jwt
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+from middleware.allowlist import IPAllowlist, client_ip
+from middleware.auth import AuthMiddleware, TokenVerifier
+
+SECRET_KEY = "benchmark-secret-key-of-32-bytes-ok"
+PUBLIC_PATHS = ["/auth", "/docs", "/redoc", "/openapi.json", "/health"]
+TOKEN = jwt.encode({"username": "benchmark"}, SECRET_KEY, algorithm="HS256")
+
+
+async def endpoint(request: Request):
+    return PlainTextResponse("ok")
+
+
+async def legacy_auth(request: Request, call_next):
+    """The hook as it was in main.py"""
+    if any(request.url.path.startswith(path) for path in PUBLIC_PATHS):
+        return await call_next(request)
+    state = request.app.state
+    host = client_ip(request.client.host if request.client else None, request.headers.get("x-forwarded-for"), state.trusted_proxies)
+    if host in state.white_list_ips:
+        return await call_next(request)
+    if state.token_verifier.verify(request.headers.get("authorization")):
+        return await call_next(request)
+    return JSONResponse({"detail": "Invalid token"}, status_code=401)
+
+
+def build_app(legacy: bool) -> Starlette:
+    app = Starlette(routes=[Route("/items", endpoint), Route("/health", endpoint)])
+    if legacy:
+        app.add_middleware(BaseHTTPMiddleware, dispatch=legacy_auth)
+    else:
+        app.add_middleware(AuthMiddleware, public_paths=PUBLIC_PATHS)
+    app.state.white_list_ips = IPAllowlist(["127.0.0.1", "10.0.0.0/8"])
+    app.state.trusted_proxies = IPAllowlist([])
+    app.state.token_verifier = TokenVerifier(SECRET_KEY)
+    return app
+
+
+async def run(app: Starlette, path: str, headers: list, requests: int) -> float:
+    def request_receive():
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # The client never disconnects, Starlette stops listening once the response is sent
+            await asyncio.Event().wait()
+
+        return receive
+
+    async def send(message):
+        pass
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": headers, "client": ("203.0.113.7", 50000), "server": ("localhost", 8000),
+    }
+    # Warm up the middleware stack and the token cache
+    for _ in range(100):
+        await app(dict(scope), request_receive(), send)
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), request_receive(), send)
+    return requests / (time.perf_counter() - started)
+
+
+async def main(requests: int):
+    cases = [
+        ("valid token", "/items", [(b"authorization", f"Bearer {TOKEN}".encode())]),
+        ("public path", "/health", []),
+        ("rejected", "/items", [(b"authorization", b"Bearer invalid")]),
+    ]
+    print(f"{'case':<14}{'before (req/s)':>16}{'after (req/s)':>16}{'speedup':>10}")
+    for name, path, headers in cases:
+        before = await run(build_app(legacy=True), path, headers, requests)
+        after = await run(build_app(legacy=False), path, headers, requests)
+        print(f"{name:<14}{before:>16,.0f}{after:>16,.0f}{after / before:>9.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
@@ -0,0 +1,150 @@
+"""
+API keys for machine clients
+Only the SHA-256 digest of a key is stored (keys are 256 random bits, so a fast hash is enough where passwords
+need bcrypt); a key is looked up by its digest through a unique index and then compared in constant time.
+Keys that authenticated are remembered by digest in ApiKeyCache, dropped as soon as the api_keys table is written.
+The cache also keeps the ids of revoked keys, reloaded on every such write and every reload_interval seconds, so
+TokenVerifier can reject the tokens already issued for a key without a database round trip. The periodic reload
+covers revocations the invalidation bus does not deliver: the process backend only reaches its own process, so a
+revocation made from the command line or with a manual UPDATE is picked up within reload_interval
+"""
+
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, FrozenSet, Iterable, Optional, Tuple
+
+from database.entities.api_db_entities import ApiKeyInDB
+
+API_KEY_TABLE = "api_keys"
+API_KEY_PREFIX = "pk_"
+# Characters kept in clear (key_prefix column) to tell keys apart in listings and logs
+PREFIX_LENGTH = 10
+
+
+def hash_api_key(api_key: str) -> str:
+    """Hex SHA-256 digest stored in api_keys.key_hash"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+def generate_api_key() -> Tuple[str, str, str]:
+    """A new random key with its clear prefix and digest, the key itself is shown once and never stored"""
+    api_key = API_KEY_PREFIX + secrets.token_urlsafe(32)
+    return api_key, api_key[:PREFIX_LENGTH], hash_api_key(api_key)
+
+
+class ApiKeyCache:
+    """
+    Thread-safe, size-bounded LRU of valid keys by digest, emptied whenever a key is revoked
+    load_revoked returns the ids of the revoked keys; it is called from write listeners, the invalidation bus
+    thread and the reload thread, never from the event loop
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0, load_revoked: Optional[Callable[[], Iterable[int]]] = None, reload_interval: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.load_revoked = load_revoked
+        self.reload_interval = reload_interval
+        self._revoked: FrozenSet[int] = frozenset()
+        # Reloads run one at a time, so an older read never replaces a newer one
+        self._reload_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._entries: "OrderedDict[str, Tuple[ApiKeyInDB, float]]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def generation(self) -> int:
+        """Write generation of api_keys, read before the lookup so a key revoked meanwhile is not stored"""
+        with self._lock:
+            return self._generation
+
+    def get(self, key_hash: str) -> Optional[ApiKeyInDB]:
+        with self._lock:
+            entry = self._entries.get(key_hash)
+            if entry is None:
+                self._misses += 1
+                return None
+            api_key, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key_hash]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key_hash)
+            self._hits += 1
+            return api_key
+
+    def set(self, key_hash: str, api_key: ApiKeyInDB, generation: int):
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key_hash] = (api_key, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def is_revoked(self, key_id: int) -> bool:
+        """Whether the key was revoked, as of the last reload; a set lookup, safe on the event loop"""
+        return key_id in self._revoked
+
+    def refresh_revoked(self):
+        """Reload the revoked ids, keeping the previous ones when the database cannot be read"""
+        if self.load_revoked is None:
+            return
+        with self._reload_lock:
+            try:
+                revoked = frozenset(self.load_revoked())
+            except Exception:
+                return
+            added = revoked - self._revoked
+            self._revoked = revoked
+        if added:
+            # Revoked without a write seen here: drop the cached keys, and the lookups in flight, like invalidate
+            with self._lock:
+                self._generation += 1
+                for key_hash in [key_hash for key_hash, (api_key, _) in self._entries.items() if api_key.id in added]:
+                    del self._entries[key_hash]
+
+    def start(self):
+        """Reload the revoked ids every reload_interval seconds in a daemon thread, 0 disables it"""
+        if self._thread is None and self.load_revoked is not None and self.reload_interval > 0:
+            self._thread = threading.Thread(target=self._run, name="api-key-revocations", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._closed.wait(self.reload_interval):
+            self.refresh_revoked()
+
+    def close(self):
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    def invalidate(self, tables: Iterable[str]):
+        """MySQLService write listener: a write to api_keys (a revocation) drops every cached key"""
+        if API_KEY_TABLE not in tables:
+            return
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._invalidations += 1
+        self.refresh_revoked()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self._invalidations,
+                "revoked": len(self._revoked),
+            }
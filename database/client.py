@@ -1,19 +1,35 @@
 from pydantic import BaseModel
 from abc import ABC, abstractmethod
-from typing import Any, Optional, Dict, List
+from typing import Any, Callable, Optional, Dict, FrozenSet, List, Sequence, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
+import hmac
 import pymysql
 import pymysql.cursors
-from database.entities.api_db_entities import FindUserResponse, ApiUser, UserInDB, AuthResponse
+from database.entities.api_db_entities import FindUserResponse, ApiUser, UserInDB, AuthResponse, ApiKeyInDB, FindApiKeyResponse
 from database.entities.base_entity import BaseEntity
-from decouple import config
-from database.utils.password import verify_password
-from database.utils.utils import generate_token_for_api_user
+from database.utils.password import PasswordPool
+from database.utils.utils import generate_token_for_api_user, generate_token_for_api_key
+from database.api_keys import API_KEY_TABLE, ApiKeyCache, generate_api_key, hash_api_key
+from database.utils.pagination import encode_cursor
+from database.entities.sorting import format_sort
+from database.pool import MySQLConnectionPool
+from database.portfolio import load_portfolio
+from database.expand import expand_rows, required_fields
+from database.versions import get_versions_query
+from database.invalidation import InvalidationBus
+from database.count_cache import CountCache, TotalMode
+from database.relations import affected_tables
+from database.settings import DatabaseSettings
 
 
 # Connections
 
 class Connection(ABC, BaseModel):
     config: dict
+    pool: Optional[Any] = None
+    count_cache: Optional[Any] = None
 
     class Config:
         arbitrary_types_allowed = True
@@ -30,21 +46,61 @@ class Connection(ABC, BaseModel):
     def find_user(self, user: ApiUser) -> FindUserResponse:
         pass
 
+    @abstractmethod
+    def find_api_key(self, key_hash: str) -> FindApiKeyResponse:
+        """Find an active API key by the digest of the key"""
+        pass
+
+    @abstractmethod
+    def create_api_key(self, name: str, key_prefix: str, key_hash: str) -> dict:
+        """Store the digest of a new API key"""
+        pass
+
+    @abstractmethod
+    def revoke_api_key(self, key_id: int) -> dict:
+        """Deactivate an API key"""
+        pass
+
+    @abstractmethod
+    def find_revoked_api_keys(self) -> dict:
+        """Find the ids of the revoked API keys"""
+        pass
+
     @abstractmethod
     def create_entity(self, entity: BaseEntity) -> dict:
         """Create a new entity in the database"""
         pass
 
     @abstractmethod
-    def find_entities(self, entity_class: type[BaseEntity], filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 10) -> dict:
-        """Find entities with optional filters and pagination"""
+    def find_entities(self, entity_class: type[BaseEntity], filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 10, after: Optional[Any] = None, total_mode: TotalMode = TotalMode.EXACT, fields: Optional[Sequence[str]] = None, sort: Optional[str] = None, expand: Optional[Sequence[str]] = None) -> dict:
+        """Find entities with optional filters and offset or keyset (after) pagination"""
         pass
 
     @abstractmethod
-    def find_entity_by_id(self, entity_class: type[BaseEntity], entity_id: int) -> dict:
+    def find_entity_by_id(self, entity_class: type[BaseEntity], entity_id: int, fields: Optional[Sequence[str]] = None) -> dict:
         """Find a single entity by ID"""
         pass
 
+    @abstractmethod
+    def find_entities_by_ids(self, entity_class: type[BaseEntity], entity_ids: Sequence[int], fields: Optional[Sequence[str]] = None, expand: Optional[Sequence[str]] = None) -> dict:
+        """Find several entities by ID in one query, keyed by id"""
+        pass
+
+    @abstractmethod
+    def find_portfolio(self) -> dict:
+        """Find the full nested portfolio"""
+        pass
+
+    @abstractmethod
+    def find_table_versions(self, tables: Sequence[str]) -> dict:
+        """Find the row count, highest id, newest row timestamp and write counter of each table"""
+        pass
+
+    @abstractmethod
+    def bump_table_versions(self, tables: Sequence[str]) -> dict:
+        """Increment the write counter of each table"""
+        pass
+
     @abstractmethod
     def update_entity(self, entity: BaseEntity, entity_id: int) -> dict:
         """Update an existing entity"""
@@ -56,6 +112,7 @@ class Connection(ABC, BaseModel):
         pass
 
     def __enter__(self):
+        # With a pool, connect/disconnect borrow and return a pooled connection
         self.connect()
         return self
 
@@ -67,6 +124,9 @@ class MySQLConnection(Connection):
     _connection: Any = None
 
     def connect(self):
+        if self.pool is not None:
+            self._connection = self.pool.acquire()
+            return
         self._connection = pymysql.connect(
             host=self.config.get('HOST'),
             port=int(self.config.get('DB_PORT')),
@@ -77,8 +137,13 @@ class MySQLConnection(Connection):
         )
 
     def disconnect(self):
-        if self._connection:
+        if not self._connection:
+            return
+        if self.pool is not None:
+            self.pool.release(self._connection)
+        else:
             self._connection.close()
+        self._connection = None
 
     def find_user(self, api_user: ApiUser) -> FindUserResponse:
         try:
@@ -96,6 +161,57 @@ class MySQLConnection(Connection):
         except Exception as e:
             return FindUserResponse(success=False, user=None, message=f"There was an error querying the database, looking for user {api_user.username}: {str(e)}")
 
+    def find_api_key(self, key_hash: str) -> FindApiKeyResponse:
+        try:
+            with self._connection.cursor() as cursor:
+                # uk_key_hash turns this into a single index lookup
+                query = "SELECT id, name, key_prefix, key_hash FROM api_keys WHERE key_hash = %s AND is_active = TRUE"
+                cursor.execute(query, (key_hash,))
+                result = cursor.fetchone()
+                # The index compares like any string, the final check does not leak how much of the digest matched
+                if result is None or not hmac.compare_digest(result.get('key_hash'), key_hash):
+                    return FindApiKeyResponse(success=True, api_key=None, message="No API key found")
+                api_key = ApiKeyInDB(
+                    id=result.get('id'),
+                    name=result.get('name'),
+                    key_prefix=result.get('key_prefix')
+                )
+                return FindApiKeyResponse(success=True, api_key=api_key, message="API key found")
+        except Exception as e:
+            return FindApiKeyResponse(success=False, api_key=None, message=f"There was an error querying the database, looking for an API key: {str(e)}")
+
+    def create_api_key(self, name: str, key_prefix: str, key_hash: str) -> dict:
+        try:
+            with self._connection.cursor() as cursor:
+                query = "INSERT INTO api_keys (name, key_prefix, key_hash) VALUES (%s, %s, %s)"
+                cursor.execute(query, (name, key_prefix, key_hash))
+                self._connection.commit()
+                return {"success": True, "id": cursor.lastrowid, "message": "API key created successfully"}
+        except Exception as e:
+            self._connection.rollback()
+            return {"success": False, "message": f"Error creating API key: {str(e)}"}
+
+    def revoke_api_key(self, key_id: int) -> dict:
+        try:
+            with self._connection.cursor() as cursor:
+                query = "UPDATE api_keys SET is_active = FALSE, revoked_at = CURRENT_TIMESTAMP WHERE id = %s AND is_active = TRUE"
+                cursor.execute(query, (key_id,))
+                self._connection.commit()
+                if cursor.rowcount == 0:
+                    return {"success": False, "message": f"No active API key with id {key_id}"}
+                return {"success": True, "message": "API key revoked successfully"}
+        except Exception as e:
+            self._connection.rollback()
+            return {"success": False, "message": f"Error revoking API key: {str(e)}"}
+
+    def find_revoked_api_keys(self) -> dict:
+        try:
+            with self._connection.cursor() as cursor:
+                cursor.execute("SELECT id FROM api_keys WHERE is_active = FALSE")
+                return {"success": True, "data": [row["id"] for row in cursor.fetchall()]}
+        except Exception as e:
+            return {"success": False, "message": f"Error fetching revoked API keys: {str(e)}"}
+
     # ============== Generic Entity CRUD Methods ==============
 
     def create_entity(self, entity: BaseEntity) -> dict:
@@ -110,35 +226,136 @@ class MySQLConnection(Connection):
             self._connection.rollback()
             return {"success": False, "message": f"Error creating entity: {str(e)}"}
 
-    def find_entities(self, entity_class: type[BaseEntity], filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 10) -> dict:
+    def find_entities(self, entity_class: type[BaseEntity], filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 10, after: Optional[Any] = None, total_mode: TotalMode = TotalMode.EXACT, fields: Optional[Sequence[str]] = None, sort: Optional[str] = None, expand: Optional[Sequence[str]] = None) -> dict:
         """Find entities using the entity class's get_select_query method"""
         try:
             with self._connection.cursor() as cursor:
                 # Get query from entity class
-                query, params = entity_class.get_select_query(filters=filters, skip=skip, limit=limit)
+                table_name = entity_class.get_table_name()
+                if fields and expand:
+                    fields = tuple(dict.fromkeys([*fields, *required_fields(table_name, expand)]))
+                query, params = entity_class.get_select_query(filters=filters, skip=skip, limit=limit, after=after, fields=fields, sort=sort)
                 cursor.execute(query, params)
-                results = cursor.fetchall()
-
-                # Get count
-                count_query, count_params = entity_class.get_count_query(filters=filters)
-                cursor.execute(count_query, count_params)
-                total = cursor.fetchone()['total']
-
-                return {"success": True, "data": results, "total": total}
+                results = list(cursor.fetchall())
+                if expand and results:
+                    expand_rows(cursor, table_name, results, expand)
+
+                response = {"success": True, "data": results, "total": None}
+                if total_mode != TotalMode.NONE:
+                    response["total"], estimated = self.count_entities(cursor, entity_class, filters, total_mode)
+                    if estimated:
+                        response["total_estimated"] = True
+                if after is not None:
+                    # A full page means there may be more rows after the last one
+                    response["next_cursor"] = self.next_cursor(entity_class, results[-1], sort) if len(results) == limit else None
+                return response
         except Exception as e:
             return {"success": False, "message": f"Error fetching entities: {str(e)}"}
 
-    def find_entity_by_id(self, entity_class: type[BaseEntity], entity_id: int) -> dict:
+    def next_cursor(self, entity_class: type[BaseEntity], row: dict, sort: Optional[str]) -> str:
+        """Cursor resuming after row, carrying the sort it was issued for"""
+        order = entity_class.get_sort_keys(sort)
+        position = [row[key.field] for key in order]
+        return encode_cursor(position, format_sort(order) if sort else None)
+
+    def count_entities(self, cursor: Any, entity_class: type[BaseEntity], filters: Optional[Dict[str, Any]], total_mode: TotalMode) -> Tuple[Optional[int], bool]:
+        """
+        Count the rows matching filters, served from the count cache when possible
+        Returns: (total, estimated)
+        """
+        has_filters = any(value is not None for value in (filters or {}).values())
+        estimated = total_mode == TotalMode.ESTIMATE and not has_filters
+        if estimated:
+            query, params = entity_class.get_estimated_count_query()
+        else:
+            query, params = entity_class.get_count_query(filters=filters)
+
+        table_name = entity_class.get_table_name()
+        cache_key = (query, params)
+        if self.count_cache is not None:
+            total = self.count_cache.get(table_name, cache_key)
+            if total is not None:
+                return (total, estimated)
+            generation = self.count_cache.generation(table_name)
+
+        cursor.execute(query, params)
+        row = cursor.fetchone()
+        total = row['total'] if row else None
+        if total is None and estimated:
+            # Statistics are not available for this table yet
+            return self.count_entities(cursor, entity_class, filters, TotalMode.EXACT)
+
+        if self.count_cache is not None:
+            self.count_cache.set(table_name, cache_key, int(total), generation)
+        return (int(total), estimated)
+
+    def find_entity_by_id(self, entity_class: type[BaseEntity], entity_id: int, fields: Optional[Sequence[str]] = None) -> dict:
         """Find a single entity by ID using the entity class's get_select_by_id_query method"""
         try:
             with self._connection.cursor() as cursor:
-                query, params = entity_class.get_select_by_id_query(entity_id)
+                query, params = entity_class.get_select_by_id_query(entity_id, fields)
                 cursor.execute(query, params)
                 result = cursor.fetchone()
                 return {"success": True, "data": result}
         except Exception as e:
             return {"success": False, "message": f"Error fetching entity: {str(e)}"}
 
+    def find_entities_by_ids(self, entity_class: type[BaseEntity], entity_ids: Sequence[int], fields: Optional[Sequence[str]] = None, expand: Optional[Sequence[str]] = None) -> dict:
+        """Find several entities by ID with a single WHERE id IN (...) query"""
+        try:
+            with self._connection.cursor() as cursor:
+                table_name = entity_class.get_table_name()
+                if fields and expand:
+                    fields = tuple(dict.fromkeys([*fields, *required_fields(table_name, expand)]))
+                query, params = entity_class.get_select_by_ids_query(entity_ids, fields)
+                cursor.execute(query, params)
+                results = list(cursor.fetchall())
+                if expand and results:
+                    expand_rows(cursor, table_name, results, expand)
+                rows = {row["id"]: row for row in results}
+                return {
+                    "success": True,
+                    "data": rows,
+                    "missing": [entity_id for entity_id in dict.fromkeys(entity_ids) if entity_id not in rows]
+                }
+        except Exception as e:
+            return {"success": False, "message": f"Error fetching entities: {str(e)}"}
+
+    def find_portfolio(self) -> dict:
+        """Find the full nested portfolio with one query per collection"""
+        try:
+            with self._connection.cursor() as cursor:
+                return {"success": True, "data": load_portfolio(cursor)}
+        except Exception as e:
+            return {"success": False, "message": f"Error fetching portfolio: {str(e)}"}
+
+    def find_table_versions(self, tables: Sequence[str]) -> dict:
+        """Find the row count, highest id, newest row timestamp and write counter of each table in one UNION ALL query"""
+        try:
+            with self._connection.cursor() as cursor:
+                cursor.execute(get_versions_query(tables))
+                return {
+                    "success": True,
+                    "data": {
+                        row["table_name"]: (int(row["total"]), row["max_id"], row["changed_at"], int(row["version"]))
+                        for row in cursor.fetchall()
+                    }
+                }
+        except Exception as e:
+            return {"success": False, "message": f"Error fetching table versions: {str(e)}"}
+
+    def bump_table_versions(self, tables: Sequence[str]) -> dict:
+        """Increment the write counter of each table, tables without a counter row are skipped"""
+        try:
+            with self._connection.cursor() as cursor:
+                placeholders = ", ".join(["%s"] * len(tables))
+                cursor.execute(f"UPDATE table_versions SET version = version + 1 WHERE table_name IN ({placeholders})", tuple(tables))
+                self._connection.commit()
+                return {"success": True}
+        except Exception as e:
+            self._connection.rollback()
+            return {"success": False, "message": f"Error bumping table versions: {str(e)}"}
+
     def update_entity(self, entity: BaseEntity, entity_id: int) -> dict:
         """Update an entity using its get_update_query method"""
         try:
@@ -168,6 +385,50 @@ class MySQLConnection(Connection):
 
 # Services
 
+def auth_response(api_user: ApiUser, find_user_response: FindUserResponse, is_valid_password: bool) -> AuthResponse:
+    """AuthResponse for a user lookup and the result of its password check"""
+    if not isinstance(find_user_response.user, UserInDB):
+        return AuthResponse(
+            success=False,
+            message=find_user_response.message,
+            token=None
+        )
+
+    if not is_valid_password:
+        return AuthResponse(
+            success=False,
+            message=f"The password provided is not correct",
+            token=None
+        )
+
+    token = generate_token_for_api_user(api_user=api_user)
+
+    return AuthResponse(
+        success=True,
+        message="User authenticated successfully",
+        token=token
+    )
+
+
+def api_key_response(find_api_key_response: FindApiKeyResponse) -> AuthResponse:
+    """AuthResponse for an API key lookup"""
+    if not isinstance(find_api_key_response.api_key, ApiKeyInDB):
+        message = find_api_key_response.message if not find_api_key_response.success else "The API key provided is not valid"
+        return AuthResponse(
+            success=False,
+            message=message,
+            token=None
+        )
+
+    token = generate_token_for_api_key(api_key=find_api_key_response.api_key)
+
+    return AuthResponse(
+        success=True,
+        message="API key authenticated successfully",
+        token=token
+    )
+
+
 class DBService(ABC):
     config: dict
 
@@ -183,79 +444,285 @@ class DBService(ABC):
         pass
 
     @abstractmethod
-    def auth_user(self, api_user: ApiUser):
+    def find_user(self, api_user: ApiUser) -> FindUserResponse:
+        pass
+
+    @abstractmethod
+    def find_api_key(self, api_key: str) -> FindApiKeyResponse:
         pass
 
 
 class MySQLService(DBService):
 
     def load_config(self):
-        self.config = {
-            "HOST": config("HOST"),
-            "DB_PORT": config("DB_PORT"),
-            "USERNAME": config("USERNAME"),
-            "PASSWORD": config("PASSWORD"),
-            "DATABASE": config("DATABASE"),
-        }
+        self.config = self.settings.to_config()
+
+    def create_pool(self, config: dict) -> MySQLConnectionPool:
+        return MySQLConnectionPool(
+            config,
+            min_size=config["POOL_MIN_SIZE"],
+            max_size=config["POOL_MAX_SIZE"],
+            idle_timeout=config["POOL_IDLE_TIMEOUT"],
+            max_lifetime=config["POOL_MAX_LIFETIME"],
+            ping_interval=config["POOL_PING_INTERVAL"],
+            checkout_timeout=config["POOL_CHECKOUT_TIMEOUT"],
+        )
 
-    def create_connection(self, config: dict):
-        return MySQLConnection(config=config)
+    def create_count_cache(self, config: dict) -> CountCache:
+        return CountCache(max_entries=config["COUNT_CACHE_SIZE"], ttl=config["COUNT_CACHE_TTL"])
 
-    def auth_user(self, api_user: ApiUser) -> AuthResponse:
+    def create_api_key_cache(self, config: dict) -> ApiKeyCache:
+        return ApiKeyCache(
+            max_entries=config["API_KEY_CACHE_SIZE"],
+            ttl=config["API_KEY_CACHE_TTL"],
+            load_revoked=self.find_revoked_api_key_ids,
+            reload_interval=config["API_KEY_REVOCATION_INTERVAL"],
+        )
+
+    def create_connection(self, config: dict):
+        return MySQLConnection(config=config, pool=self.pool, count_cache=self.count_cache)
+
+    def add_write_listener(self, listener: Callable[[FrozenSet[str]], None]):
+        """Register a callable notified with the affected tables after every successful write"""
+        self.write_listeners.append(listener)
+
+    def set_invalidation_bus(self, bus: InvalidationBus):
+        """Publish writes to bus and apply the writes other workers publish on it"""
+        self.invalidation_bus = bus
+        bus.subscribe(self.invalidate_tables)
+
+    def invalidate_tables(self, tables: FrozenSet[str]):
+        """Drop cached state of tables in this worker: count cache, API key cache and write listeners"""
+        self.count_cache.invalidate(tables)
+        self.api_key_cache.invalidate(tables)
+        for listener in self.write_listeners:
+            try:
+                listener(tables)
+            except Exception:
+                # The write is already committed, a failing listener must not turn it into an error
+                pass
+
+    def after_write(self, table_name: str):
+        """Drop cached state of the written table and of the tables its deletes cascade to, here and in the other workers"""
+        tables = affected_tables([table_name])
+        # Bumped before the caches are dropped, so the versions they read again already include it
         with self.create_connection(self.config) as connection:
-            find_user_response: FindUserResponse = connection.find_user(
-                api_user=api_user
-            )
-            if not isinstance(find_user_response.user, UserInDB):
-                return AuthResponse(
-                    success=False,
-                    message=find_user_response.message,
-                    token=None
-                )
+            # On failure the ETag still follows row counts, ids and timestamps, only same-second writes can be missed
+            connection.bump_table_versions(sorted(tables))
+        self.invalidate_tables(tables)
+        if self.invalidation_bus is not None:
+            try:
+                self.invalidation_bus.publish(tables)
+            except Exception:
+                # Other workers fall back to the TTLs of their caches
+                pass
+
+    def stats(self) -> dict:
+        """Counters of the connection pool and caches owned by this service"""
+        stats = {
+            "connection_pool": self.pool.stats(),
+            "count_cache": self.count_cache.stats(),
+            "api_key_cache": self.api_key_cache.stats(),
+        }
+        if self.invalidation_bus is not None:
+            stats["invalidation_bus"] = self.invalidation_bus.stats()
+        return stats
 
-            is_valid_password = verify_password(api_user.password, find_user_response.user.password)
+    def close(self):
+        """Close the invalidation bus, the revocation reload and the pooled connections owned by this service"""
+        if self.invalidation_bus is not None:
+            self.invalidation_bus.close()
+        self.api_key_cache.close()
+        self.pool.close()
 
-            if not is_valid_password:
-                return AuthResponse(
-                    success=False,
-                    message=f"The password provided is not correct",
-                    token=None
-                )
+    def find_user(self, api_user: ApiUser) -> FindUserResponse:
+        """Look the user up, without checking the password"""
+        with self.create_connection(self.config) as connection:
+            return connection.find_user(api_user=api_user)
+
+    def cached_api_key(self, api_key: str) -> Optional[FindApiKeyResponse]:
+        """The lookup of a key that already authenticated in this worker, None when it has to go to the database"""
+        cached = self.api_key_cache.get(hash_api_key(api_key))
+        if cached is None:
+            return None
+        return FindApiKeyResponse(success=True, api_key=cached, message="API key found")
+
+    def load_api_key(self, api_key: str) -> FindApiKeyResponse:
+        """Look an API key up in the database by its digest and cache it when it is valid"""
+        key_hash = hash_api_key(api_key)
+        generation = self.api_key_cache.generation()
+        with self.create_connection(self.config) as connection:
+            find_api_key_response = connection.find_api_key(key_hash)
+        if isinstance(find_api_key_response.api_key, ApiKeyInDB):
+            self.api_key_cache.set(key_hash, find_api_key_response.api_key, generation)
+        return find_api_key_response
 
-            token = generate_token_for_api_user(api_user=api_user)
+    def find_api_key(self, api_key: str) -> FindApiKeyResponse:
+        """Look an API key up, from the cache when it authenticated before"""
+        return self.cached_api_key(api_key) or self.load_api_key(api_key)
 
-            return AuthResponse(
-                success=True,
-                message="User authenticated successfully",
-                token=token
-            )
+    def find_revoked_api_key_ids(self) -> List[int]:
+        """Ids of the revoked API keys, raises when they cannot be read"""
+        with self.create_connection(self.config) as connection:
+            result = connection.find_revoked_api_keys()
+        if not result["success"]:
+            raise RuntimeError(result["message"])
+        return result["data"]
+
+    def create_api_key(self, name: str) -> dict:
+        """Create an API key; the key itself is only in this result, the database keeps its digest"""
+        api_key, key_prefix, key_hash = generate_api_key()
+        with self.create_connection(self.config) as connection:
+            result = connection.create_api_key(name, key_prefix, key_hash)
+        if result["success"]:
+            result["api_key"] = api_key
+        return result
+
+    def revoke_api_key(self, key_id: int) -> dict:
+        """Revoke an API key, here and in the workers listening on the invalidation bus"""
+        with self.create_connection(self.config) as connection:
+            result = connection.revoke_api_key(key_id)
+        if result["success"]:
+            self.after_write(API_KEY_TABLE)
+        return result
 
     # ============== Generic Entity CRUD Methods ==============
 
     def create_entity(self, entity: BaseEntity) -> dict:
         """Create a new entity"""
         with self.create_connection(self.config) as connection:
-            return connection.create_entity(entity)
+            result = connection.create_entity(entity)
+        if result["success"]:
+            self.after_write(entity.get_table_name())
+        return result
 
-    def find_entities(self, entity_class: type[BaseEntity], filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 10) -> dict:
+    def find_entities(self, entity_class: type[BaseEntity], filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 10, after: Optional[Any] = None, total_mode: TotalMode = TotalMode.EXACT, fields: Optional[Sequence[str]] = None, sort: Optional[str] = None, expand: Optional[Sequence[str]] = None) -> dict:
         """Find entities with optional filters"""
         with self.create_connection(self.config) as connection:
-            return connection.find_entities(entity_class, filters, skip, limit)
+            return connection.find_entities(entity_class, filters, skip, limit, after, total_mode, fields, sort, expand)
 
-    def find_entity_by_id(self, entity_class: type[BaseEntity], entity_id: int) -> dict:
+    def find_entity_by_id(self, entity_class: type[BaseEntity], entity_id: int, fields: Optional[Sequence[str]] = None) -> dict:
         """Find a single entity by ID"""
         with self.create_connection(self.config) as connection:
-            return connection.find_entity_by_id(entity_class, entity_id)
+            return connection.find_entity_by_id(entity_class, entity_id, fields)
+
+    def find_entities_by_ids(self, entity_class: type[BaseEntity], entity_ids: Sequence[int], fields: Optional[Sequence[str]] = None, expand: Optional[Sequence[str]] = None) -> dict:
+        """Find several entities by ID"""
+        with self.create_connection(self.config) as connection:
+            return connection.find_entities_by_ids(entity_class, entity_ids, fields, expand)
+
+    def find_portfolio(self) -> dict:
+        """Find the full nested portfolio"""
+        with self.create_connection(self.config) as connection:
+            return connection.find_portfolio()
+
+    def find_table_versions(self, tables: Sequence[str]) -> Dict[str, Tuple[int, Any, Any, int]]:
+        """Row count, highest id, newest row timestamp and write counter of each table, raises when they cannot be read"""
+        with self.create_connection(self.config) as connection:
+            result = connection.find_table_versions(tables)
+        if not result["success"]:
+            raise RuntimeError(result["message"])
+        return result["data"]
 
     def update_entity(self, entity: BaseEntity, entity_id: int) -> dict:
         """Update an existing entity"""
         with self.create_connection(self.config) as connection:
-            return connection.update_entity(entity, entity_id)
+            result = connection.update_entity(entity, entity_id)
+        if result["success"]:
+            self.after_write(entity.get_table_name())
+        return result
 
     def delete_entity(self, entity_class: type[BaseEntity], entity_id: int) -> dict:
         """Delete an entity by ID"""
         with self.create_connection(self.config) as connection:
-            return connection.delete_entity(entity_class, entity_id)
+            result = connection.delete_entity(entity_class, entity_id)
+        if result["success"]:
+            self.after_write(entity_class.get_table_name())
+        return result
 
-    def __init__(self):
+    def __init__(self, settings: Optional[DatabaseSettings] = None):
+        self.settings = settings if settings is not None else DatabaseSettings()
         self.load_config()
+        self.pool = self.create_pool(self.config)
+        self.count_cache = self.create_count_cache(self.config)
+        self.api_key_cache = self.create_api_key_cache(self.config)
+        self.write_listeners: List[Callable[[FrozenSet[str]], None]] = []
+        self.invalidation_bus: Optional[InvalidationBus] = None
+
+
+# Async adapters
+
+class AsyncMySQLService:
+    """
+    Awaitable facade over MySQLService
+    Each call runs on a bounded thread pool sized to the connection pool, so the event loop keeps
+    serving other requests while pymysql blocks and threads never queue behind a pool checkout.
+    bcrypt runs on its own PasswordPool so a burst of logins cannot hold the database threads
+    """
+
+    def __init__(self, service: MySQLService, max_workers: Optional[int] = None, password_pool: Optional[PasswordPool] = None):
+        self.service = service
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or service.pool.max_size,
+            thread_name_prefix="mysql"
+        )
+        self.password_pool = password_pool or PasswordPool()
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Run a blocking callable on the database thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    async def auth_user(self, api_user: ApiUser) -> AuthResponse:
+        """Authenticate a user; raises PasswordPoolFull when too many password checks are waiting"""
+        find_user_response = await self.run(self.service.find_user, api_user)
+        if not isinstance(find_user_response.user, UserInDB):
+            return auth_response(api_user, find_user_response, False)
+
+        is_valid_password = await self.password_pool.verify(api_user.password, find_user_response.user.password)
+        return auth_response(api_user, find_user_response, is_valid_password)
+
+    async def auth_api_key(self, api_key: str) -> AuthResponse:
+        """Authenticate an API key; a key seen before is answered from the cache without leaving the event loop"""
+        find_api_key_response = self.service.cached_api_key(api_key)
+        if find_api_key_response is None:
+            find_api_key_response = await self.run(self.service.load_api_key, api_key)
+        return api_key_response(find_api_key_response)
+
+    async def create_entity(self, entity: BaseEntity) -> dict:
+        """Create a new entity"""
+        return await self.run(self.service.create_entity, entity)
+
+    async def find_entities(self, entity_class: type[BaseEntity], filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 10, after: Optional[Any] = None, total_mode: TotalMode = TotalMode.EXACT, fields: Optional[Sequence[str]] = None, sort: Optional[str] = None, expand: Optional[Sequence[str]] = None) -> dict:
+        """Find entities with optional filters"""
+        return await self.run(self.service.find_entities, entity_class, filters, skip, limit, after, total_mode, fields, sort, expand)
+
+    async def find_entity_by_id(self, entity_class: type[BaseEntity], entity_id: int, fields: Optional[Sequence[str]] = None) -> dict:
+        """Find a single entity by ID"""
+        return await self.run(self.service.find_entity_by_id, entity_class, entity_id, fields)
+
+    async def find_entities_by_ids(self, entity_class: type[BaseEntity], entity_ids: Sequence[int], fields: Optional[Sequence[str]] = None, expand: Optional[Sequence[str]] = None) -> dict:
+        """Find several entities by ID"""
+        return await self.run(self.service.find_entities_by_ids, entity_class, entity_ids, fields, expand)
+
+    async def find_portfolio(self) -> dict:
+        """Find the full nested portfolio"""
+        return await self.run(self.service.find_portfolio)
+
+    async def update_entity(self, entity: BaseEntity, entity_id: int) -> dict:
+        """Update an existing entity"""
+        return await self.run(self.service.update_entity, entity, entity_id)
+
+    async def delete_entity(self, entity_class: type[BaseEntity], entity_id: int) -> dict:
+        """Delete an entity by ID"""
+        return await self.run(self.service.delete_entity, entity_class, entity_id)
+
+    def stats(self) -> dict:
+        return {**self.service.stats(), "password_pool": self.password_pool.stats()}
+
+    def close(self):
+        """Stop the worker threads and close the underlying service"""
+        self.password_pool.close()
+        self.executor.shutdown(wait=True)
+        self.service.close()
+
@@ -0,0 +1,81 @@
+"""
+Cache of list totals keyed by (table, filter)
+Entries expire after a TTL and are dropped as soon as the table is written
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from enum import Enum
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+
+class TotalMode(str, Enum):
+    """How a list request computes its total"""
+    EXACT = "exact"        # COUNT(*) with the request filters, cached per (table, filter)
+    ESTIMATE = "estimate"  # table statistics when unfiltered, exact count otherwise
+    NONE = "none"          # no total at all, saves the second round trip
+
+
+class CountCache:
+    """Thread-safe, size-bounded LRU of totals with per-table invalidation"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[int, float]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def generation(self, table: str) -> int:
+        """Current write generation of a table, read before counting so stale totals are not stored"""
+        with self._lock:
+            return self._generations.get(table, 0)
+
+    def get(self, table: str, key: Hashable) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get((table, key))
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._entries[(table, key)]
+                self._misses += 1
+                return None
+            self._entries.move_to_end((table, key))
+            self._hits += 1
+            return entry[0]
+
+    def set(self, table: str, key: Hashable, total: int, generation: int):
+        """Store a total unless the table was written since generation was read"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if self._generations.get(table, 0) != generation:
+                return
+            self._entries[(table, key)] = (total, time.monotonic() + self.ttl)
+            self._entries.move_to_end((table, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tables: Iterable[str]):
+        """Drop every total of the given tables"""
+        tables = set(tables)
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            for cache_key in [k for k in self._entries if k[0] in tables]:
+                del self._entries[cache_key]
+            self._invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self._invalidations,
+            }
@@ -4,20 +4,30 @@ Database entities package
 
 from database.entities.base_entity import BaseEntity
 from database.entities.mysql_entity import MySQLEntity
+from database.entities.filters import MatchMode, TextMatch, FullTextSearch
+from database.entities.sorting import SortKey
 from database.entities.api_db_entities import (
     AuthResponse,
     UserInDB,
     FindUserResponse,
     ApiUser,
+    ApiKeyInDB,
+    FindApiKeyResponse,
     TokenRequest
 )
 
 __all__ = [
     "BaseEntity",
     "MySQLEntity",
+    "MatchMode",
+    "TextMatch",
+    "FullTextSearch",
+    "SortKey",
     "AuthResponse",
     "UserInDB",
     "FindUserResponse",
     "ApiUser",
+    "ApiKeyInDB",
+    "FindApiKeyResponse",
     "TokenRequest"
 ]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from typing import Optional
 
 class AuthResponse(BaseModel):
@@ -20,5 +20,23 @@ class ApiUser(BaseModel):
     email: str
     password: str
 
+class ApiKeyInDB(BaseModel):
+    id: int
+    name: str
+    key_prefix: str
+
+class FindApiKeyResponse(BaseModel):
+    success: bool
+    message: str
+    api_key: Optional[ApiKeyInDB]
+
 class TokenRequest(BaseModel):
-    api_user: ApiUser
\ No newline at end of file
+    api_user: Optional[ApiUser] = None
+    # Machine clients send an API key instead of user credentials
+    api_key: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_credentials(self) -> "TokenRequest":
+        if (self.api_user is None) == (self.api_key is None):
+            raise ValueError("Provide either api_user or api_key")
+        return self
@@ -5,7 +5,8 @@ All database entities should inherit from this class and implement their own que
 
 from abc import ABC, abstractmethod
 from pydantic import BaseModel
-from typing import Tuple, Dict, Any, Optional
+from database.entities.sorting import SortKey
+from typing import Tuple, Dict, Any, Optional, Sequence
 
 
 class BaseEntity(BaseModel, ABC):
@@ -35,18 +36,39 @@ class BaseEntity(BaseModel, ABC):
 
     @classmethod
     @abstractmethod
-    def get_select_query(cls, filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 10) -> Tuple[str, tuple]:
+    def get_select_query(cls, filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 10, after: Optional[Any] = None, fields: Optional[Sequence[str]] = None, sort: Optional[str] = None) -> Tuple[str, tuple]:
         """
         Generate SELECT query with optional filters
+        When after is given, use keyset pagination (rows after that position of the sort order) instead of skip
+        When fields is given, select only those fields (and id)
+        When sort is given, order by it (e.g. "-start_date,title"), id otherwise
         Returns: (query_string, params_tuple)
         """
         pass
 
     @classmethod
     @abstractmethod
-    def get_select_by_id_query(cls, entity_id: int) -> Tuple[str, tuple]:
+    def get_sort_keys(cls, sort: Optional[str] = None) -> Tuple[SortKey, ...]:
         """
-        Generate SELECT query for a single entity by ID
+        Validate a sort string and return its keys, ending with a unique tiebreaker
+        Returns: (SortKey, ...)
+        """
+        pass
+
+    @classmethod
+    @abstractmethod
+    def get_select_by_id_query(cls, entity_id: int, fields: Optional[Sequence[str]] = None) -> Tuple[str, tuple]:
+        """
+        Generate SELECT query for a single entity by ID, optionally restricted to fields
+        Returns: (query_string, params_tuple)
+        """
+        pass
+
+    @classmethod
+    @abstractmethod
+    def get_select_by_ids_query(cls, entity_ids: Sequence[int], fields: Optional[Sequence[str]] = None) -> Tuple[str, tuple]:
+        """
+        Generate SELECT query for several entities by ID, optionally restricted to fields
         Returns: (query_string, params_tuple)
         """
         pass
@@ -67,4 +89,13 @@ class BaseEntity(BaseModel, ABC):
         Generate COUNT query with optional filters
         Returns: (query_string, params_tuple)
         """
-        pass
\ No newline at end of file
+        pass
+
+    @classmethod
+    @abstractmethod
+    def get_estimated_count_query(cls) -> Tuple[str, tuple]:
+        """
+        Generate a query returning the approximate number of rows from table statistics
+        Returns: (query_string, params_tuple)
+        """
+        pass
@@ -0,0 +1,30 @@
+"""
+Typed filter values for text columns
+A plain string filter keeps the historical contains (LIKE '%value%') behaviour
+"""
+
+from enum import Enum
+from typing import NamedTuple
+
+
+class MatchMode(str, Enum):
+    """How a text filter is compared against its column"""
+    CONTAINS = "contains"  # LIKE '%value%', cannot use an index
+    PREFIX = "prefix"      # LIKE 'value%', B-tree range scan
+    EXACT = "exact"        # = value, B-tree lookup
+
+
+class TextMatch(NamedTuple):
+    """Filter value matched with an explicit mode"""
+    value: str
+    mode: MatchMode = MatchMode.CONTAINS
+
+
+class FullTextSearch(NamedTuple):
+    """Relevance search served by a FULLTEXT index, only valid on the entity's fulltext fields"""
+    value: str
+
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input is matched literally"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
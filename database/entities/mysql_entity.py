@@ -4,7 +4,10 @@ All MySQL entities should inherit from this class
 """
 
 from database.entities.base_entity import BaseEntity
-from typing import Tuple, Dict, Any, Optional
+from database.entities.filters import MatchMode, TextMatch, FullTextSearch, escape_like
+from database.entities.sorting import SortKey, parse_sort
+from database.statement_cache import statement_cache, pad_in_params
+from typing import Tuple, Dict, Any, Optional, Sequence
 from abc import abstractmethod
 
 
@@ -26,6 +29,31 @@ class MySQLEntity(BaseEntity):
         """
         pass
 
+    @classmethod
+    def get_fulltext_fields(cls) -> Tuple[str, ...]:
+        """
+        Return the columns covered by a FULLTEXT index, the only ones accepting FullTextSearch filters
+        Override in entities whose table declares a FULLTEXT index
+        """
+        return ()
+
+    @classmethod
+    def get_sortable_fields(cls) -> Dict[str, Optional[str]]:
+        """
+        Return the fields accepted by sort= mapped to the index serving that order, None when MySQL has to filesort
+        Override in entities to whitelist more fields, InnoDB secondary indexes end with the primary key so a single-column
+        index on field serves (field, id) too; a composite index (field, other) does not, other sits before id
+        """
+        return {"id": "PRIMARY"}
+
+    @classmethod
+    def get_nullable_fields(cls) -> Tuple[str, ...]:
+        """
+        Return the sortable fields whose column accepts NULL, keyset conditions then account for NULL positions
+        Override in entities sorting by a nullable column
+        """
+        return ()
+
     @abstractmethod
     def get_insert_query(self) -> Tuple[str, tuple]:
         """
@@ -43,64 +71,249 @@ class MySQLEntity(BaseEntity):
         pass
 
     @classmethod
-    def get_select_query(cls, filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 10) -> Tuple[str, tuple]:
-        """Generate SELECT query with optional filters"""
-        table_name = cls.get_table_name()
-        query = f"SELECT * FROM {table_name}"
+    def get_selectable_fields(cls) -> Dict[str, str]:
+        """Fields accepted by a projection mapped to their columns, id included"""
+        return {"id": "id", **cls.get_field_mappings()}
+
+    @classmethod
+    def get_select_columns(cls, fields: Optional[Sequence[str]] = None) -> str:
+        """
+        Build the SELECT list for a projection, * when no fields are given
+        id is always selected so rows stay addressable and keyset cursors keep working
+        """
+        if not fields:
+            return "*"
+
+        selectable = cls.get_selectable_fields()
+        unknown = [field for field in fields if field not in selectable]
+        if unknown:
+            raise ValueError(f"Unknown fields for {cls.get_table_name()}: {', '.join(unknown)}")
+
+        columns = []
+        for field in dict.fromkeys(["id", *fields]):
+            column = selectable[field]
+            columns.append(column if column == field else f"{column} AS {field}")
+        return ", ".join(columns)
+
+    @classmethod
+    def get_sort_keys(cls, sort: Optional[str] = None) -> Tuple[SortKey, ...]:
+        """
+        Validate sort against the sortable fields and append id as tiebreaker so the order is total
+        The tiebreaker follows the direction of the last key, a single forward or backward index scan then serves the whole order
+        """
+        keys = parse_sort(sort)
+        sortable = cls.get_sortable_fields()
+        unknown = [key.field for key in keys if key.field not in sortable]
+        if unknown:
+            raise ValueError(f"Cannot sort {cls.get_table_name()} by: {', '.join(unknown)}. Allowed fields: {', '.join(sortable)}")
+
+        if not any(key.field == "id" for key in keys):
+            keys += (SortKey("id", keys[-1].descending if keys else False),)
+        return keys
+
+    @classmethod
+    def get_filter_signature(cls, filters: Optional[Dict[str, Any]] = None) -> Tuple[Tuple[Tuple[str, str], ...], list]:
+        """
+        Reduce filters to their shape, ((field, match kind), ...), and the params bound to it
+        Plain strings keep the contains behaviour, TextMatch picks exact/prefix to use the B-tree indexes,
+        FullTextSearch uses the FULLTEXT index of the column, any other value is an equality
+        """
+        signature = []
         params = []
 
         if filters:
-            where_clauses = []
             for key, value in filters.items():
-                if value is not None:
-                    if isinstance(value, str):
-                        where_clauses.append(f"{key} LIKE %s")
-                        params.append(f"%{value}%")
+                if value is None:
+                    continue
+                if isinstance(value, FullTextSearch):
+                    if key not in cls.get_fulltext_fields():
+                        raise ValueError(f"Full-text search is not available for {cls.get_table_name()}.{key}")
+                    signature.append((key, "fulltext"))
+                    params.append(value.value)
+                elif isinstance(value, (str, TextMatch)):
+                    text, mode = (value.value, value.mode) if isinstance(value, TextMatch) else (value, MatchMode.CONTAINS)
+                    signature.append((key, mode.value))
+                    if mode == MatchMode.EXACT:
+                        params.append(text)
+                    elif mode == MatchMode.PREFIX:
+                        params.append(f"{escape_like(text)}%")
                     else:
-                        where_clauses.append(f"{key} = %s")
-                        params.append(value)
+                        params.append(f"%{escape_like(text)}%")
+                else:
+                    signature.append((key, "eq"))
+                    params.append(value)
+
+        return (tuple(signature), params)
+
+    @classmethod
+    def get_condition(cls, key: str, kind: str) -> str:
+        """SQL condition for one (field, match kind) pair of a filter signature"""
+        if kind == "fulltext":
+            return f"MATCH({key}) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+        if kind in (MatchMode.CONTAINS.value, MatchMode.PREFIX.value):
+            return f"{key} LIKE %s"
+        return f"{key} = %s"
+
+    @classmethod
+    def get_keyset_condition(cls, order: Tuple[SortKey, ...], nulls: Tuple[bool, ...]) -> str:
+        """
+        SQL condition selecting the rows after a position in order, one %s per non-NULL value of each term of the expansion
+        (a, b) after (x, y) is a > x OR (a = x AND b > y), the comparison flips for descending keys.
+        nulls tells which values of the position are NULL; MySQL sorts NULL first ascending and last descending,
+        so nothing follows a NULL in a descending key and a non-NULL value is followed by the NULLs
+        """
+        columns = cls.get_selectable_fields()
+        nullable = cls.get_nullable_fields()
+        terms = []
+        for index, key in enumerate(order):
+            column = columns[key.field]
+            if key.descending and nulls[index]:
+                continue
+            equal = [f"{columns[previous.field]} {'IS NULL' if nulls[position] else '= %s'}" for position, previous in enumerate(order[:index])]
+            if nulls[index]:
+                equal.append(f"{column} IS NOT NULL")
+            elif key.descending and key.field in nullable:
+                equal.append(f"({column} < %s OR {column} IS NULL)")
+            else:
+                equal.append(f"{column} {'<' if key.descending else '>'} %s")
+            terms.append(" AND ".join(equal))
+        if len(terms) == 1:
+            return terms[0]
+        return "(" + " OR ".join(f"({term})" for term in terms) + ")"
+
+    @classmethod
+    def get_keyset_params(cls, order: Tuple[SortKey, ...], position: Tuple[Any, ...]) -> list:
+        """Params of get_keyset_condition for a position, in the order of its placeholders"""
+        params = []
+        for index, key in enumerate(order):
+            if key.descending and position[index] is None:
+                continue
+            params.extend(value for value in position[:index + 1] if value is not None)
+        return params
+
+    @classmethod
+    def build_select_sql(cls, signature: Tuple[Tuple[str, str], ...], fields: Optional[Tuple[str, ...]], order: Optional[Tuple[SortKey, ...]], keyset: bool, nulls: Optional[Tuple[bool, ...]]) -> str:
+        """
+        Build the SELECT template for a query shape, cached by get_select_query
+        Without an explicit order, full-text searches are ordered by relevance and everything else by id
+        nulls is None on the first page, otherwise which values of the keyset position are NULL
+        """
+        query = f"SELECT {cls.get_select_columns(fields)} FROM {cls.get_table_name()}"
+        conditions = [cls.get_condition(key, kind) for key, kind in signature]
+        if nulls is not None:
+            conditions.append(cls.get_keyset_condition(order, nulls))
+
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+
+        if order is None:
+            # Most relevant rows first
+            terms = [f"MATCH({key}) AGAINST (%s IN NATURAL LANGUAGE MODE) DESC" for key, kind in signature if kind == "fulltext"]
+            terms.append("id")
+        else:
+            columns = cls.get_selectable_fields()
+            terms = [f"{columns[key.field]} DESC" if key.descending else columns[key.field] for key in order]
+        query += " ORDER BY " + ", ".join(terms)
 
-            if where_clauses:
-                query += " WHERE " + " AND ".join(where_clauses)
+        query += " LIMIT %s" if keyset else " LIMIT %s OFFSET %s"
+        return query
+
+    @classmethod
+    def get_select_query(cls, filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 10, after: Optional[Any] = None, fields: Optional[Sequence[str]] = None, sort: Optional[str] = None) -> Tuple[str, tuple]:
+        """
+        Generate SELECT query with optional filters, projection and sort
+        Offset pagination (LIMIT/OFFSET) by default, keyset pagination when after is given:
+        an id for the default order, or the values of the sort keys of the last row (empty for the first page)
+        """
+        signature, params = cls.get_filter_signature(filters)
+        searches = [param for (_, kind), param in zip(signature, params) if kind == "fulltext"]
+        keyset = after is not None
+        order = cls.get_sort_keys(sort) if sort or keyset else None
 
-        query += " LIMIT %s OFFSET %s"
-        params.extend([limit, skip])
+        position = ()
+        if keyset:
+            position = tuple(after) if isinstance(after, (tuple, list)) else (after,)
+            if position and len(position) != len(order):
+                raise ValueError("Keyset position does not match the sort order")
+            nullable = cls.get_nullable_fields()
+            if any(value is None and key.field not in nullable for key, value in zip(order, position)):
+                raise ValueError("Keyset position does not match the sort order")
+
+        projection = tuple(fields) if fields else None
+        if keyset and projection:
+            # The next cursor is built from the sort keys of the last row
+            projection = tuple(dict.fromkeys([*projection, *(key.field for key in order)]))
+
+        nulls = tuple(value is None for value in position) if position else None
+        query = statement_cache.get_or_build(
+            (cls, "select", signature, projection, order, keyset, nulls),
+            lambda: cls.build_select_sql(signature, projection, order, keyset, nulls)
+        )
+
+        if keyset:
+            if position:
+                params.extend(cls.get_keyset_params(order, position))
+            params.append(limit)
+        else:
+            if order is None:
+                params.extend(searches)
+            params.extend([limit, skip])
 
         return (query, tuple(params))
 
     @classmethod
-    def get_select_by_id_query(cls, entity_id: int) -> Tuple[str, tuple]:
-        """Generate SELECT query for a single entity by ID"""
-        table_name = cls.get_table_name()
-        query = f"SELECT * FROM {table_name} WHERE id = %s"
+    def get_select_by_id_query(cls, entity_id: int, fields: Optional[Sequence[str]] = None) -> Tuple[str, tuple]:
+        """Generate SELECT query for a single entity by ID with an optional projection"""
+        projection = tuple(fields) if fields else None
+        query = statement_cache.get_or_build(
+            (cls, "select_by_id", projection),
+            lambda: f"SELECT {cls.get_select_columns(projection)} FROM {cls.get_table_name()} WHERE id = %s"
+        )
         return (query, (entity_id,))
 
+    @classmethod
+    def get_select_by_ids_query(cls, entity_ids: Sequence[int], fields: Optional[Sequence[str]] = None) -> Tuple[str, tuple]:
+        """
+        Generate SELECT query for several entities with a single WHERE id IN (...)
+        The id list is padded (see pad_in_params), so a handful of templates cover every batch size
+        """
+        entity_ids = list(dict.fromkeys(entity_ids))
+        if not entity_ids:
+            raise ValueError("At least one id is required")
+
+        size, params = pad_in_params(entity_ids)
+        projection = tuple(fields) if fields else None
+        query = statement_cache.get_or_build(
+            (cls, "select_by_ids", projection, size),
+            lambda: f"SELECT {cls.get_select_columns(projection)} FROM {cls.get_table_name()} WHERE id IN ({', '.join(['%s'] * size)})"
+        )
+        return (query, tuple(params))
+
     @classmethod
     def get_delete_query(cls, entity_id: int) -> Tuple[str, tuple]:
         """Generate DELETE query for an entity by ID"""
-        table_name = cls.get_table_name()
-        query = f"DELETE FROM {table_name} WHERE id = %s"
+        query = statement_cache.get_or_build(
+            (cls, "delete"),
+            lambda: f"DELETE FROM {cls.get_table_name()} WHERE id = %s"
+        )
         return (query, (entity_id,))
 
     @classmethod
     def get_count_query(cls, filters: Optional[Dict[str, Any]] = None) -> Tuple[str, tuple]:
         """Generate COUNT query with optional filters"""
-        table_name = cls.get_table_name()
-        query = f"SELECT COUNT(*) as total FROM {table_name}"
-        params = []
+        signature, params = cls.get_filter_signature(filters)
 
-        if filters:
-            where_clauses = []
-            for key, value in filters.items():
-                if value is not None:
-                    if isinstance(value, str):
-                        where_clauses.append(f"{key} LIKE %s")
-                        params.append(f"%{value}%")
-                    else:
-                        where_clauses.append(f"{key} = %s")
-                        params.append(value)
+        def build() -> str:
+            query = f"SELECT COUNT(*) as total FROM {cls.get_table_name()}"
+            if signature:
+                query += " WHERE " + " AND ".join(cls.get_condition(key, kind) for key, kind in signature)
+            return query
 
-            if where_clauses:
-                query += " WHERE " + " AND ".join(where_clauses)
+        query = statement_cache.get_or_build((cls, "count", signature), build)
+        return (query, tuple(params))
 
-        return (query, tuple(params))
\ No newline at end of file
+    @classmethod
+    def get_estimated_count_query(cls) -> Tuple[str, tuple]:
+        """Generate a query reading the approximate row count from InnoDB table statistics"""
+        query = "SELECT TABLE_ROWS as total FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s"
+        return (query, (cls.get_table_name(),))
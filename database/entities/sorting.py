@@ -0,0 +1,36 @@
+"""
+Sort specifications for list queries
+sort=-start_date,title sorts by start_date descending, then title ascending
+"""
+
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+
+class SortKey(NamedTuple):
+    """One ORDER BY term"""
+    field: str
+    descending: bool = False
+
+
+def parse_sort(sort: Optional[str]) -> Tuple[SortKey, ...]:
+    """Parse a comma-separated sort string, a leading - means descending"""
+    keys = []
+    seen = set()
+    for term in (sort or "").split(","):
+        term = term.strip()
+        if not term:
+            continue
+        descending = term.startswith("-")
+        field = term.lstrip("+-").strip()
+        if not field:
+            raise ValueError(f"Invalid sort term: {term}")
+        if field in seen:
+            raise ValueError(f"Duplicate sort field: {field}")
+        seen.add(field)
+        keys.append(SortKey(field, descending))
+    return tuple(keys)
+
+
+def format_sort(keys: Sequence[SortKey]) -> str:
+    """Inverse of parse_sort, used as the canonical form of a sort"""
+    return ",".join(f"-{key.field}" if key.descending else key.field for key in keys)
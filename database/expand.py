@@ -0,0 +1,68 @@
+"""
+expand= eager loading
+Each requested relation is resolved for a whole page of rows with one batched IN (...) query, never per row
+"""
+
+from typing import Any, Dict, FrozenSet, Iterable, List, Sequence
+
+from database.relations import RELATIONS, Relation
+from database.statement_cache import statement_cache, pad_in_params
+
+
+def get_relations(table: str) -> Dict[str, Relation]:
+    """Relations of a table accepted by expand="""
+    return RELATIONS.get(table, {})
+
+
+def expanded_tables(table: str, expand: Iterable[str]) -> FrozenSet[str]:
+    """Tables read by a query of table with the given relations expanded, unknown relation names are ignored"""
+    tables = {table}
+    relations = get_relations(table)
+    for name in expand:
+        relation = relations.get(name)
+        if relation is not None:
+            tables.add(relation.table)
+            if relation.through:
+                tables.add(relation.through)
+    return frozenset(tables)
+
+
+def get_expand_query(relation: Relation, size: int) -> str:
+    """SELECT template fetching the related rows of size parent keys, the matched key is returned as _parent_key"""
+    placeholders = ", ".join(["%s"] * size)
+    if relation.through:
+        return (
+            f"SELECT j.{relation.remote_key} AS _parent_key, r.* FROM {relation.through} j "
+            f"JOIN {relation.table} r ON r.id = j.{relation.through_key} "
+            f"WHERE j.{relation.remote_key} IN ({placeholders}) ORDER BY j.id"
+        )
+    return f"SELECT {relation.remote_key} AS _parent_key, {relation.table}.* FROM {relation.table} WHERE {relation.remote_key} IN ({placeholders}) ORDER BY id"
+
+
+def expand_rows(cursor: Any, table: str, rows: List[dict], expand: Sequence[str]):
+    """Embed the requested relations into rows in place, one query per relation"""
+    relations = get_relations(table)
+    for name in expand:
+        relation = relations.get(name)
+        if relation is None:
+            raise ValueError(f"Unknown relation for {table}: {name}")
+
+        keys = list(dict.fromkeys(row[relation.key] for row in rows if row.get(relation.key) is not None))
+        related: Dict[Any, List[dict]] = {}
+        if keys:
+            size, params = pad_in_params(keys)
+            query = statement_cache.get_or_build(("expand", relation, size), lambda: get_expand_query(relation, size))
+            cursor.execute(query, tuple(params))
+            for related_row in cursor.fetchall():
+                related_row = dict(related_row)
+                related.setdefault(related_row.pop("_parent_key"), []).append(related_row)
+
+        for row in rows:
+            matches = related.get(row.get(relation.key), [])
+            row[name] = matches if relation.many else (matches[0] if matches else None)
+
+
+def required_fields(table: str, expand: Sequence[str]) -> List[str]:
+    """Columns a projection must keep so the requested relations can be matched"""
+    relations = get_relations(table)
+    return [relations[name].key for name in expand if name in relations]
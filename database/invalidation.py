@@ -0,0 +1,240 @@
+"""
+Cache invalidation bus between worker processes
+MySQLService publishes the tables affected by each write; every other worker subscribed to the bus runs its
+local invalidation (count cache, response cache, table versions, snapshot) for those tables
+
+Backends:
+- process: single worker, nothing to propagate
+- shm: a memory-mapped file of per-table version counters shared by the workers of one host, polled every few ms
+- redis: Redis pub/sub for workers spread over several hosts (optional redis package, or any client exposing
+  publish() and pubsub() like redis-py)
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import uuid
+from typing import Any, Callable, Iterable, List, Optional, Sequence
+
+from database.relations import FOREIGN_KEYS
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows, the shm backend needs it
+    fcntl = None
+
+try:
+    import redis
+except ImportError:  # optional dependency, only needed by the redis backend without an injected client
+    redis = None
+
+
+Subscriber = Callable[[frozenset], None]
+
+# Every table a write can touch, in a fixed order shared by all workers
+# api_keys is appended rather than sorted in so the slots of an existing shm file keep their positions
+KNOWN_TABLES = tuple(sorted({"users", *FOREIGN_KEYS, *(parent for keys in FOREIGN_KEYS.values() for parent in keys.values())})) + ("api_keys",)
+
+
+class InvalidationBus:
+    """In-process bus: a single worker has no one else to notify"""
+
+    def __init__(self):
+        self.subscribers: List[Subscriber] = []
+        self._lock = threading.Lock()
+        self._published = 0
+        self._received = 0
+
+    def subscribe(self, subscriber: Subscriber):
+        """Register a callable run with the tables written by another worker"""
+        self.subscribers.append(subscriber)
+
+    def publish(self, tables: Iterable[str]):
+        """Announce that tables were written by this worker"""
+        with self._lock:
+            self._published += 1
+
+    def start(self):
+        pass
+
+    def close(self):
+        pass
+
+    def deliver(self, tables: Iterable[str]):
+        """Run the subscribers for a write received from another worker"""
+        tables = frozenset(tables)
+        if not tables:
+            return
+        with self._lock:
+            self._received += 1
+        for subscriber in self.subscribers:
+            try:
+                subscriber(tables)
+            except Exception:
+                # One failing subscriber must not keep the others stale
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "process",
+                "published": self._published,
+                "received": self._received,
+            }
+
+
+class SharedMemoryBus(InvalidationBus):
+    """
+    Per-table counters in a memory-mapped file, incremented under an exclusive flock
+    A poll thread compares them with the last values it saw and delivers the tables whose counter moved;
+    slot 0 stands for "every table" and is used for tables outside KNOWN_TABLES
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.005, tables: Sequence[str] = KNOWN_TABLES):
+        super().__init__()
+        if fcntl is None:
+            raise RuntimeError("The shm invalidation backend needs fcntl (POSIX only)")
+        self.path = path
+        self.poll_interval = poll_interval
+        self.tables = tuple(tables)
+        self.slots = {table: index + 1 for index, table in enumerate(self.tables)}
+        self.size = 8 * (len(self.tables) + 1)
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < self.size:
+                os.ftruncate(self._fd, self.size)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._map = mmap.mmap(self._fd, self.size)
+        self._seen = list(self.read_counters())
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def read_counters(self) -> tuple:
+        return struct.unpack_from(f"<{len(self.tables) + 1}Q", self._map, 0)
+
+    def publish(self, tables: Iterable[str]):
+        slots = sorted({self.slots.get(table, 0) for table in tables})
+        if not slots:
+            return
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            for slot in slots:
+                value = struct.unpack_from("<Q", self._map, slot * 8)[0]
+                struct.pack_into("<Q", self._map, slot * 8, value + 1)
+                with self._lock:
+                    # Skip our own increment when we were up to date, other workers' increments are still seen
+                    if self._seen[slot] == value:
+                        self._seen[slot] = value + 1
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        with self._lock:
+            self._published += 1
+
+    def poll(self):
+        """Deliver the tables whose counters moved since the last poll"""
+        counters = self.read_counters()
+        with self._lock:
+            changed = [slot for slot, value in enumerate(counters) if value != self._seen[slot]]
+            self._seen = list(counters)
+        if not changed:
+            return
+        if 0 in changed:
+            self.deliver(self.tables)
+        else:
+            self.deliver(self.tables[slot - 1] for slot in changed)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="invalidation-shm", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._closed.wait(self.poll_interval):
+            self.poll()
+
+    def close(self):
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+        self._map.close()
+        os.close(self._fd)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "backend": "shm", "path": self.path}
+
+
+class RedisBus(InvalidationBus):
+    """
+    Redis pub/sub on one channel, messages are {"origin": worker id, "tables": [...]}
+    client is anything exposing publish() and pubsub() like redis-py, built from url when not given
+    """
+
+    def __init__(self, client: Any = None, url: Optional[str] = None, channel: str = "portfolio:invalidate"):
+        super().__init__()
+        if client is None:
+            if redis is None:
+                raise RuntimeError("The redis invalidation backend needs the redis package or an injected client")
+            client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+        self.client = client
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pubsub = None
+
+    def publish(self, tables: Iterable[str]):
+        message = json.dumps({"origin": self.origin, "tables": sorted(tables)})
+        self.client.publish(self.channel, message)
+        with self._lock:
+            self._published += 1
+
+    def handle(self, message: Any):
+        if not message or message.get("type") != "message":
+            return
+        data = message["data"]
+        try:
+            payload = json.loads(data.decode("utf-8") if isinstance(data, bytes) else data)
+        except (ValueError, UnicodeDecodeError):
+            return
+        if payload.get("origin") != self.origin:
+            self.deliver(payload.get("tables", []))
+
+    def start(self):
+        if self._thread is None:
+            self._pubsub = self.client.pubsub()
+            self._pubsub.subscribe(self.channel)
+            self._thread = threading.Thread(target=self._run, name="invalidation-redis", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._closed.is_set():
+            try:
+                self.handle(self._pubsub.get_message(ignore_subscribe_messages=True, timeout=0.1))
+            except Exception:
+                # Connection hiccup, retry; the TTLs of the caches bound the staleness meanwhile
+                self._closed.wait(0.5)
+
+    def close(self):
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+        if self._pubsub is not None:
+            self._pubsub.close()
+
+    def stats(self) -> dict:
+        return {**super().stats(), "backend": "redis", "channel": self.channel}
+
+
+def create_invalidation_bus(backend: str, path: Optional[str] = None, poll_interval: float = 0.005, redis_url: Optional[str] = None) -> InvalidationBus:
+    """Build the bus selected in the settings"""
+    if backend == "shm":
+        return SharedMemoryBus(path, poll_interval=poll_interval)
+    if backend == "redis":
+        return RedisBus(url=redis_url)
+    return InvalidationBus()
+
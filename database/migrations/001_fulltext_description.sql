@@ -0,0 +1,11 @@
+-- ============================================
+-- Migration 001: FULLTEXT indexes on description columns
+-- ============================================
+-- Backs the full-text `search` parameter of the list endpoints
+-- Already included in schema.sql, only needed for databases created before this change
+-- ============================================
+
+ALTER TABLE professional_experiences ADD FULLTEXT INDEX ft_description (description);
+ALTER TABLE projects ADD FULLTEXT INDEX ft_description (description);
+ALTER TABLE project_tasks ADD FULLTEXT INDEX ft_description (description);
+ALTER TABLE responsibilities ADD FULLTEXT INDEX ft_description (description);
@@ -0,0 +1,17 @@
+-- ============================================
+-- Migration 002: API keys table
+-- ============================================
+-- Long-lived, revocable keys accepted by POST /auth/token instead of username and password
+-- Already included in schema.sql, only needed for databases created before this change
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS api_keys (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    key_prefix VARCHAR(16) NOT NULL,
+    key_hash CHAR(64) NOT NULL,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    revoked_at TIMESTAMP NULL DEFAULT NULL,
+    UNIQUE INDEX uk_key_hash (key_hash)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,15 @@
+-- ============================================
+-- Migration 003: table_versions
+-- ============================================
+-- Per-table write counters bumped by the API, part of the ETag so writes within one second still change it
+-- Already included in schema.sql, only needed for databases created before this change
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version BIGINT UNSIGNED NOT NULL DEFAULT 0
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT IGNORE INTO table_versions (table_name) VALUES
+('companies'), ('technologies'), ('professional_experiences'), ('projects'), ('project_tasks'),
+('responsibilities'), ('technology_projects'), ('company_experiences'), ('technology_experiences');
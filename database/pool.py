@@ -0,0 +1,231 @@
+"""
+Bounded MySQL connection pool
+Connections are borrowed and returned by MySQLConnection instead of being opened and closed on every call
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+import pymysql
+import pymysql.cursors
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available before the checkout timeout"""
+    pass
+
+
+class PoolClosedError(Exception):
+    """Raised when a connection is requested from a closed pool"""
+    pass
+
+
+class _PooledConnection:
+    """Raw pymysql connection plus the timestamps the pool needs to expire it"""
+
+    __slots__ = ("raw", "created_at", "last_used_at")
+
+    def __init__(self, raw: Any):
+        now = time.monotonic()
+        self.raw = raw
+        self.created_at = now
+        self.last_used_at = now
+
+
+class MySQLConnectionPool:
+    """
+    Thread-safe pool of pymysql connections
+
+    - At most max_size connections exist at any time, min_size are kept warm
+    - Idle connections older than idle_timeout are closed on checkout
+    - Connections older than max_lifetime are closed on checkout or return
+    - Connections idle for longer than ping_interval are pinged before being handed out
+    """
+
+    def __init__(
+        self,
+        config: dict,
+        min_size: int = 1,
+        max_size: int = 10,
+        idle_timeout: float = 300.0,
+        max_lifetime: float = 3600.0,
+        ping_interval: float = 30.0,
+        checkout_timeout: float = 10.0,
+    ):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool bounds: min_size={min_size}, max_size={max_size}")
+
+        self.config = config
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.ping_interval = ping_interval
+        self.checkout_timeout = checkout_timeout
+
+        self._idle: List[_PooledConnection] = []
+        self._in_use: Dict[int, _PooledConnection] = {}
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+        self._created = 0
+        self._discarded = 0
+        self._checkouts = 0
+        self._waits = 0
+
+    def _connect(self) -> Any:
+        """Open a new raw connection using the service config"""
+        return pymysql.connect(
+            host=self.config.get('HOST'),
+            port=int(self.config.get('DB_PORT')),
+            user=self.config.get('USERNAME'),
+            password=self.config.get('PASSWORD'),
+            database=self.config.get('DATABASE'),
+            cursorclass=pymysql.cursors.DictCursor,
+            autocommit=True
+        )
+
+    def _is_expired(self, pooled: _PooledConnection, now: float) -> bool:
+        if self.max_lifetime and now - pooled.created_at > self.max_lifetime:
+            return True
+        if self.idle_timeout and now - pooled.last_used_at > self.idle_timeout:
+            return True
+        return False
+
+    def _is_healthy(self, pooled: _PooledConnection, now: float) -> bool:
+        if not pooled.raw.open:
+            return False
+        if now - pooled.last_used_at < self.ping_interval:
+            return True
+        try:
+            pooled.raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _close_raw(self, raw: Any):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def open(self):
+        """Warm the pool up to min_size connections"""
+        with self._condition:
+            missing = self.min_size - self._size
+            self._size += max(missing, 0)
+
+        warmed = []
+        try:
+            for _ in range(max(missing, 0)):
+                warmed.append(_PooledConnection(self._connect()))
+        except Exception:
+            with self._condition:
+                self._size -= missing - len(warmed)
+                self._idle.extend(warmed)
+                self._created += len(warmed)
+                self._condition.notify_all()
+            raise
+
+        with self._condition:
+            self._idle.extend(warmed)
+            self._created += len(warmed)
+            self._condition.notify_all()
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """Borrow a healthy connection, opening a new one if the pool is below max_size"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            candidate: Optional[_PooledConnection] = None
+            create = False
+
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise PoolClosedError("Connection pool is closed")
+                    if self._idle:
+                        candidate = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        create = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(f"No database connection available after {timeout} seconds")
+                    self._waits += 1
+                    self._condition.wait(remaining)
+
+            if create:
+                try:
+                    candidate = _PooledConnection(self._connect())
+                except Exception:
+                    with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    raise
+                with self._condition:
+                    self._created += 1
+            else:
+                now = time.monotonic()
+                if self._is_expired(candidate, now) or not self._is_healthy(candidate, now):
+                    self._discard(candidate)
+                    continue
+
+            with self._condition:
+                self._in_use[id(candidate.raw)] = candidate
+                self._checkouts += 1
+            return candidate.raw
+
+    def release(self, raw: Any, discard: bool = False):
+        """Return a borrowed connection; broken, expired or surplus connections are closed"""
+        with self._condition:
+            pooled = self._in_use.pop(id(raw), None)
+        if pooled is None:
+            self._close_raw(raw)
+            return
+
+        now = time.monotonic()
+        if discard or self._closed or not raw.open or (self.max_lifetime and now - pooled.created_at > self.max_lifetime):
+            self._discard(pooled)
+            return
+
+        pooled.last_used_at = now
+        with self._condition:
+            self._idle.append(pooled)
+            self._condition.notify()
+
+    def _discard(self, pooled: _PooledConnection):
+        self._close_raw(pooled.raw)
+        with self._condition:
+            self._size -= 1
+            self._discarded += 1
+            self._condition.notify()
+
+    def close(self):
+        """Close idle connections and refuse new checkouts; borrowed connections are closed on return"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._condition.notify_all()
+        for pooled in idle:
+            self._close_raw(pooled.raw)
+
+    def stats(self) -> dict:
+        """Snapshot of pool counters for monitoring"""
+        with self._condition:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "created": self._created,
+                "discarded": self._discarded,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+            }
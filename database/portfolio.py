@@ -0,0 +1,90 @@
+"""
+Full portfolio graph assembled from one set-based query per collection
+Experiences come with their responsibilities, companies and technologies, projects with their tasks and technologies
+"""
+
+from typing import Any, Dict, List
+
+
+# Every query reads a whole collection, rows are grouped in Python, so the number of round trips does not depend on the data
+PORTFOLIO_QUERIES: Dict[str, str] = {
+    "experiences": (
+        "SELECT id, title, description, start_date, end_date, is_current FROM professional_experiences "
+        "ORDER BY start_date DESC, id DESC"
+    ),
+    "responsibilities": "SELECT id, experience_id, description FROM responsibilities ORDER BY experience_id, id",
+    "experience_companies": (
+        "SELECT ce.experience_id, c.id, c.name, c.logo_path FROM company_experiences ce "
+        "JOIN companies c ON c.id = ce.company_id ORDER BY ce.experience_id, ce.id"
+    ),
+    "experience_technologies": (
+        "SELECT te.experience_id, t.id, t.name, t.abbr FROM technology_experiences te "
+        "JOIN technologies t ON t.id = te.technology_id ORDER BY te.experience_id, te.id"
+    ),
+    "projects": "SELECT id, name, description, github_uri FROM projects ORDER BY id",
+    "tasks": "SELECT id, project_id, name, description FROM project_tasks ORDER BY project_id, id",
+    "project_technologies": (
+        "SELECT tp.project_id, t.id, t.name, t.abbr FROM technology_projects tp "
+        "JOIN technologies t ON t.id = tp.technology_id ORDER BY tp.project_id, tp.id"
+    ),
+}
+
+# Tables read by PORTFOLIO_QUERIES, a write to any of them changes the portfolio
+PORTFOLIO_TABLES = frozenset({
+    "professional_experiences",
+    "responsibilities",
+    "company_experiences",
+    "companies",
+    "technology_experiences",
+    "technologies",
+    "projects",
+    "project_tasks",
+    "technology_projects",
+})
+
+
+def group_by(rows: List[dict], key: str) -> Dict[Any, List[dict]]:
+    """Group rows by a foreign key column, dropping the column from the grouped rows"""
+    groups: Dict[Any, List[dict]] = {}
+    for row in rows:
+        row = dict(row)
+        groups.setdefault(row.pop(key), []).append(row)
+    return groups
+
+
+def assemble_portfolio(rows: Dict[str, List[dict]]) -> dict:
+    """Nest the rows of every PORTFOLIO_QUERIES collection into the portfolio graph"""
+    responsibilities = group_by(rows["responsibilities"], "experience_id")
+    experience_companies = group_by(rows["experience_companies"], "experience_id")
+    experience_technologies = group_by(rows["experience_technologies"], "experience_id")
+    tasks = group_by(rows["tasks"], "project_id")
+    project_technologies = group_by(rows["project_technologies"], "project_id")
+
+    return {
+        "experiences": [
+            {
+                **experience,
+                "responsibilities": responsibilities.get(experience["id"], []),
+                "companies": experience_companies.get(experience["id"], []),
+                "technologies": experience_technologies.get(experience["id"], []),
+            }
+            for experience in rows["experiences"]
+        ],
+        "projects": [
+            {
+                **project,
+                "tasks": tasks.get(project["id"], []),
+                "technologies": project_technologies.get(project["id"], []),
+            }
+            for project in rows["projects"]
+        ],
+    }
+
+
+def load_portfolio(cursor: Any) -> dict:
+    """Run PORTFOLIO_QUERIES on an open DictCursor and assemble the result"""
+    rows = {}
+    for name, query in PORTFOLIO_QUERIES.items():
+        cursor.execute(query)
+        rows[name] = list(cursor.fetchall())
+    return assemble_portfolio(rows)
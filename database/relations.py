@@ -0,0 +1,90 @@
+"""
+Foreign keys between the portfolio tables, mirroring database/schema.sql
+Used to work out which tables a write can affect and which relations expand= can embed
+"""
+
+from typing import Dict, FrozenSet, Iterable, NamedTuple, Optional
+
+
+# child table -> {foreign key column: parent table}; every foreign key is ON DELETE CASCADE
+FOREIGN_KEYS: Dict[str, Dict[str, str]] = {
+    "project_tasks": {"project_id": "projects"},
+    "responsibilities": {"experience_id": "professional_experiences"},
+    "technology_projects": {"technology_id": "technologies", "project_id": "projects"},
+    "company_experiences": {"company_id": "companies", "experience_id": "professional_experiences"},
+    "technology_experiences": {"technology_id": "technologies", "experience_id": "professional_experiences"},
+}
+
+
+def child_tables(table: str) -> FrozenSet[str]:
+    """Tables holding a foreign key to the given table"""
+    return frozenset(child for child, keys in FOREIGN_KEYS.items() if table in keys.values())
+
+
+def cascade_tables(table: str) -> FrozenSet[str]:
+    """The given table plus every table whose rows ON DELETE CASCADE can remove"""
+    affected = {table}
+    pending = [table]
+    while pending:
+        for child in child_tables(pending.pop()):
+            if child not in affected:
+                affected.add(child)
+                pending.append(child)
+    return frozenset(affected)
+
+
+def affected_tables(tables: Iterable[str]) -> FrozenSet[str]:
+    """Union of cascade_tables for several written tables"""
+    affected = set()
+    for table in tables:
+        affected |= cascade_tables(table)
+    return frozenset(affected)
+
+
+class Relation(NamedTuple):
+    """A relation that can be embedded into the rows of a table with expand="""
+    table: str                         # table of the related rows
+    key: str                           # column of the parent rows holding the value to match
+    remote_key: str                    # column matched against key, on the junction table when through is set
+    many: bool = True                  # list of rows, or a single row (or null) for many-to-one
+    through: Optional[str] = None      # junction table of a many-to-many relation
+    through_key: Optional[str] = None  # column of the junction table referencing table
+
+
+# table -> {expand name: relation}, every relation matches indexed columns (primary keys and idx_*_id)
+RELATIONS: Dict[str, Dict[str, Relation]] = {
+    "companies": {
+        "experiences": Relation("professional_experiences", "id", "company_id", through="company_experiences", through_key="experience_id"),
+    },
+    "technologies": {
+        "projects": Relation("projects", "id", "technology_id", through="technology_projects", through_key="project_id"),
+        "experiences": Relation("professional_experiences", "id", "technology_id", through="technology_experiences", through_key="experience_id"),
+    },
+    "professional_experiences": {
+        "responsibilities": Relation("responsibilities", "id", "experience_id"),
+        "companies": Relation("companies", "id", "experience_id", through="company_experiences", through_key="company_id"),
+        "technologies": Relation("technologies", "id", "experience_id", through="technology_experiences", through_key="technology_id"),
+    },
+    "projects": {
+        "tasks": Relation("project_tasks", "id", "project_id"),
+        "technologies": Relation("technologies", "id", "project_id", through="technology_projects", through_key="technology_id"),
+    },
+    "project_tasks": {
+        "project": Relation("projects", "project_id", "id", many=False),
+    },
+    "responsibilities": {
+        "experience": Relation("professional_experiences", "experience_id", "id", many=False),
+    },
+    "technology_projects": {
+        "technology": Relation("technologies", "technology_id", "id", many=False),
+        "project": Relation("projects", "project_id", "id", many=False),
+    },
+    "company_experiences": {
+        "company": Relation("companies", "company_id", "id", many=False),
+        "experience": Relation("professional_experiences", "experience_id", "id", many=False),
+    },
+    "technology_experiences": {
+        "technology": Relation("technologies", "technology_id", "id", many=False),
+        "experience": Relation("professional_experiences", "experience_id", "id", many=False),
+    },
+}
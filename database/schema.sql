@@ -16,6 +16,8 @@ DROP TABLE IF EXISTS projects;
 DROP TABLE IF EXISTS technologies;
 DROP TABLE IF EXISTS companies;
 DROP TABLE IF EXISTS users;
+DROP TABLE IF EXISTS api_keys;
+DROP TABLE IF EXISTS table_versions;
 
 -- ============================================
 -- Authentication Tables
@@ -33,6 +35,18 @@ CREATE TABLE users (
     INDEX idx_email (email)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- API keys for machine clients, only the SHA-256 digest of each key is stored
+CREATE TABLE api_keys (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    key_prefix VARCHAR(16) NOT NULL,
+    key_hash CHAR(64) NOT NULL,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    revoked_at TIMESTAMP NULL DEFAULT NULL,
+    UNIQUE INDEX uk_key_hash (key_hash)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- ============================================
 -- Portfolio Main Entities
 -- ============================================
@@ -70,7 +84,8 @@ CREATE TABLE professional_experiences (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     INDEX idx_title (title),
     INDEX idx_is_current (is_current),
-    INDEX idx_dates (start_date, end_date)
+    INDEX idx_dates (start_date, end_date),
+    FULLTEXT INDEX ft_description (description)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Projects table
@@ -81,7 +96,8 @@ CREATE TABLE projects (
     github_uri VARCHAR(500) NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-    INDEX idx_name (name)
+    INDEX idx_name (name),
+    FULLTEXT INDEX ft_description (description)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- ============================================
@@ -98,7 +114,8 @@ CREATE TABLE project_tasks (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE,
     INDEX idx_project_id (project_id),
-    INDEX idx_name (name)
+    INDEX idx_name (name),
+    FULLTEXT INDEX ft_description (description)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Responsibilities table (belongs to Professional Experience)
@@ -109,7 +126,8 @@ CREATE TABLE responsibilities (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (experience_id) REFERENCES professional_experiences(id) ON DELETE CASCADE,
-    INDEX idx_experience_id (experience_id)
+    INDEX idx_experience_id (experience_id),
+    FULLTEXT INDEX ft_description (description)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- ============================================
@@ -155,6 +173,21 @@ CREATE TABLE technology_experiences (
     INDEX idx_experience_id (experience_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- ============================================
+-- Cache Versions
+-- ============================================
+
+-- Write counter per table, bumped by the API after every write; part of the ETag of the entity routes so
+-- two writes within the same second (TIMESTAMP precision) still change it
+CREATE TABLE table_versions (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version BIGINT UNSIGNED NOT NULL DEFAULT 0
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT INTO table_versions (table_name) VALUES
+('companies'), ('technologies'), ('professional_experiences'), ('projects'), ('project_tasks'),
+('responsibilities'), ('technology_projects'), ('company_experiences'), ('technology_experiences');
+
 -- ============================================
 -- Real Portfolio Data
 -- ============================================
@@ -0,0 +1,84 @@
+"""
+Typed database settings
+Parsed and validated once at startup from the environment and the .env file
+"""
+
+import os
+import tempfile
+from typing import Literal, Optional
+
+from pydantic import Field, model_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class DatabaseSettings(BaseSettings):
+    """Connection and pool settings for MySQLService"""
+
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
+
+    host: str = Field(..., min_length=1)
+    db_port: int = Field(..., gt=0, lt=65536)
+    username: str = Field(..., min_length=1)
+    password: str
+    database: str = Field(..., min_length=1)
+
+    db_pool_min_size: int = Field(1, ge=0)
+    db_pool_max_size: int = Field(10, ge=1)
+    db_pool_idle_timeout: float = Field(300.0, ge=0)
+    db_pool_max_lifetime: float = Field(3600.0, ge=0)
+    db_pool_ping_interval: float = Field(30.0, ge=0)
+    db_pool_checkout_timeout: float = Field(10.0, gt=0)
+
+    db_count_cache_size: int = Field(1024, ge=0)
+    db_count_cache_ttl: float = Field(60.0, ge=0)
+
+    # Valid API keys remembered by digest; any revocation empties the cache, the TTL bounds a missed invalidation
+    api_key_cache_size: int = Field(1024, ge=0)
+    api_key_cache_ttl: float = Field(300.0, ge=0)
+    # Seconds between reloads of the revoked key ids, bounds how long a revocation the bus missed goes unseen; 0 disables
+    api_key_revocation_interval: float = Field(30.0, ge=0)
+
+    db_snapshot_debounce: float = Field(0.5, ge=0)
+    # File shared by the workers of one host holding the encoded snapshot, one private copy per worker when unset
+    db_snapshot_path: Optional[str] = None
+    db_versions_ttl: float = Field(1.0, ge=0)
+
+    # process: single worker; shm: workers of one host; redis: workers on several hosts
+    db_invalidation_backend: Literal["process", "shm", "redis"] = "process"
+    db_invalidation_path: str = Field(default_factory=lambda: os.path.join(tempfile.gettempdir(), "portfolio-invalidation.bin"))
+    db_invalidation_poll_interval: float = Field(0.005, gt=0)
+    db_invalidation_redis_url: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_pool_bounds(self) -> "DatabaseSettings":
+        if self.db_pool_min_size > self.db_pool_max_size:
+            raise ValueError("DB_POOL_MIN_SIZE cannot be greater than DB_POOL_MAX_SIZE")
+        return self
+
+    @model_validator(mode="after")
+    def check_snapshot_sharing(self) -> "DatabaseSettings":
+        # Without a shared bus the writes of the other workers never reach the one building the shared snapshot
+        if self.db_snapshot_path and self.db_invalidation_backend == "process":
+            raise ValueError("DB_SNAPSHOT_PATH needs DB_INVALIDATION_BACKEND=shm or redis")
+        return self
+
+    def to_config(self) -> dict:
+        """Return the config dict consumed by MySQLConnection and MySQLConnectionPool"""
+        return {
+            "HOST": self.host,
+            "DB_PORT": self.db_port,
+            "USERNAME": self.username,
+            "PASSWORD": self.password,
+            "DATABASE": self.database,
+            "POOL_MIN_SIZE": self.db_pool_min_size,
+            "POOL_MAX_SIZE": self.db_pool_max_size,
+            "POOL_IDLE_TIMEOUT": self.db_pool_idle_timeout,
+            "POOL_MAX_LIFETIME": self.db_pool_max_lifetime,
+            "POOL_PING_INTERVAL": self.db_pool_ping_interval,
+            "POOL_CHECKOUT_TIMEOUT": self.db_pool_checkout_timeout,
+            "COUNT_CACHE_SIZE": self.db_count_cache_size,
+            "COUNT_CACHE_TTL": self.db_count_cache_ttl,
+            "API_KEY_CACHE_SIZE": self.api_key_cache_size,
+            "API_KEY_CACHE_TTL": self.api_key_cache_ttl,
+            "API_KEY_REVOCATION_INTERVAL": self.api_key_revocation_interval,
+        }
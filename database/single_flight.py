@@ -0,0 +1,65 @@
+"""
+Single-flight coalescing of identical concurrent reads
+Requests asking for the same rows while a query for them is running await that query instead of issuing their own;
+a write to one of the tables read makes later requests start a fresh query rather than join one that may predate it
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Hashable, Iterable, Tuple
+
+
+def freeze(value: Any) -> Hashable:
+    """Hashable form of call arguments (filters dict, field lists, keyset tuples)"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class SingleFlight:
+    """Map of in-flight calls keyed by their arguments, shared by the requests of one event loop"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, Tuple[asyncio.Future, FrozenSet[str]]] = {}
+        self._lock = threading.Lock()
+        self._calls_started = 0
+        self._coalesced = 0
+
+    async def do(self, key: Hashable, tables: Iterable[str], call: Callable[[], Awaitable[Any]]) -> Any:
+        """Await the in-flight call for key, or start call() as the leader; every caller gets the same result object"""
+        with self._lock:
+            entry = self._calls.get(key)
+            if entry is None:
+                future = asyncio.ensure_future(call())
+                entry = (future, frozenset(tables))
+                self._calls[key] = entry
+                future.add_done_callback(lambda _: self._forget(key, future))
+                self._calls_started += 1
+            else:
+                self._coalesced += 1
+        # Shielded so a caller that disconnects does not cancel the query the others are waiting for
+        return await asyncio.shield(entry[0])
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        with self._lock:
+            if key in self._calls and self._calls[key][0] is future:
+                del self._calls[key]
+
+    def invalidate(self, tables: Iterable[str]):
+        """MySQLService write listener: requests arriving after a write do not join calls reading the written tables"""
+        tables = set(tables)
+        with self._lock:
+            for key in [key for key, (_, read) in self._calls.items() if read & tables]:
+                del self._calls[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = self._calls_started + self._coalesced
+            return {
+                "in_flight": len(self._calls),
+                "calls": self._calls_started,
+                "coalesced": self._coalesced,
+                "coalesced_rate": round(self._coalesced / requests, 4) if requests else 0.0,
+            }
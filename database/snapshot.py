@@ -0,0 +1,315 @@
+"""
+Materialized portfolio snapshot
+The full portfolio response is encoded once (JSON, gzip and, when available, brotli) and served from memory;
+writes to the portfolio tables schedule a debounced rebuild on a background thread.
+With a SharedSnapshotStore one worker builds it into a memory-mapped file that every worker serves from
+"""
+
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Callable, Iterable, NamedTuple, Optional, Tuple, Union
+
+from database.portfolio import PORTFOLIO_TABLES
+from database.utils.encoding import dumps
+
+try:
+    import brotli
+except ImportError:  # optional dependency, only the gzip variant is built without it
+    brotli = None
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows, the shared store needs it
+    fcntl = None
+
+# bytes when built by this worker, memoryview slices of the shared file otherwise
+Buffer = Union[bytes, memoryview]
+
+
+class EncodedSnapshot(NamedTuple):
+    """One immutable build of the snapshot, swapped as a whole so readers never see a partial one"""
+    body: Buffer
+    gzip: Optional[Buffer]  # None when the body is too small or gzip does not make it smaller
+    br: Optional[Buffer]    # same, and always None without the optional brotli package
+    etag: str
+    built_at: float
+
+
+def compressed_variant(body: bytes, compress: Callable[[bytes], bytes], minimum_size: int) -> Optional[bytes]:
+    """Compressed body, or None when it is not worth sending (the same rules as CompressionMiddleware)"""
+    if len(body) < minimum_size:
+        return None
+    compressed = compress(body)
+    return compressed if len(compressed) < len(body) else None
+
+
+def encode_snapshot(document: dict, minimum_size: int = 500) -> EncodedSnapshot:
+    """Encode a response document and the compressed variants worth serving"""
+    body = dumps(document)
+    return EncodedSnapshot(
+        body=body,
+        gzip=compressed_variant(body, lambda data: gzip.compress(data, compresslevel=9), minimum_size),
+        br=compressed_variant(body, lambda data: brotli.compress(data, quality=11), minimum_size) if brotli is not None else None,
+        # Weak: the same tag covers the identity and compressed variants
+        etag='W/"' + hashlib.sha256(body).hexdigest()[:32] + '"',
+        built_at=time.time(),
+    )
+
+
+class SharedSnapshotStore:
+    """
+    Snapshot file shared by the workers of one host
+    The writer builds the next version in a temporary file and swaps it in with os.replace, readers mmap the
+    current file and hand out memoryview slices of it; a replaced mapping lives on while responses still use it.
+    Only the worker holding the writer flock builds; the others retry the flock from their rebuild thread and one
+    of them takes over (and rebuilds) when it exits
+
+    File layout: MAGIC, uint32 header length, JSON header {etag, built_at, sections}, then the section bytes
+    """
+
+    MAGIC = b"PSNAP001"
+
+    def __init__(self, path: str):
+        if fcntl is None:
+            raise RuntimeError("The shared snapshot store needs fcntl (POSIX only)")
+        self.path = path
+        self._lock_fd = os.open(path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        self._writer = False
+        self._mapped: Optional[Tuple[Tuple[int, int, int], EncodedSnapshot]] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._loads = 0
+
+    @property
+    def writer(self) -> bool:
+        return self._writer
+
+    def acquire_writer(self) -> bool:
+        """Try to become the worker that builds the snapshot, never blocks"""
+        if not self._writer:
+            try:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self._writer = True
+            except OSError:
+                return False
+        return True
+
+    def write(self, snapshot: EncodedSnapshot):
+        """Publish a new version atomically"""
+        sections = {}
+        payload = []
+        offset = 0
+        for name in ("body", "gzip", "br"):
+            data = getattr(snapshot, name)
+            if data is None:
+                sections[name] = None
+                continue
+            sections[name] = [offset, len(data)]
+            payload.append(data)
+            offset += len(data)
+        header = json.dumps({"etag": snapshot.etag, "built_at": snapshot.built_at, "sections": sections}).encode("utf-8")
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temporary = tempfile.mkstemp(prefix=".snapshot-", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(self.MAGIC + struct.pack("<I", len(header)) + header)
+                for data in payload:
+                    file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            os.chmod(temporary, 0o644)
+            os.replace(temporary, self.path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.unlink(temporary)
+            raise
+        with self._lock:
+            self._writes += 1
+
+    def load(self) -> Optional[EncodedSnapshot]:
+        """Current version as zero-copy slices of the mapped file, remapped when the file was swapped"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            if self._mapped is not None and self._mapped[0] == identity:
+                return self._mapped[1]
+
+            with open(self.path, "rb") as file:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(mapped)
+            if bytes(view[:len(self.MAGIC)]) != self.MAGIC:
+                return None
+            header_length = struct.unpack_from("<I", mapped, len(self.MAGIC))[0]
+            start = len(self.MAGIC) + 4
+            header = json.loads(bytes(view[start:start + header_length]))
+            start += header_length
+
+            def section(name: str) -> Optional[memoryview]:
+                bounds = header["sections"].get(name)
+                if bounds is None:
+                    return None
+                return view[start + bounds[0]:start + bounds[0] + bounds[1]]
+
+            snapshot = EncodedSnapshot(section("body"), section("gzip"), section("br"), header["etag"], header["built_at"])
+            # The previous mapping is not closed, it is released once the responses slicing it are gone
+            self._mapped = (identity, snapshot)
+            self._loads += 1
+            return snapshot
+
+    def close(self):
+        if self._writer:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            self._writer = False
+        os.close(self._lock_fd)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "path": self.path,
+                "writer": self._writer,
+                "writes": self._writes,
+                "loads": self._loads,
+            }
+
+
+class PortfolioSnapshot:
+    """
+    Holder of the current EncodedSnapshot and of the thread rebuilding it
+    build returns a {"success": ..., "data"/"message": ...} result like the connection methods
+    With a store, only the writer worker builds and every worker reads the shared file; the others try to take the
+    writer role over every takeover_interval seconds
+    """
+
+    def __init__(self, build: Callable[[], dict], debounce: float = 0.5, tables: Iterable[str] = PORTFOLIO_TABLES, store: Optional[SharedSnapshotStore] = None, takeover_interval: float = 1.0, minimum_size: int = 500):
+        self.build = build
+        self.debounce = debounce
+        self.minimum_size = minimum_size
+        self.tables = frozenset(tables)
+        self.store = store
+        self.takeover_interval = takeover_interval
+        self._current: Optional[EncodedSnapshot] = None
+        self._condition = threading.Condition()
+        self._dirty_at: Optional[float] = None
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._builds = 0
+        self._failures = 0
+        self._last_error: Optional[str] = None
+        self._last_duration: Optional[float] = None
+
+    @property
+    def current(self) -> Optional[EncodedSnapshot]:
+        """Latest successful build, None until the first one"""
+        if self.store is not None:
+            return self.store.load()
+        return self._current
+
+    def refresh(self) -> bool:
+        """Rebuild synchronously, the previous snapshot is kept when the build fails"""
+        if self.store is not None and not self.store.acquire_writer():
+            # Another worker builds the shared file
+            return False
+
+        started = time.monotonic()
+        try:
+            result = self.build()
+            if not result["success"]:
+                raise RuntimeError(result["message"])
+            snapshot = encode_snapshot(result, self.minimum_size)
+            if self.store is not None:
+                self.store.write(snapshot)
+                snapshot = None
+        except Exception as e:
+            with self._condition:
+                self._failures += 1
+                self._last_error = str(e)
+            return False
+
+        with self._condition:
+            self._current = snapshot
+            self._builds += 1
+            self._last_error = None
+            self._last_duration = time.monotonic() - started
+        return True
+
+    def start(self):
+        """Start the background rebuild thread"""
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="portfolio-snapshot", daemon=True)
+            self._thread.start()
+
+    def schedule(self):
+        """Ask for a rebuild once writes have been quiet for the debounce interval"""
+        with self._condition:
+            self._dirty_at = time.monotonic()
+            self._condition.notify()
+
+    def on_write(self, tables: Iterable[str]):
+        """MySQLService write listener, only writes to the portfolio tables trigger a rebuild"""
+        if self.tables.intersection(tables):
+            self.schedule()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed and self._dirty_at is None:
+                    if self.store is None or self.store.writer:
+                        self._condition.wait()
+                        continue
+                    self._condition.wait(self.takeover_interval)
+                    if not self._closed and self._dirty_at is None and self.store.acquire_writer():
+                        # The previous writer exited, possibly before building its last writes: rebuild right away
+                        self._dirty_at = time.monotonic() - self.debounce
+                if self._closed:
+                    return
+                # Every write inside the window pushes the rebuild back, a burst costs one build
+                remaining = self._dirty_at + self.debounce - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                self._dirty_at = None
+            self.refresh()
+
+    def close(self):
+        """Stop the rebuild thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=5)
+        if self.store is not None:
+            self.store.close()
+
+    def stats(self) -> dict:
+        current = self.current
+        with self._condition:
+            return {
+                "built": current is not None,
+                "built_at": current.built_at if current else None,
+                "size": len(current.body) if current else 0,
+                "gzip_size": len(current.gzip) if current and current.gzip is not None else None,
+                "br_size": len(current.br) if current and current.br is not None else None,
+                # gzip only in a default install, br needs the optional brotli package
+                "encodings": ["gzip", "br"] if brotli is not None else ["gzip"],
+                "builds": self._builds,
+                "failures": self._failures,
+                "last_error": self._last_error,
+                "last_build_seconds": round(self._last_duration, 4) if self._last_duration is not None else None,
+                "pending": self._dirty_at is not None,
+                "shared": self.store.stats() if self.store is not None else None,
+            }
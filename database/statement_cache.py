@@ -0,0 +1,68 @@
+"""
+Compiled SQL statement cache
+SQL text only depends on the shape of a query (entity class, filter fields and match kinds, projection, ...),
+so it is built once per shape and only the params are assembled on each call
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Sequence, Tuple
+
+
+class StatementCache:
+    """Thread-safe, size-bounded LRU of SQL templates with hit/miss counters"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._statements: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_or_build(self, key: Hashable, build: Callable[[], str]) -> str:
+        """Return the cached SQL for key, building it on first use"""
+        with self._lock:
+            statement = self._statements.get(key)
+            if statement is not None:
+                self._statements.move_to_end(key)
+                self._hits += 1
+                return statement
+            self._misses += 1
+
+        # Built outside the lock, an invalid shape raises and is never cached
+        statement = build()
+        with self._lock:
+            self._statements[key] = statement
+            while len(self._statements) > self.max_entries:
+                self._statements.popitem(last=False)
+                self._evictions += 1
+        return statement
+
+    def clear(self):
+        with self._lock:
+            self._statements.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._statements),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+            }
+
+
+def pad_in_params(values: Sequence[Any]) -> Tuple[int, List[Any]]:
+    """
+    Pad the values of an IN (...) list to the next power of two by repeating the last one
+    A handful of templates then cover every list size, returns: (placeholder count, params)
+    """
+    size = 1 << (len(values) - 1).bit_length()
+    return (size, list(values) + [values[-1]] * (size - len(values)))
+
+
+# Shared by every entity class of the process
+statement_cache = StatementCache()
@@ -0,0 +1,34 @@
+"""
+JSON encoding of database rows
+orjson when installed (datetime and date are encoded natively, in C), the json module otherwise; both give the same bytes
+"""
+
+import json
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import Decimal
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional speedup, the json module is used without it
+    orjson = None
+
+
+def json_default(value: Any) -> Any:
+    """Encode the column types pymysql returns the way FastAPI does"""
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON, dict keys that are not strings (rows keyed by id) are written as strings"""
+    if orjson is not None:
+        return orjson.dumps(content, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False, default=json_default).encode("utf-8")
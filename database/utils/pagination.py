@@ -0,0 +1,42 @@
+import base64
+import json
+from typing import Any, Optional, Sequence, Tuple
+
+
+def encode_cursor(position: Sequence[Any], sort: Optional[str] = None) -> str:
+    """
+    Encode the sort key values of the last row of a page into an opaque, URL-safe cursor
+    Without a sort the position is the last id alone
+    """
+    if sort is None:
+        payload = {"after": position[0]}
+    else:
+        payload = {"after": list(position), "sort": sort}
+    data = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, Optional[str]]:
+    """
+    Decode a cursor produced by encode_cursor, raising ValueError when it is malformed
+    Returns: (last id or tuple of sort key values, sort)
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        position = payload["after"]
+        sort = payload.get("sort")
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    if sort is not None:
+        if not isinstance(sort, str) or not isinstance(position, list) or not position:
+            raise ValueError("Invalid cursor")
+        # null is a valid value of a nullable sort key, checked against the entity by the caller
+        if any(isinstance(value, (list, dict)) for value in position):
+            raise ValueError("Invalid cursor")
+        return (tuple(position), sort)
+
+    if not isinstance(position, int) or isinstance(position, bool) or position < 0:
+        raise ValueError("Invalid cursor")
+    return (position, None)
@@ -1,7 +1,82 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
 
 def get_password_hash(password: str) -> str:
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
\ No newline at end of file
+    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+
+class PasswordPoolFull(Exception):
+    """Raised instead of queueing when the password pool already has max_queue calls waiting"""
+
+
+class PasswordPool:
+    """
+    Dedicated, bounded thread pool for bcrypt (it releases the GIL, so threads hash in parallel)
+    Keeps slow hashes off the event loop and off the database threads; past max_queue waiting calls new ones fail fast
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 8):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._seconds = 0.0
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.submit(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self.submit(get_password_hash, password)
+
+    async def submit(self, fn, *args):
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise PasswordPoolFull("Too many password checks in progress, retry later")
+            self._in_flight += 1
+        try:
+            future = self.executor.submit(self.timed, fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Released when the thread is done, not when the caller stops waiting: a cancelled login still holds a worker
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future=None):
+        with self._lock:
+            self._in_flight -= 1
+
+    def timed(self, fn, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._completed += 1
+                self._seconds += time.perf_counter() - started
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queued": max(0, self._in_flight - self.max_workers),
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_seconds": round(self._seconds / self._completed, 4) if self._completed else 0.0,
+            }
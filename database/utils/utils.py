@@ -1,23 +1,24 @@
-from decouple import config
+from datetime import datetime, timedelta, timezone
 import jwt
-from database.entities.api_db_entities import ApiUser
+from database.entities.api_db_entities import ApiUser, ApiKeyInDB
+from middleware.settings import get_auth_settings
 
 def generate_token_for_api_user(api_user: ApiUser) -> str:
     """Generate token for API entities"""
-    token = jwt.encode(api_user.model_dump(), config('SECRET_KEY'), algorithm="HS256")
+    settings = get_auth_settings()
+    token = jwt.encode(api_user.model_dump(), settings.secret_key, algorithm=settings.algorithm)
     return token
 
 
-def verify_token(token: str | None) -> bool:
-    """Verify token"""
-    if not token:
-        return False
-
-    try:
-        if token.startswith("Bearer "):
-            token = token[7:]
+def generate_token_for_api_key(api_key: ApiKeyInDB) -> str:
+    """Generate a short-lived token for a machine client; key_id lets the verifier reject it once the key is revoked"""
+    settings = get_auth_settings()
+    payload = {
+        "api_key": api_key.name,
+        "key_id": api_key.id,
+        "key_prefix": api_key.key_prefix,
+        "exp": datetime.now(timezone.utc) + timedelta(minutes=settings.api_key_token_expire_minutes),
+    }
+    token = jwt.encode(payload, settings.secret_key, algorithm=settings.algorithm)
+    return token
 
-        jwt.decode(token, config('SECRET_KEY'), algorithms=["HS256"])
-        return True
-    except Exception as e:
-        return False
@@ -0,0 +1,149 @@
+"""
+Cheap change tokens for the portfolio tables
+A table's version is its row count, highest id, newest row timestamp and the write counter kept in table_versions
+(bumped by MySQLService.after_write, so two writes within the same second still differ), read for several tables in
+one round trip and cached for a short TTL; writes done by this process expire the cached state so they are visible
+immediately. The ETag token only depends on those database values, so every worker (and every restart) computes the
+same one
+"""
+
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+# Tables without an updated_at column, their rows are only ever inserted or deleted
+TIMESTAMP_COLUMNS: Dict[str, str] = {
+    "technology_projects": "created_at",
+    "company_experiences": "created_at",
+    "technology_experiences": "created_at",
+}
+
+
+def get_timestamp_column(table: str) -> str:
+    return TIMESTAMP_COLUMNS.get(table, "updated_at")
+
+
+def get_versions_query(tables: Iterable[str]) -> str:
+    """One UNION ALL query returning (table_name, total, max_id, changed_at, version) for every table"""
+    return " UNION ALL ".join(
+        f"SELECT '{table}' AS table_name, COUNT(*) AS total, MAX(id) AS max_id, MAX({get_timestamp_column(table)}) AS changed_at, "
+        f"(SELECT COALESCE(MAX(version), 0) FROM table_versions WHERE table_name = '{table}') AS version FROM {table}"
+        for table in tables
+    )
+
+
+class TableState(NamedTuple):
+    total: int
+    max_id: Optional[int]           # a delete plus an insert within the same second still moves it
+    latest: Optional[datetime]      # newest row timestamp as read from the table
+    changed_at: Optional[datetime]  # latest, or when a change without a newer timestamp (a delete) was first seen
+    version: int                    # write counter from table_versions
+    writes: int                     # writes done through this process when the state was read
+    expires_at: float
+
+
+class TableVersion(NamedTuple):
+    """Version of a set of tables, as sent in ETag and Last-Modified"""
+    token: str
+    last_modified: Optional[datetime]
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """MySQL TIMESTAMP columns come back naive in the session time zone, which is UTC for the API"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+class TableVersionTracker:
+    """
+    Thread-safe cache of per-table versions
+    fetch receives table names and returns {table: (row count, highest id, newest timestamp, write counter)} in a single query
+    """
+
+    def __init__(self, fetch: Callable[[Tuple[str, ...]], Dict[str, Tuple[int, Optional[int], Optional[datetime], int]]], ttl: float = 1.0):
+        self.fetch = fetch
+        self.ttl = ttl
+        self._states: Dict[str, TableState] = {}
+        self._writes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def cached_version(self, tables: Iterable[str]) -> Optional[TableVersion]:
+        """Version from the cache alone, None when a table has to be read again"""
+        tables = sorted(set(tables))
+        now = time.monotonic()
+        with self._lock:
+            states = [self._states.get(table) for table in tables]
+            if any(state is None or state.expires_at < now for state in states):
+                self._misses += 1
+                return None
+            self._hits += 1
+            return self.combine(tables, states)
+
+    def version(self, tables: Iterable[str]) -> TableVersion:
+        """Version of the given tables, reading the stale ones from the database (blocking)"""
+        cached = self.cached_version(tables)
+        if cached is not None:
+            return cached
+
+        tables = sorted(set(tables))
+        with self._lock:
+            now = time.monotonic()
+            stale = tuple(table for table in tables if table not in self._states or self._states[table].expires_at < now)
+            writes = {table: self._writes.get(table, 0) for table in stale}
+
+        rows = self.fetch(stale) if stale else {}
+
+        with self._lock:
+            expires_at = time.monotonic() + self.ttl
+            for table in stale:
+                total, max_id, latest, version = rows[table]
+                latest = as_utc(latest)
+                previous = self._states.get(table)
+                if previous is None:
+                    changed_at = latest
+                elif (previous.total, previous.max_id, previous.latest, previous.version) == (total, max_id, latest, version):
+                    changed_at = previous.changed_at
+                elif latest is not None and (previous.changed_at is None or latest > previous.changed_at):
+                    changed_at = latest
+                else:
+                    # Rows went away or changed without a newer timestamp (a delete, a same-second update), date the
+                    # change when it was first seen; only Last-Modified uses it, the ETag token changes with the counter
+                    changed_at = datetime.now(timezone.utc)
+                # A write that landed while reading may be missing from the counts, read the table again next time
+                expired = self._writes.get(table, 0) != writes[table]
+                self._states[table] = TableState(total, max_id, latest, changed_at, version, writes[table], 0.0 if expired else expires_at)
+            return self.combine(tables, [self._states[table] for table in tables])
+
+    def combine(self, tables, states) -> TableVersion:
+        # Database values only: no process-local counters or clocks, or other workers would not recognise the ETag
+        digest = hashlib.sha256()
+        for table, state in zip(tables, states):
+            digest.update(f"{table}:{state.total}:{state.max_id}:{state.latest.isoformat() if state.latest else ''}:{state.version};".encode("utf-8"))
+        modified = [state.changed_at for state in states if state.changed_at is not None]
+        return TableVersion(digest.hexdigest()[:32], max(modified) if modified else None)
+
+    def invalidate(self, tables: Iterable[str]):
+        """MySQLService write listener: force the written tables to be read again on the next request"""
+        with self._lock:
+            for table in tables:
+                self._writes[table] = self._writes.get(table, 0) + 1
+                if table in self._states:
+                    # Kept, expired, so the next read can tell a delete apart from an unchanged table
+                    self._states[table] = self._states[table]._replace(expires_at=0.0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "tables": len(self._states),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
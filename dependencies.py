@@ -0,0 +1,47 @@
+"""
+FastAPI dependencies - expose the process-wide services created in the application lifespan
+"""
+
+from fastapi import Request
+from auth import AuthController
+from database.client import AsyncMySQLService
+from database.snapshot import PortfolioSnapshot
+from database.versions import TableVersionTracker
+from middleware.auth import TokenVerifier
+from middleware.response_cache import ResponseCache
+from portfolio_controller import PortfolioController
+
+
+def get_db_service(request: Request) -> AsyncMySQLService:
+    """Return the database service created at startup"""
+    return request.app.state.db_service
+
+
+def get_portfolio_controller(request: Request) -> PortfolioController:
+    """Return the portfolio controller bound to the process-wide database service"""
+    return request.app.state.portfolio_controller
+
+
+def get_portfolio_snapshot(request: Request) -> PortfolioSnapshot:
+    """Return the materialized portfolio snapshot kept up to date in the background"""
+    return request.app.state.portfolio_snapshot
+
+
+def get_table_versions(request: Request) -> TableVersionTracker:
+    """Return the table version tracker behind ETag/Last-Modified"""
+    return request.app.state.table_versions
+
+
+def get_response_cache(request: Request) -> ResponseCache:
+    """Return the in-process GET response cache"""
+    return request.app.state.response_cache
+
+
+def get_token_verifier(request: Request) -> TokenVerifier:
+    """Return the bearer token verifier used by the auth middleware"""
+    return request.app.state.token_verifier
+
+
+def get_auth_controller(request: Request) -> AuthController:
+    """Return the auth controller bound to the process-wide database service"""
+    return request.app.state.auth_controller
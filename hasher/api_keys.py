@@ -0,0 +1,58 @@
+"""
+Create or revoke API keys for machine clients
+
+    python -m hasher.api_keys create "deploy bot"
+    python -m hasher.api_keys revoke 3
+
+The key is printed once on creation, only its SHA-256 digest is stored. A revocation is published on the
+invalidation bus configured in .env, so with shm or redis running workers drop the key straight away; the process
+bus does not leave this command, and workers then see it on their next reload of the revoked ids
+(API_KEY_REVOCATION_INTERVAL)
+"""
+
+import argparse
+
+from database.client import MySQLService
+from database.invalidation import create_invalidation_bus
+from database.settings import DatabaseSettings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage API keys")
+    commands = parser.add_subparsers(dest="command", required=True)
+    create = commands.add_parser("create", help="create a key and print it")
+    create.add_argument("name")
+    revoke = commands.add_parser("revoke", help="revoke a key by id")
+    revoke.add_argument("id", type=int)
+    args = parser.parse_args()
+
+    settings = DatabaseSettings()
+    service = MySQLService(settings)
+    service.set_invalidation_bus(create_invalidation_bus(
+        settings.db_invalidation_backend,
+        path=settings.db_invalidation_path,
+        poll_interval=settings.db_invalidation_poll_interval,
+        redis_url=settings.db_invalidation_redis_url,
+    ))
+    try:
+        if args.command == "create":
+            result = service.create_api_key(args.name)
+            if result["success"]:
+                print(f"id: {result['id']}")
+                print(f"api_key: {result['api_key']}")
+                print("Store it now, it cannot be shown again")
+                return
+        else:
+            result = service.revoke_api_key(args.id)
+            if result["success"]:
+                print(result["message"])
+                if settings.db_invalidation_backend == "process":
+                    print(f"Running workers reject it within {settings.api_key_revocation_interval:g} seconds (API_KEY_REVOCATION_INTERVAL)")
+                return
+        raise SystemExit(result["message"])
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
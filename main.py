@@ -1,14 +1,22 @@
 """
 FastAPI API with OAuth2 authentication and IP whitelist
 """
-from fastapi import FastAPI, Request, Depends
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
-from starlette.responses import JSONResponse
-from starlette.status import HTTP_401_UNAUTHORIZED
-from decouple import config
 
-from database.utils.utils import verify_token
+from auth import AuthController
+from database.client import MySQLService, AsyncMySQLService
+from database.settings import DatabaseSettings
+from database.utils.password import PasswordPool
+from database.invalidation import create_invalidation_bus
+from database.snapshot import PortfolioSnapshot, SharedSnapshotStore
+from database.single_flight import SingleFlight
+from responses import RowsJSONResponse
+from database.versions import TableVersionTracker
+from middleware import AuthMiddleware, CompressionMiddleware, CompressionSettings, ConditionalGetMiddleware, IPAllowlist, ResponseCache, ResponseCacheMiddleware, ResponseCacheSettings, TokenVerifier, get_auth_settings, get_compressors
+from portfolio_controller import PortfolioController
 from routers import (
     auth,
     companies,
@@ -19,14 +27,99 @@ from routers import (
     responsibilities,
     technology_projects,
     company_experiences,
-    technology_experiences
+    technology_experiences,
+    portfolio,
+    metrics
 )
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the process-wide database service once and share it through app.state"""
+    # Invalid or missing settings raise here and abort startup instead of failing on the first request
+    settings = DatabaseSettings()
+    cache_settings = ResponseCacheSettings()
+    compression_settings = CompressionSettings()
+    # The same instance signs the tokens issued by /auth/token
+    auth_settings = get_auth_settings()
+    service = MySQLService(settings)
+    service.pool.open()
+    # Later revocations reload it through the api_keys write listener, the invalidation bus and a periodic reload
+    service.api_key_cache.refresh_revoked()
+    service.api_key_cache.start()
+    db_service = AsyncMySQLService(
+        service,
+        password_pool=PasswordPool(max_workers=auth_settings.password_pool_size, max_queue=auth_settings.password_queue_size),
+    )
+
+    # Built before serving; an unreachable database already aborted startup in pool.open(), if the build itself fails
+    # /portfolio answers with live queries until a rebuild succeeds
+    # With a shared path one worker builds the snapshot file and every worker maps it, instead of one copy each
+    store = SharedSnapshotStore(settings.db_snapshot_path) if settings.db_snapshot_path else None
+    snapshot = PortfolioSnapshot(
+        service.find_portfolio,
+        debounce=settings.db_snapshot_debounce,
+        store=store,
+        minimum_size=compression_settings.compression_minimum_size,
+    )
+    snapshot.refresh()
+    snapshot.start()
+    service.add_write_listener(snapshot.on_write)
+
+    table_versions = TableVersionTracker(service.find_table_versions, ttl=settings.db_versions_ttl)
+    service.add_write_listener(table_versions.invalidate)
+
+    response_cache = ResponseCache(
+        max_entries=cache_settings.response_cache_size,
+        ttl=cache_settings.response_cache_ttl,
+        max_bytes=cache_settings.response_cache_max_bytes,
+        max_entry_bytes=cache_settings.response_cache_max_entry_bytes,
+    )
+    service.add_write_listener(response_cache.invalidate)
+
+    single_flight = SingleFlight()
+    service.add_write_listener(single_flight.invalidate)
+
+    # Registered last so the other workers' writes reach every listener above
+    bus = create_invalidation_bus(
+        settings.db_invalidation_backend,
+        path=settings.db_invalidation_path,
+        poll_interval=settings.db_invalidation_poll_interval,
+        redis_url=settings.db_invalidation_redis_url,
+    )
+    service.set_invalidation_bus(bus)
+    bus.start()
+
+    # Read once here instead of from the environment on every request
+    app.state.white_list_ips = IPAllowlist(auth_settings.white_list)
+    app.state.trusted_proxies = IPAllowlist(auth_settings.trusted_proxy_list)
+    app.state.token_verifier = TokenVerifier(
+        auth_settings.secret_key,
+        algorithm=auth_settings.algorithm,
+        max_entries=auth_settings.token_cache_size,
+        ttl=auth_settings.token_cache_ttl,
+        is_revoked=service.api_key_cache.is_revoked,
+    )
+    app.state.db_service = db_service
+    app.state.portfolio_snapshot = snapshot
+    app.state.table_versions = table_versions
+    app.state.response_cache = response_cache
+    app.state.portfolio_controller = PortfolioController(service=db_service, single_flight=single_flight)
+    app.state.auth_controller = AuthController(service=db_service)
+    try:
+        yield
+    finally:
+        snapshot.close()
+        db_service.close()
+
+
 app = FastAPI(
     title="Portfolio API",
     description="Portfolio API with OAuth2 authentication, companies, technologies, experiences, and projects",
-    version="1.0.0"
+    version="1.0.0",
+    # Any dict a route returns is encoded with orjson (when installed) instead of the json module
+    default_response_class=RowsJSONResponse,
+    lifespan=lifespan
 )
 
 PUBLIC_PATHS = [
@@ -47,6 +140,40 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+# Table read by the routes under each prefix, used for the response cache and ETag/Last-Modified
+# (/portfolio is left out, it is served from its own snapshot)
+ROUTE_TABLES = {
+    "/companies": "companies",
+    "/technologies": "technologies",
+    "/experiences": "professional_experiences",
+    "/projects": "projects",
+    "/project-tasks": "project_tasks",
+    "/responsibilities": "responsibilities",
+    "/technology-projects": "technology_projects",
+    "/company-experiences": "company_experiences",
+    "/technology-experiences": "technology_experiences",
+}
+# Added first so it runs inside ConditionalGetMiddleware and can key entries on the table version
+app.add_middleware(ResponseCacheMiddleware, route_tables=ROUTE_TABLES)
+app.add_middleware(ConditionalGetMiddleware, route_tables=ROUTE_TABLES)
+# Outside the response cache, so cached entries hold the identity body and collect their compressed variants
+compression_settings = CompressionSettings()
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=compression_settings.compression_minimum_size,
+    thread_size=compression_settings.compression_thread_size,
+    compressors=get_compressors(
+        gzip_level=compression_settings.compression_gzip_level,
+        brotli_quality=compression_settings.compression_brotli_quality,
+        zstd_level=compression_settings.compression_zstd_level,
+    ),
+)
+
+# Authentication, outside everything but CORS so it rejects before any other work
+app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
+app.add_middleware(AuthMiddleware, public_paths=PUBLIC_PATHS)
+# Added last so it is the outermost middleware: CORS headers are computed per request, for the Origin it sends,
+# and are never stored by the response cache or skipped by 304s, 401s and preflights answered further in
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -55,21 +182,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Authentication
-app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
-@app.middleware("http")
-async def verify_token_middleware(request: Request, call_next):
-    if any(request.url.path.startswith(path) for path in PUBLIC_PATHS):
-        return await call_next(request)
-    white_list_ips = config("WHITE_LIST_IPS").split(",")
-    if request.client.host in white_list_ips:
-        return await call_next(request)
-    headers = request.headers
-    bearer_token = headers.get("authorization")
-    valid_token = verify_token(token=bearer_token)
-    if valid_token:
-        return await call_next(request)
-    return JSONResponse({"detail": "Invalid token"}, status_code=HTTP_401_UNAUTHORIZED)
 # Portfolio Entities
 app.include_router(companies.router, prefix="/companies", tags=["Companies"], dependencies=[Depends(HTTPBearer())])
 app.include_router(technologies.router, prefix="/technologies", tags=["Technologies"], dependencies=[Depends(HTTPBearer())])
@@ -82,3 +194,9 @@ app.include_router(responsibilities.router, prefix="/responsibilities", tags=["R
 app.include_router(technology_projects.router, prefix="/technology-projects", tags=["Technology-Project Relations"], dependencies=[Depends(HTTPBearer())])
 app.include_router(company_experiences.router, prefix="/company-experiences", tags=["Company-Experience Relations"], dependencies=[Depends(HTTPBearer())])
 app.include_router(technology_experiences.router, prefix="/technology-experiences", tags=["Technology-Experience Relations"], dependencies=[Depends(HTTPBearer())])
+
+# Aggregates
+app.include_router(portfolio.router, prefix="/portfolio", tags=["Portfolio"], dependencies=[Depends(HTTPBearer())])
+
+# Monitoring
+app.include_router(metrics.router, prefix="/metrics", tags=["Metrics"], dependencies=[Depends(HTTPBearer())])
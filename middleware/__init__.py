@@ -0,0 +1,26 @@
+"""
+ASGI middleware package
+"""
+
+from middleware.allowlist import IPAllowlist, client_ip
+from middleware.auth import AuthMiddleware, TokenVerifier
+from middleware.compression import CompressionMiddleware, get_compressors
+from middleware.conditional import ConditionalGetMiddleware
+from middleware.response_cache import ResponseCache, ResponseCacheMiddleware
+from middleware.settings import AuthSettings, CompressionSettings, ResponseCacheSettings, get_auth_settings
+
+__all__ = [
+    "AuthMiddleware",
+    "AuthSettings",
+    "CompressionMiddleware",
+    "CompressionSettings",
+    "IPAllowlist",
+    "ConditionalGetMiddleware",
+    "ResponseCache",
+    "ResponseCacheMiddleware",
+    "ResponseCacheSettings",
+    "TokenVerifier",
+    "client_ip",
+    "get_auth_settings",
+    "get_compressors"
+]
@@ -0,0 +1,73 @@
+"""
+IP allowlists with CIDR ranges
+Entries (single addresses or networks, IPv4 or IPv6) are compiled once into sorted, merged integer intervals per
+address family; a lookup is one ip_address parse and one bisect, whatever the number of ranges
+"""
+
+import ipaddress
+from bisect import bisect_right
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+
+class IPAllowlist:
+    """
+    Immutable set of networks, e.g. IPAllowlist(["10.0.0.0/16", "192.168.1.7", "2001:db8::/32"])
+    Entries that are not addresses (like the "testclient" host of Starlette's TestClient) match literally
+    """
+
+    def __init__(self, entries: Iterable[str]):
+        ranges: Dict[int, List[Tuple[int, int]]] = {4: [], 6: []}
+        literals = set()
+        for entry in entries:
+            entry = entry.strip()
+            if not entry:
+                continue
+            try:
+                network = ipaddress.ip_network(entry, strict=False)
+            except ValueError:
+                literals.add(entry)
+                continue
+            ranges[network.version].append((int(network.network_address), int(network.broadcast_address)))
+
+        self.literals: FrozenSet[str] = frozenset(literals)
+        self._starts: Dict[int, List[int]] = {}
+        self._ends: Dict[int, List[int]] = {}
+        for version, intervals in ranges.items():
+            merged: List[Tuple[int, int]] = []
+            for start, end in sorted(intervals):
+                if merged and start <= merged[-1][1] + 1:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+                else:
+                    merged.append((start, end))
+            self._starts[version] = [start for start, _ in merged]
+            self._ends[version] = [end for _, end in merged]
+
+    def __contains__(self, host: Optional[str]) -> bool:
+        if not host:
+            return False
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            return host in self.literals
+        if address.version == 6 and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+        value = int(address)
+        index = bisect_right(self._starts[address.version], value) - 1
+        return index >= 0 and value <= self._ends[address.version][index]
+
+    def __len__(self) -> int:
+        return len(self.literals) + len(self._starts[4]) + len(self._starts[6])
+
+
+def client_ip(peer: Optional[str], forwarded_for: Optional[str], trusted_proxies: IPAllowlist) -> Optional[str]:
+    """
+    Address of the client, read from X-Forwarded-For only when the request came through a trusted proxy
+    The header is walked from the right, skipping the trusted proxies, so a client cannot spoof it by sending its own
+    """
+    if not forwarded_for or peer not in trusted_proxies:
+        return peer
+    hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if hop not in trusted_proxies:
+            return hop
+    return hops[0] if hops else peer
@@ -0,0 +1,143 @@
+"""
+Authentication middleware and bearer token verification
+Tokens that passed a full HS256 check are remembered by their SHA-256 digest (the raw token is not kept) in a bounded
+LRU, until their exp claim or the cache TTL, whichever comes first; repeat callers skip jwt.decode entirely.
+Tokens issued for an API key carry its key_id and are rejected, cached or not, once the key is revoked
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional, Tuple
+
+import jwt
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from middleware.allowlist import client_ip
+
+
+class TokenVerifier:
+    """Thread-safe verifier of Authorization headers with an LRU of verified token digests"""
+
+    def __init__(self, secret_key: str, algorithm: str = "HS256", max_entries: int = 4096, ttl: float = 300.0, is_revoked: Optional[Callable[[int], bool]] = None):
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # ApiKeyCache.is_revoked in the app, checked for tokens carrying a key_id
+        self.is_revoked = is_revoked
+        self._verified: "OrderedDict[bytes, Tuple[float, Optional[int]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._rejected = 0
+        self._evictions = 0
+
+    def verify(self, authorization: Optional[str]) -> bool:
+        """Whether an Authorization header (with or without the Bearer prefix) carries a valid token"""
+        if not authorization:
+            return False
+        token = authorization[7:] if authorization.startswith("Bearer ") else authorization
+        digest = hashlib.sha256(token.encode("utf-8")).digest()
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._verified.get(digest)
+            if entry is not None:
+                expires_at, key_id = entry
+                if expires_at > now and not self.revoked(key_id):
+                    self._verified.move_to_end(digest)
+                    self._hits += 1
+                    return True
+                del self._verified[digest]
+            self._misses += 1
+
+        try:
+            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+        except Exception:
+            with self._lock:
+                self._rejected += 1
+            return False
+
+        key_id = payload.get("key_id")
+        if self.revoked(key_id):
+            with self._lock:
+                self._rejected += 1
+            return False
+
+        lifetime = self.ttl
+        if isinstance(payload.get("exp"), (int, float)):
+            lifetime = min(lifetime, payload["exp"] - time.time())
+        if lifetime > 0 and self.max_entries > 0:
+            with self._lock:
+                self._verified[digest] = (now + lifetime, key_id)
+                self._verified.move_to_end(digest)
+                while len(self._verified) > self.max_entries:
+                    self._verified.popitem(last=False)
+                    self._evictions += 1
+        return True
+
+    def revoked(self, key_id: Optional[int]) -> bool:
+        return key_id is not None and self.is_revoked is not None and self.is_revoked(key_id)
+
+    def clear(self):
+        with self._lock:
+            self._verified.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._verified),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "rejected": self._rejected,
+                "evictions": self._evictions,
+            }
+
+
+class AuthMiddleware:
+    """
+    Pure ASGI gate in front of every HTTP request
+    Public prefixes pass straight through; other requests need a whitelisted client address or a valid bearer token,
+    looked up on app.state (IPAllowlist, trusted proxies, TokenVerifier), and are otherwise rejected with a prebuilt 401
+    """
+
+    UNAUTHORIZED_BODY = b'{"detail":"Invalid token"}'
+
+    def __init__(self, app: ASGIApp, public_paths: Iterable[str]):
+        self.app = app
+        # str.startswith with a tuple tries every prefix in C
+        self.public_prefixes = tuple(public_paths)
+        self.unauthorized_start: Message = {
+            "type": "http.response.start",
+            "status": 401,
+            "headers": [
+                (b"content-length", str(len(self.UNAUTHORIZED_BODY)).encode("latin-1")),
+                (b"content-type", b"application/json"),
+            ],
+        }
+        self.unauthorized_body: Message = {"type": "http.response.body", "body": self.UNAUTHORIZED_BODY}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(self.public_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        state = scope["app"].state
+        authorization = forwarded_for = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value.decode("latin-1")
+            elif name == b"x-forwarded-for":
+                forwarded_for = value.decode("latin-1")
+
+        peer = scope["client"][0] if scope.get("client") else None
+        if client_ip(peer, forwarded_for, state.trusted_proxies) in state.white_list_ips or state.token_verifier.verify(authorization):
+            await self.app(scope, receive, send)
+            return
+
+        await send(self.unauthorized_start)
+        await send(self.unauthorized_body)
@@ -0,0 +1,135 @@
+"""
+Response compression negotiated with Accept-Encoding
+gzip always, br and zstd when the optional brotli and zstandard packages are installed. Bodies under the minimum size
+are sent as they are, large ones are compressed in the thread pool, and responses served by the ResponseCache keep
+their compressed variants in the cache entry so the same bytes are never compressed twice
+"""
+
+import gzip
+from typing import Callable, Dict, Optional, Set
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional dependency, br is not offered without it
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency, zstd is not offered without it
+    zstandard = None
+
+# Only text formats are worth compressing
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml")
+
+
+def accepted_encodings(accept_encoding: str) -> Set[str]:
+    """Content codings of an Accept-Encoding header, without the ones refused with q=0"""
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = params.strip().replace(" ", "")
+        if coding and quality not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def get_compressors(gzip_level: int = 6, brotli_quality: int = 5, zstd_level: int = 3) -> Dict[str, Callable[[bytes], bytes]]:
+    """Available codings in order of preference"""
+    compressors: Dict[str, Callable[[bytes], bytes]] = {}
+    if zstandard is not None:
+        compressors["zstd"] = zstandard.ZstdCompressor(level=zstd_level).compress
+    if brotli is not None:
+        compressors["br"] = lambda body: brotli.compress(body, quality=brotli_quality)
+    compressors["gzip"] = lambda body: gzip.compress(body, compresslevel=gzip_level)
+    return compressors
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware compressing single-message responses
+    Streamed responses (more_body) and responses that already carry a Content-Encoding are left untouched
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 500, thread_size: int = 64 * 1024, compressors: Optional[Dict[str, Callable[[bytes], bytes]]] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_size = thread_size
+        self.compressors = compressors if compressors is not None else get_compressors()
+
+    def choose(self, accept_encoding: str) -> Optional[str]:
+        accepted = accepted_encodings(accept_encoding)
+        for coding in self.compressors:
+            if coding in accepted or "*" in accepted:
+                return coding
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        coding = self.choose(Headers(scope=scope).get("accept-encoding", ""))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+
+        async def send_compressed(message: Message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Held back until the body shows whether it is worth compressing
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            pending, start = start, None
+            headers = MutableHeaders(scope=pending)
+            body = message.get("body", b"")
+            if (message.get("more_body", False) or "content-encoding" in headers or len(body) < self.minimum_size
+                    or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)):
+                await send(pending)
+                await send(message)
+                return
+
+            compressed = await self.compress(scope, coding, body)
+            if len(compressed) >= len(body):
+                # Incompressible content, the identity body is cheaper to send
+                await send(pending)
+                await send(message)
+                return
+            headers["content-encoding"] = coding
+            headers["content-length"] = str(len(compressed))
+            vary = headers.get("vary")
+            if vary is None:
+                headers["vary"] = "Accept-Encoding"
+            elif "accept-encoding" not in vary.lower():
+                headers["vary"] = f"{vary}, Accept-Encoding"
+            await send(pending)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+    async def compress(self, scope: Scope, coding: str, body: bytes) -> bytes:
+        # Set by ResponseCacheMiddleware when the body is (or is being stored as) a cache entry
+        cache_key = scope.get("response_cache_key")
+        cache = getattr(scope["app"].state, "response_cache", None) if cache_key is not None and "app" in scope else None
+        if cache is not None:
+            compressed = cache.get_variant(cache_key, coding)
+            if compressed is not None:
+                return compressed
+
+        compress = self.compressors[coding]
+        if len(body) >= self.thread_size:
+            compressed = await run_in_threadpool(compress, body)
+        else:
+            compressed = compress(body)
+
+        if cache is not None:
+            cache.set_variant(cache_key, coding, compressed)
+        return compressed
@@ -0,0 +1,104 @@
+"""
+Conditional GETs for the entity routes
+ETag and Last-Modified come from the version of the tables a request reads, so a matching If-None-Match
+(or If-Modified-Since) is answered with 304 before the route runs its queries or serializes anything
+"""
+
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from database.versions import TableVersion
+from middleware.routes import resolve_tables
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+
+def not_modified_since(if_modified_since: str, last_modified) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since is None or since.tzinfo is None:
+        return False
+    return last_modified.replace(microsecond=0) <= since
+
+
+class ConditionalGetMiddleware:
+    """
+    Pure ASGI middleware adding ETag/Last-Modified to successful GETs of the mapped routes
+    route_tables maps a path prefix to the table its routes read (see resolve_tables).
+    The TableVersionTracker and the database service are looked up on app.state, so requests before startup pass through
+    """
+
+    def __init__(self, app: ASGIApp, route_tables: Dict[str, str]):
+        self.app = app
+        self.route_tables = route_tables
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        tables = resolve_tables(self.route_tables, scope["path"], scope.get("query_string", b""))
+        state = scope["app"].state if "app" in scope else None
+        tracker = getattr(state, "table_versions", None)
+        if not tables or tracker is None:
+            await self.app(scope, receive, send)
+            return
+
+        version = tracker.cached_version(tables)
+        if version is None:
+            try:
+                version = await state.db_service.run(tracker.version, tables)
+            except Exception:
+                # Without a version the request is served normally, just not cacheable
+                await self.app(scope, receive, send)
+                return
+
+        # Lets the response cache further down key its entries on the same version
+        scope["table_version"] = version.token
+        headers = self.version_headers(version)
+        request_headers = Headers(scope=scope)
+        if_none_match = request_headers.get("if-none-match")
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_none_match is not None:
+            not_modified = etag_matches(if_none_match, headers["etag"])
+        else:
+            not_modified = bool(if_modified_since and version.last_modified and not_modified_since(if_modified_since, version.last_modified))
+
+        if not_modified:
+            await send({"type": "http.response.start", "status": 304, "headers": [(k.encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_version(message: Message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                response_headers = MutableHeaders(scope=message)
+                for key, value in headers.items():
+                    response_headers[key] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_version)
+
+    def version_headers(self, version: TableVersion) -> Dict[str, str]:
+        # ETags are scoped to a URL by clients, so the table version alone identifies the representation
+        headers = {
+            "etag": f'W/"{version.token}"',
+            "cache-control": "private, no-cache",
+        }
+        if version.last_modified is not None:
+            headers["last-modified"] = format_datetime(version.last_modified, usegmt=True)
+        return headers
@@ -0,0 +1,191 @@
+"""
+In-process cache of GET responses
+Entries are keyed by path and normalized query string, bounded by count and bytes (LRU) and by a TTL,
+and dropped as soon as one of the tables they were built from is written
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from middleware.routes import resolve_tables
+
+
+class CachedResponse(NamedTuple):
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    tables: FrozenSet[str]
+    expires_at: float
+    variants: Dict[str, bytes]  # compressed bodies by content coding, added by CompressionMiddleware
+
+
+def normalize_query(query_string: bytes) -> str:
+    """Query string with its params sorted, so ?a=1&b=2 and ?b=2&a=1 share an entry"""
+    return urlencode(sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)))
+
+
+class ResponseCache:
+    """Thread-safe LRU of responses with a TTL and per-table invalidation"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 30.0, max_bytes: int = 32 * 1024 * 1024, max_entry_bytes: int = 1024 * 1024):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+        self._variant_hits = 0
+
+    def generation(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        """Write generations of tables, read before building a response so a stale one is not stored"""
+        with self._lock:
+            return tuple(self._generations.get(table, 0) for table in sorted(tables))
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if entry.expires_at < time.monotonic():
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry
+
+    def set(self, key: Hashable, status: int, headers: List[Tuple[bytes, bytes]], body: bytes, tables: FrozenSet[str], generation: Tuple[int, ...]):
+        """Store a response unless one of its tables was written since generation was read"""
+        if self.max_entries <= 0 or len(body) > self.max_entry_bytes:
+            return
+        with self._lock:
+            if tuple(self._generations.get(table, 0) for table in sorted(tables)) != generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = CachedResponse(status, headers, body, tables, time.monotonic() + self.ttl, {})
+            self._bytes += len(body)
+            self._evict()
+
+    def get_variant(self, key: Hashable, coding: str) -> Optional[bytes]:
+        """Compressed body of an entry, None when it was not compressed with coding yet"""
+        with self._lock:
+            entry = self._entries.get(key)
+            variant = entry.variants.get(coding) if entry is not None else None
+            if variant is not None:
+                self._variant_hits += 1
+            return variant
+
+    def set_variant(self, key: Hashable, coding: str, body: bytes):
+        """Keep a compressed body next to the entry it was made from, nothing is stored once the entry is gone"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or coding in entry.variants:
+                return
+            entry.variants[coding] = body
+            self._bytes += len(body)
+            self._evict()
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self._evictions += 1
+
+    def invalidate(self, tables: Iterable[str]):
+        """MySQLService write listener: drop every response built from one of the tables"""
+        tables = set(tables)
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            for key in [key for key, entry in self._entries.items() if entry.tables & tables]:
+                self._remove(key)
+            self._invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body) + sum(len(variant) for variant in entry.variants.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+                "variant_hits": self._variant_hits,
+            }
+
+
+class ResponseCacheMiddleware:
+    """
+    Pure ASGI middleware serving successful GETs of the mapped routes from the ResponseCache on app.state
+    When ConditionalGetMiddleware runs first, the table version it read is part of the key,
+    so a cached body never outlives the version its ETag advertises
+    """
+
+    def __init__(self, app: ASGIApp, route_tables: Dict[str, str]):
+        self.app = app
+        self.route_tables = route_tables
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        query_string = scope.get("query_string", b"")
+        tables = resolve_tables(self.route_tables, scope["path"], query_string)
+        cache = getattr(scope["app"].state, "response_cache", None) if "app" in scope else None
+        if not tables or cache is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = (scope["path"], normalize_query(query_string), scope.get("table_version"))
+        # Lets CompressionMiddleware further up keep its compressed bodies in the entry
+        scope["response_cache_key"] = key
+        entry = cache.get(key)
+        if entry is not None:
+            await send({"type": "http.response.start", "status": entry.status, "headers": [*entry.headers, (b"x-cache", b"HIT")]})
+            await send({"type": "http.response.body", "body": entry.body})
+            return
+
+        generation = cache.generation(tables)
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+
+        async def send_and_store(message: Message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                message["headers"] = [*message.get("headers", []), (b"x-cache", b"MISS")]
+            elif message["type"] == "http.response.body" and start is not None and start["status"] == 200:
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    headers = [(name, value) for name, value in start["headers"] if name.lower() != b"x-cache"]
+                    cache.set(key, start["status"], headers, b"".join(chunks), tables, generation)
+            await send(message)
+
+        await self.app(scope, receive, send_and_store)
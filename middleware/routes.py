@@ -0,0 +1,20 @@
+"""
+Mapping of request paths to the tables their responses are built from
+"""
+
+from typing import Dict, FrozenSet, Optional
+from urllib.parse import parse_qs
+
+from database.expand import expanded_tables
+
+
+def resolve_tables(route_tables: Dict[str, str], path: str, query_string: bytes) -> Optional[FrozenSet[str]]:
+    """
+    Tables read by a GET of path, None for routes outside route_tables
+    route_tables maps a path prefix to the table its routes read; expand= adds the tables of the expanded relations
+    """
+    for prefix, table in route_tables.items():
+        if path == prefix or path.startswith(prefix + "/"):
+            expand = parse_qs(query_string.decode("latin-1")).get("expand", [])
+            return expanded_tables(table, (name.strip() for name in ",".join(expand).split(",")))
+    return None
@@ -0,0 +1,69 @@
+"""
+Typed middleware settings
+Parsed and validated once at startup from the environment and the .env file
+"""
+
+from functools import lru_cache
+from typing import FrozenSet
+
+from pydantic import AliasChoices, Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class ResponseCacheSettings(BaseSettings):
+    """Bounds of the in-process GET response cache, a size of 0 disables it"""
+
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
+
+    response_cache_size: int = Field(1024, ge=0)
+    response_cache_ttl: float = Field(30.0, ge=0)
+    response_cache_max_bytes: int = Field(32 * 1024 * 1024, ge=0)
+    response_cache_max_entry_bytes: int = Field(1024 * 1024, ge=0)
+
+
+class CompressionSettings(BaseSettings):
+    """Response compression thresholds and levels"""
+
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
+
+    compression_minimum_size: int = Field(500, ge=0)
+    compression_thread_size: int = Field(64 * 1024, ge=0)
+    compression_gzip_level: int = Field(6, ge=1, le=9)
+    compression_brotli_quality: int = Field(5, ge=0, le=11)
+    compression_zstd_level: int = Field(3, ge=1, le=22)
+
+
+class AuthSettings(BaseSettings):
+    """JWT secret, IP whitelist and verified-token cache of the auth middleware"""
+
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
+
+    secret_key: str = Field(..., min_length=1)
+    algorithm: str = "HS256"
+    # Comma separated addresses or CIDR ranges (IPv4 or IPv6); WHITELISTED_IPS is the name documented in .env.example
+    white_list_ips: str = Field("", validation_alias=AliasChoices("WHITE_LIST_IPS", "WHITELISTED_IPS"))
+    # Proxies (addresses or CIDR ranges) whose X-Forwarded-For header is trusted to carry the client address
+    trusted_proxies: str = ""
+
+    token_cache_size: int = Field(4096, ge=0)
+    token_cache_ttl: float = Field(300.0, ge=0)
+    # Lifetime of the tokens issued for API keys, bounds how long one outlives a revocation a worker did not see
+    api_key_token_expire_minutes: float = Field(15.0, gt=0)
+
+    # bcrypt threads and how many checks may wait for one before logins get 503
+    password_pool_size: int = Field(2, ge=1)
+    password_queue_size: int = Field(8, ge=0)
+
+    @property
+    def white_list(self) -> FrozenSet[str]:
+        return frozenset(ip.strip() for ip in self.white_list_ips.split(",") if ip.strip())
+
+    @property
+    def trusted_proxy_list(self) -> FrozenSet[str]:
+        return frozenset(ip.strip() for ip in self.trusted_proxies.split(",") if ip.strip())
+
+
+@lru_cache(maxsize=None)
+def get_auth_settings() -> AuthSettings:
+    """AuthSettings read once per process, shared by the code signing tokens and the middleware verifying them"""
+    return AuthSettings()
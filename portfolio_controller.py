@@ -2,41 +2,63 @@
 Portfolio Controller - Generic CRUD operations for all portfolio entities
 """
 
-from pydantic import BaseModel
-from database.client import MySQLService
+from pydantic import BaseModel, Field
+from database.client import AsyncMySQLService
+from database.count_cache import TotalMode
 from database.entities.base_entity import BaseEntity
-from typing import Optional, Dict, Any
+from database.expand import expanded_tables
+from database.single_flight import SingleFlight, freeze
+from typing import Optional, Dict, Any, FrozenSet, Sequence
 
 
 class PortfolioController(BaseModel):
     """Generic controller for portfolio entities following the auth pattern"""
+    service: AsyncMySQLService
+    # Identical concurrent reads share one query, see database/single_flight.py
+    single_flight: SingleFlight = Field(default_factory=SingleFlight)
 
-    @staticmethod
-    def create_entity(entity: BaseEntity) -> dict:
-        """Create a new entity"""
-        service = MySQLService()
-        return service.create_entity(entity)
+    class Config:
+        arbitrary_types_allowed = True
 
     @staticmethod
-    def get_entities(entity_class: type[BaseEntity], filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 10) -> dict:
-        """Get all entities with optional filters"""
-        service = MySQLService()
-        return service.find_entities(entity_class, filters, skip, limit)
+    def read_tables(entity_class: type[BaseEntity], expand: Optional[Sequence[str]] = None) -> FrozenSet[str]:
+        """Tables a read of entity_class touches, including the ones of the expanded relations"""
+        return expanded_tables(entity_class.get_table_name(), expand or ())
 
-    @staticmethod
-    def get_entity_by_id(entity_class: type[BaseEntity], entity_id: int) -> dict:
-        """Get a single entity by ID"""
-        service = MySQLService()
-        return service.find_entity_by_id(entity_class, entity_id)
+    async def create_entity_async(self, entity: BaseEntity) -> dict:
+        """Create a new entity without blocking the event loop"""
+        return await self.service.create_entity(entity)
 
-    @staticmethod
-    def update_entity(entity: BaseEntity, entity_id: int) -> dict:
-        """Update an existing entity"""
-        service = MySQLService()
-        return service.update_entity(entity, entity_id)
+    async def get_entities_async(self, entity_class: type[BaseEntity], filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 10, after: Optional[Any] = None, total_mode: TotalMode = TotalMode.EXACT, fields: Optional[Sequence[str]] = None, sort: Optional[str] = None, expand: Optional[Sequence[str]] = None) -> dict:
+        """Get all entities with optional filters without blocking the event loop, coalescing identical concurrent calls"""
+        key = ("entities", entity_class, freeze(filters), skip, limit, freeze(after), total_mode, freeze(fields), sort, freeze(expand))
+        return await self.single_flight.do(
+            key,
+            self.read_tables(entity_class, expand),
+            lambda: self.service.find_entities(entity_class, filters, skip, limit, after, total_mode, fields, sort, expand),
+        )
 
-    @staticmethod
-    def delete_entity(entity_class: type[BaseEntity], entity_id: int) -> dict:
-        """Delete an entity by ID"""
-        service = MySQLService()
-        return service.delete_entity(entity_class, entity_id)
+    async def get_entity_by_id_async(self, entity_class: type[BaseEntity], entity_id: int, fields: Optional[Sequence[str]] = None) -> dict:
+        """Get a single entity by ID without blocking the event loop, coalescing identical concurrent calls"""
+        key = ("entity", entity_class, entity_id, freeze(fields))
+        return await self.single_flight.do(
+            key,
+            self.read_tables(entity_class),
+            lambda: self.service.find_entity_by_id(entity_class, entity_id, fields),
+        )
+
+    async def get_entities_by_ids_async(self, entity_class: type[BaseEntity], entity_ids: Sequence[int], fields: Optional[Sequence[str]] = None, expand: Optional[Sequence[str]] = None) -> dict:
+        """Get several entities by ID, keyed by id, without blocking the event loop"""
+        return await self.service.find_entities_by_ids(entity_class, entity_ids, fields, expand)
+
+    async def get_portfolio_async(self) -> dict:
+        """Get the full nested portfolio without blocking the event loop"""
+        return await self.service.find_portfolio()
+
+    async def update_entity_async(self, entity: BaseEntity, entity_id: int) -> dict:
+        """Update an existing entity without blocking the event loop"""
+        return await self.service.update_entity(entity, entity_id)
+
+    async def delete_entity_async(self, entity_class: type[BaseEntity], entity_id: int) -> dict:
+        """Delete an entity by ID without blocking the event loop"""
+        return await self.service.delete_entity(entity_class, entity_id)
@@ -0,0 +1,18 @@
+"""
+JSON responses for trusted database rows
+Routes return RowsJSONResponse objects, so FastAPI skips response_model validation and jsonable_encoder;
+the response models declared on the routes only document the shape in OpenAPI
+"""
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from database.utils.encoding import dumps
+
+
+class RowsJSONResponse(JSONResponse):
+    """JSONResponse encoded with database.utils.encoding.dumps (orjson when installed)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -12,7 +12,9 @@ from routers import (
     responsibilities,
     technology_projects,
     company_experiences,
-    technology_experiences
+    technology_experiences,
+    portfolio,
+    metrics
 )
 
 __all__ = [
@@ -25,5 +27,7 @@ __all__ = [
     "responsibilities",
     "technology_projects",
     "company_experiences",
-    "technology_experiences"
+    "technology_experiences",
+    "portfolio",
+    "metrics"
 ]
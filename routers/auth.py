@@ -2,18 +2,24 @@
 Authentication router
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, status
 from database.entities.api_db_entities import AuthResponse, TokenRequest
+from database.utils.password import PasswordPoolFull
 from auth import AuthController
+from dependencies import get_auth_controller
 
 router = APIRouter()
 
 
 @router.post("/token", response_model=AuthResponse, summary="Get access token")
-async def get_token(credentials: TokenRequest) -> AuthResponse:
+async def get_token(credentials: TokenRequest, controller: AuthController = Depends(get_auth_controller)) -> AuthResponse:
     """
-    Get an access token using username and password.
+    Get an access token using username and password, or an API key.
     """
-    auth_response: AuthResponse = AuthController.authenticate_client(token_request=credentials)
+    try:
+        auth_response: AuthResponse = await controller.authenticate_client_async(token_request=credentials)
+    except PasswordPoolFull as e:
+        # Failing fast keeps a burst of logins from piling up behind bcrypt
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
     
     return auth_response
\ No newline at end of file
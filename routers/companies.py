@@ -2,66 +2,87 @@
 Companies router - CRUD endpoints for companies
 """
 
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from schemas import (
     CompanyCreate,
     CompanyUpdate,
     CompanyResponse,
-    MessageResponse
+    MessageResponse,
+    ListResponse,
+    BatchResponse,
+    ItemResponse
 )
 from portfolio_controller import PortfolioController
-from typing import Optional
+from responses import RowsJSONResponse
+from dependencies import get_portfolio_controller
+from routers.params import ListOrder, list_order, list_total_mode, field_selection, id_batch, relation_expansion
+from database.count_cache import TotalMode
+from database.entities.filters import MatchMode, TextMatch
+from typing import Optional, Tuple, Union
 
 router = APIRouter()
 
 @router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED, summary="Create a new company")
-async def create_company(company: CompanyCreate) -> dict:
+async def create_company(company: CompanyCreate, controller: PortfolioController = Depends(get_portfolio_controller)) -> dict:
     """Create a new company"""
-    result = PortfolioController.create_entity(company)
+    result = await controller.create_entity_async(company)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     return result
 
 
-@router.get("/", response_model=dict, summary="Get all companies")
+@router.get("/", response_model=Union[ListResponse[CompanyResponse], BatchResponse[CompanyResponse]], summary="Get all companies")
 async def get_companies(
     name: Optional[str] = Query(None, description="Filter by company name"),
+    name_match: MatchMode = Query(MatchMode.CONTAINS, description="How name is matched: contains, prefix or exact (prefix and exact use idx_name)"),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(10, ge=1, le=100, description="Max number of records to return")
-) -> dict:
+    limit: int = Query(10, ge=1, le=100, description="Max number of records to return"),
+    order: ListOrder = Depends(list_order(CompanyCreate)),
+    total_mode: TotalMode = Depends(list_total_mode),
+    fields: Optional[Tuple[str, ...]] = Depends(field_selection(CompanyCreate)),
+    ids: Optional[Tuple[int, ...]] = Depends(id_batch),
+    expand: Optional[Tuple[str, ...]] = Depends(relation_expansion(CompanyCreate)),
+    controller: PortfolioController = Depends(get_portfolio_controller)
+) -> RowsJSONResponse:
     """Get all companies with optional filters"""
-    filters = {"name": name} if name else None
+    if ids is not None:
+        result = await controller.get_entities_by_ids_async(CompanyCreate, ids, fields, expand)
+        if not result["success"]:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
+        return RowsJSONResponse(result)
 
-    result = PortfolioController.get_entities(CompanyCreate, filters, skip, limit)
+    filters = {"name": TextMatch(name, name_match)} if name else None
+
+    result = await controller.get_entities_async(CompanyCreate, filters, skip, limit, order.after, total_mode, fields, order.sort, expand)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
-    return result
+    return RowsJSONResponse(result)
 
 
-@router.get("/{company_id}", response_model=dict, summary="Get company by ID")
-async def get_company(company_id: int) -> dict:
+@router.get("/{company_id}", response_model=ItemResponse[CompanyResponse], summary="Get company by ID")
+async def get_company(company_id: int, fields: Optional[Tuple[str, ...]] = Depends(field_selection(CompanyCreate)), controller: PortfolioController = Depends(get_portfolio_controller)) -> RowsJSONResponse:
     """Get a single company by ID"""
-    result = PortfolioController.get_entity_by_id(CompanyCreate, company_id)
+    result = await controller.get_entity_by_id_async(CompanyCreate, company_id, fields)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
     if not result["data"]:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Company not found")
-    return result
+    return RowsJSONResponse(result)
 
 
 @router.put("/{company_id}", response_model=dict, summary="Update company")
-async def update_company(company_id: int, company: CompanyUpdate) -> dict:
+async def update_company(company_id: int, company: CompanyUpdate, controller: PortfolioController = Depends(get_portfolio_controller)) -> dict:
     """Update an existing company"""
-    result = PortfolioController.update_entity(company, company_id)
+    result = await controller.update_entity_async(company, company_id)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     return result
 
 
 @router.delete("/{company_id}", response_model=MessageResponse, summary="Delete company")
-async def delete_company(company_id: int) -> MessageResponse:
+async def delete_company(company_id: int, controller: PortfolioController = Depends(get_portfolio_controller)) -> MessageResponse:
     """Delete a company by ID"""
-    result = PortfolioController.delete_entity(CompanyCreate, company_id)
+    result = await controller.delete_entity_async(CompanyCreate, company_id)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     return MessageResponse(message=result["message"])
@@ -2,72 +2,96 @@
 Professional Experiences router - CRUD endpoints for professional experiences
 """
 
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from schemas import (
     ProfessionalExperienceCreate,
     ProfessionalExperienceUpdate,
     ProfessionalExperienceResponse,
-    MessageResponse
+    MessageResponse,
+    ListResponse,
+    BatchResponse,
+    ItemResponse
 )
 from portfolio_controller import PortfolioController
-from typing import Optional
+from responses import RowsJSONResponse
+from dependencies import get_portfolio_controller
+from routers.params import ListOrder, list_order, list_total_mode, field_selection, id_batch, relation_expansion
+from database.count_cache import TotalMode
+from database.entities.filters import MatchMode, TextMatch, FullTextSearch
+from typing import Optional, Tuple, Union
 
 router = APIRouter()
 
 
 @router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED, summary="Create a new professional experience")
-async def create_experience(experience: ProfessionalExperienceCreate) -> dict:
+async def create_experience(experience: ProfessionalExperienceCreate, controller: PortfolioController = Depends(get_portfolio_controller)) -> dict:
     """Create a new professional experience"""
-    result = PortfolioController.create_entity(experience)
+    result = await controller.create_entity_async(experience)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     return result
 
 
-@router.get("/", response_model=dict, summary="Get all professional experiences")
+@router.get("/", response_model=Union[ListResponse[ProfessionalExperienceResponse], BatchResponse[ProfessionalExperienceResponse]], summary="Get all professional experiences")
 async def get_experiences(
     title: Optional[str] = Query(None, description="Filter by experience title"),
     is_current: Optional[bool] = Query(None, description="Filter by current employment status"),
+    title_match: MatchMode = Query(MatchMode.CONTAINS, description="How title is matched: contains, prefix or exact (prefix and exact use idx_title)"),
+    search: Optional[str] = Query(None, min_length=1, description="Full-text search on description (FULLTEXT index), most relevant first"),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(10, ge=1, le=100, description="Max number of records to return")
-) -> dict:
+    limit: int = Query(10, ge=1, le=100, description="Max number of records to return"),
+    order: ListOrder = Depends(list_order(ProfessionalExperienceCreate)),
+    total_mode: TotalMode = Depends(list_total_mode),
+    fields: Optional[Tuple[str, ...]] = Depends(field_selection(ProfessionalExperienceCreate)),
+    ids: Optional[Tuple[int, ...]] = Depends(id_batch),
+    expand: Optional[Tuple[str, ...]] = Depends(relation_expansion(ProfessionalExperienceCreate)),
+    controller: PortfolioController = Depends(get_portfolio_controller)
+) -> RowsJSONResponse:
     """Get all professional experiences with optional filters"""
+    if ids is not None:
+        result = await controller.get_entities_by_ids_async(ProfessionalExperienceCreate, ids, fields, expand)
+        if not result["success"]:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
+        return RowsJSONResponse(result)
+
     filters = {}
     if title:
-        filters["title"] = title
+        filters["title"] = TextMatch(title, title_match)
     if is_current is not None:
         filters["is_current"] = is_current
+    if search:
+        filters["description"] = FullTextSearch(search)
 
-    result = PortfolioController.get_entities(ProfessionalExperienceCreate, filters if filters else None, skip, limit)
+    result = await controller.get_entities_async(ProfessionalExperienceCreate, filters if filters else None, skip, limit, order.after, total_mode, fields, order.sort, expand)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
-    return result
+    return RowsJSONResponse(result)
 
 
-@router.get("/{experience_id}", response_model=dict, summary="Get professional experience by ID")
-async def get_experience(experience_id: int) -> dict:
+@router.get("/{experience_id}", response_model=ItemResponse[ProfessionalExperienceResponse], summary="Get professional experience by ID")
+async def get_experience(experience_id: int, fields: Optional[Tuple[str, ...]] = Depends(field_selection(ProfessionalExperienceCreate)), controller: PortfolioController = Depends(get_portfolio_controller)) -> RowsJSONResponse:
     """Get a single professional experience by ID"""
-    result = PortfolioController.get_entity_by_id(ProfessionalExperienceCreate, experience_id)
+    result = await controller.get_entity_by_id_async(ProfessionalExperienceCreate, experience_id, fields)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
     if not result["data"]:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Professional experience not found")
-    return result
+    return RowsJSONResponse(result)
 
 
 @router.put("/{experience_id}", response_model=dict, summary="Update professional experience")
-async def update_experience(experience_id: int, experience: ProfessionalExperienceUpdate) -> dict:
+async def update_experience(experience_id: int, experience: ProfessionalExperienceUpdate, controller: PortfolioController = Depends(get_portfolio_controller)) -> dict:
     """Update an existing professional experience"""
-    result = PortfolioController.update_entity(experience, experience_id)
+    result = await controller.update_entity_async(experience, experience_id)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     return result
 
 
 @router.delete("/{experience_id}", response_model=MessageResponse, summary="Delete professional experience")
-async def delete_experience(experience_id: int) -> MessageResponse:
+async def delete_experience(experience_id: int, controller: PortfolioController = Depends(get_portfolio_controller)) -> MessageResponse:
     """Delete a professional experience by ID"""
-    result = PortfolioController.delete_entity(ProfessionalExperienceCreate, experience_id)
+    result = await controller.delete_entity_async(ProfessionalExperienceCreate, experience_id)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     return MessageResponse(message=result["message"])
@@ -0,0 +1,36 @@
+"""
+Metrics router - cache and connection pool counters for monitoring
+"""
+
+from fastapi import APIRouter, Depends
+from database.client import AsyncMySQLService
+from database.statement_cache import statement_cache
+from database.snapshot import PortfolioSnapshot
+from database.versions import TableVersionTracker
+from middleware.auth import TokenVerifier
+from middleware.response_cache import ResponseCache
+from portfolio_controller import PortfolioController
+from dependencies import get_db_service, get_portfolio_snapshot, get_table_versions, get_response_cache, get_portfolio_controller, get_token_verifier
+
+router = APIRouter()
+
+
+@router.get("/", response_model=dict, summary="Get cache and connection pool metrics")
+async def get_metrics(
+    service: AsyncMySQLService = Depends(get_db_service),
+    snapshot: PortfolioSnapshot = Depends(get_portfolio_snapshot),
+    table_versions: TableVersionTracker = Depends(get_table_versions),
+    response_cache: ResponseCache = Depends(get_response_cache),
+    controller: PortfolioController = Depends(get_portfolio_controller),
+    token_verifier: TokenVerifier = Depends(get_token_verifier)
+) -> dict:
+    """Get hit rates and sizes of the caches and the connection pool"""
+    return {
+        "statement_cache": statement_cache.stats(),
+        **service.stats(),
+        "portfolio_snapshot": snapshot.stats(),
+        "table_versions": table_versions.stats(),
+        "response_cache": response_cache.stats(),
+        "single_flight": controller.single_flight.stats(),
+        "token_cache": token_verifier.stats(),
+    }
@@ -0,0 +1,124 @@
+"""
+Shared query parameters for the list endpoints
+"""
+
+from fastapi import HTTPException, Query, status
+from database.entities.mysql_entity import MySQLEntity
+from database.count_cache import TotalMode
+from database.utils.pagination import decode_cursor
+from database.expand import get_relations
+from typing import Any, Callable, NamedTuple, Optional, Tuple
+
+
+class ListOrder(NamedTuple):
+    """Sort and keyset position of a list request"""
+    sort: Optional[str] = None
+    after: Optional[Any] = None
+
+
+def list_order(entity_class: type[MySQLEntity]) -> Callable:
+    """Build a dependency resolving sort= and the keyset position from after or an opaque cursor"""
+    sortable = entity_class.get_sortable_fields()
+    indexed = ", ".join(f"{field} ({index})" for field, index in sortable.items() if index)
+
+    def dependency(
+        sort: Optional[str] = Query(None, description=f"Comma-separated fields to sort by, prefix with - for descending ({', '.join(sortable)}). Index-backed: {indexed}, the others need a filesort. id is appended as tiebreaker"),
+        after: Optional[int] = Query(None, ge=0, description="Keyset pagination: return records with an id greater than this one, ordered by id (use 0 for the first page, also when sorting). Skip is ignored"),
+        cursor: Optional[str] = Query(None, description="Opaque next_cursor returned by a previous keyset page")
+    ) -> ListOrder:
+        try:
+            order = entity_class.get_sort_keys(sort) if sort else None
+        except ValueError as ve:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
+
+        if cursor is None:
+            if after is not None and order is not None:
+                if after != 0:
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="When sorting, start with after=0 and continue with next_cursor")
+                return ListOrder(sort, ())
+            return ListOrder(sort, after)
+        if after is not None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Use either after or cursor, not both")
+
+        try:
+            position, cursor_sort = decode_cursor(cursor)
+            cursor_order = entity_class.get_sort_keys(cursor_sort) if cursor_sort else None
+        except ValueError as ve:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
+        if order is not None and order != cursor_order:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The cursor was issued for a different sort")
+        if cursor_order is not None and len(position) != len(cursor_order):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        nullable = entity_class.get_nullable_fields()
+        if cursor_order is not None and any(value is None and key.field not in nullable for key, value in zip(cursor_order, position)):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        return ListOrder(cursor_sort, position)
+
+    return dependency
+
+
+# Upper bound of ids=, same as the page size limit of the list endpoints
+MAX_BATCH_SIZE = 100
+
+
+def id_batch(
+    ids: Optional[str] = Query(None, description=f"Comma-separated ids (at most {MAX_BATCH_SIZE}) fetched in one query, returned keyed by id with the missing ones listed. Filters and pagination are ignored")
+) -> Optional[Tuple[int, ...]]:
+    """Parse ids=1,2,3 into unique positive ids"""
+    if ids is None:
+        return None
+    try:
+        parsed = tuple(dict.fromkeys(int(value) for value in ids.split(",") if value.strip()))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids must be a comma-separated list of integers")
+    if not parsed or any(value <= 0 for value in parsed):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids must be a comma-separated list of positive integers")
+    if len(parsed) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {MAX_BATCH_SIZE} ids can be fetched at once")
+    return parsed
+
+
+def list_total_mode(
+    include_total: bool = Query(True, description="Set to false to skip counting the matching records (total is null)"),
+    total_mode: TotalMode = Query(TotalMode.EXACT, description="exact: cached COUNT(*) of the matching records; estimate: table statistics when no filters are applied")
+) -> TotalMode:
+    """Resolve how the list endpoint computes its total"""
+    return total_mode if include_total else TotalMode.NONE
+
+
+def field_selection(entity_class: type[MySQLEntity]) -> Callable:
+    """Build a dependency parsing fields=a,b and validating it against the entity's field mappings"""
+    selectable = entity_class.get_selectable_fields()
+    allowed = ", ".join(selectable)
+
+    def dependency(
+        fields: Optional[str] = Query(None, description=f"Comma-separated fields to return ({allowed}); id is always included")
+    ) -> Optional[Tuple[str, ...]]:
+        if not fields:
+            return None
+        requested = tuple(field.strip() for field in fields.split(",") if field.strip())
+        unknown = [field for field in requested if field not in selectable]
+        if unknown:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown fields: {', '.join(unknown)}. Allowed fields: {allowed}")
+        return requested or None
+
+    return dependency
+
+
+def relation_expansion(entity_class: type[MySQLEntity]) -> Callable:
+    """Build a dependency parsing expand=a,b and validating it against the relations of the entity's table"""
+    relations = get_relations(entity_class.get_table_name())
+    allowed = ", ".join(relations)
+
+    def dependency(
+        expand: Optional[str] = Query(None, description=f"Comma-separated relations to embed in each record ({allowed}), each one loaded with a single batched query")
+    ) -> Optional[Tuple[str, ...]]:
+        if not expand:
+            return None
+        requested = tuple(dict.fromkeys(name.strip() for name in expand.split(",") if name.strip()))
+        unknown = [name for name in requested if name not in relations]
+        if unknown:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown relations: {', '.join(unknown)}. Allowed relations: {allowed}")
+        return requested or None
+
+    return dependency
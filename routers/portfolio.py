@@ -0,0 +1,67 @@
+"""
+Portfolio router - the whole nested portfolio in one request
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from portfolio_controller import PortfolioController
+from database.snapshot import EncodedSnapshot, PortfolioSnapshot
+from dependencies import get_portfolio_controller, get_portfolio_snapshot
+from middleware.compression import accepted_encodings
+from middleware.conditional import etag_matches
+from email.utils import formatdate
+from typing import Optional
+
+router = APIRouter()
+
+
+class BufferResponse(Response):
+    """Response whose body may be a memoryview, sent as is so slices of the shared snapshot are not copied"""
+
+    def render(self, content) -> bytes:
+        if isinstance(content, memoryview):
+            return content
+        return super().render(content)
+
+
+def snapshot_response(snapshot: EncodedSnapshot, accept_encoding: Optional[str], if_none_match: Optional[str] = None) -> Response:
+    """Serve the pre-encoded snapshot, picking the smallest variant the client accepts"""
+    # The snapshot carries its own content tag, table versions could run ahead of a rebuild still pending
+    headers = {
+        "Vary": "Accept-Encoding",
+        "ETag": snapshot.etag,
+        "Last-Modified": formatdate(snapshot.built_at, usegmt=True),
+        "Cache-Control": "private, no-cache",
+    }
+    if if_none_match is not None and etag_matches(if_none_match, snapshot.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # Variants are only built when they are smaller than the body, see encode_snapshot
+    accepted = accepted_encodings(accept_encoding or "")
+    if snapshot.br is not None and ("br" in accepted or "*" in accepted):
+        body = snapshot.br
+        headers["Content-Encoding"] = "br"
+    elif snapshot.gzip is not None and ("gzip" in accepted or "*" in accepted):
+        body = snapshot.gzip
+        headers["Content-Encoding"] = "gzip"
+    else:
+        body = snapshot.body
+    return BufferResponse(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/", response_model=dict, summary="Get the full portfolio")
+async def get_portfolio(
+    request: Request,
+    snapshot: PortfolioSnapshot = Depends(get_portfolio_snapshot),
+    controller: PortfolioController = Depends(get_portfolio_controller)
+):
+    """Get experiences with their responsibilities, companies and technologies, and projects with their tasks and technologies"""
+    current = snapshot.current
+    if current is not None:
+        return snapshot_response(current, request.headers.get("accept-encoding"), request.headers.get("if-none-match"))
+
+    # No snapshot yet (the startup build failed), answer from the database and retry the build in the background
+    snapshot.schedule()
+    result = await controller.get_portfolio_async()
+    if not result["success"]:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
+    return result
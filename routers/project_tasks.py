@@ -2,72 +2,97 @@
 Project Tasks router - CRUD endpoints for project tasks
 """
 
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from schemas import (
     ProjectTaskCreate,
     ProjectTaskUpdate,
     ProjectTaskResponse,
-    MessageResponse
+    MessageResponse,
+    ListResponse,
+    BatchResponse,
+    ItemResponse
 )
 from portfolio_controller import PortfolioController
-from typing import Optional
+from responses import RowsJSONResponse
+from dependencies import get_portfolio_controller
+from routers.params import ListOrder, list_order, list_total_mode, field_selection, id_batch, relation_expansion
+from database.count_cache import TotalMode
+from database.entities.filters import MatchMode, TextMatch, FullTextSearch
+from typing import Optional, Tuple, Union
 
 router = APIRouter()
 
 
 @router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED, summary="Create a new project task")
-async def create_project_task(project_task: ProjectTaskCreate) -> dict:
+async def create_project_task(project_task: ProjectTaskCreate, controller: PortfolioController = Depends(get_portfolio_controller)) -> dict:
     """Create a new project task"""
-    result = PortfolioController.create_entity(project_task)
+    result = await controller.create_entity_async(project_task)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     return result
 
 
-@router.get("/", response_model=dict, summary="Get all project tasks")
+@router.get("/", response_model=Union[ListResponse[ProjectTaskResponse], BatchResponse[ProjectTaskResponse]], summary="Get all project tasks")
 async def get_project_tasks(
     project_id: Optional[int] = Query(None, description="Filter by project ID"),
     name: Optional[str] = Query(None, description="Filter by task name"),
+    name_match: MatchMode = Query(MatchMode.CONTAINS, description="How name is matched: contains, prefix or exact (prefix and exact use idx_name)"),
+    search: Optional[str] = Query(None, min_length=1, description="Full-text search on description (FULLTEXT index), most relevant first"),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(10, ge=1, le=100, description="Max number of records to return")
-) -> dict:
+    limit: int = Query(10, ge=1, le=100, description="Max number of records to return"),
+    order: ListOrder = Depends(list_order(ProjectTaskCreate)),
+    total_mode: TotalMode = Depends(list_total_mode),
+    fields: Optional[Tuple[str, ...]] = Depends(field_selection(ProjectTaskCreate)),
+    ids: Optional[Tuple[int, ...]] = Depends(id_batch),
+    expand: Optional[Tuple[str, ...]] = Depends(relation_expansion(ProjectTaskCreate)),
+    controller: PortfolioController = Depends(get_portfolio_controller)
+) -> RowsJSONResponse:
     """Get all project tasks with optional filters"""
+    if ids is not None:
+        result = await controller.get_entities_by_ids_async(ProjectTaskCreate, ids, fields, expand)
+        if not result["success"]:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
+        return RowsJSONResponse(result)
+
     filters = {}
     if project_id is not None:
         filters["project_id"] = project_id
     if name:
-        filters["name"] = name
+        filters["name"] = TextMatch(name, name_match)
+
+    if search:
+        filters["description"] = FullTextSearch(search)
 
-    result = PortfolioController.get_entities(ProjectTaskCreate, filters if filters else None, skip, limit)
+    result = await controller.get_entities_async(ProjectTaskCreate, filters if filters else None, skip, limit, order.after, total_mode, fields, order.sort, expand)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
-    return result
+    return RowsJSONResponse(result)
 
 
-@router.get("/{task_id}", response_model=dict, summary="Get project task by ID")
-async def get_project_task(task_id: int) -> dict:
+@router.get("/{task_id}", response_model=ItemResponse[ProjectTaskResponse], summary="Get project task by ID")
+async def get_project_task(task_id: int, fields: Optional[Tuple[str, ...]] = Depends(field_selection(ProjectTaskCreate)), controller: PortfolioController = Depends(get_portfolio_controller)) -> RowsJSONResponse:
     """Get a single project task by ID"""
-    result = PortfolioController.get_entity_by_id(ProjectTaskCreate, task_id)
+    result = await controller.get_entity_by_id_async(ProjectTaskCreate, task_id, fields)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
     if not result["data"]:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project task not found")
-    return result
+    return RowsJSONResponse(result)
 
 
 @router.put("/{task_id}", response_model=dict, summary="Update project task")
-async def update_project_task(task_id: int, project_task: ProjectTaskUpdate) -> dict:
+async def update_project_task(task_id: int, project_task: ProjectTaskUpdate, controller: PortfolioController = Depends(get_portfolio_controller)) -> dict:
     """Update an existing project task"""
-    result = PortfolioController.update_entity(project_task, task_id)
+    result = await controller.update_entity_async(project_task, task_id)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     return result
 
 
 @router.delete("/{task_id}", response_model=MessageResponse, summary="Delete project task")
-async def delete_project_task(task_id: int) -> MessageResponse:
+async def delete_project_task(task_id: int, controller: PortfolioController = Depends(get_portfolio_controller)) -> MessageResponse:
     """Delete a project task by ID"""
-    result = PortfolioController.delete_entity(ProjectTaskCreate, task_id)
+    result = await controller.delete_entity_async(ProjectTaskCreate, task_id)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     return MessageResponse(message=result["message"])
@@ -2,66 +2,92 @@
 Projects router - CRUD endpoints for projects
 """
 
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from schemas import (
     ProjectCreate,
     ProjectUpdate,
     ProjectResponse,
-    MessageResponse
+    MessageResponse,
+    ListResponse,
+    BatchResponse,
+    ItemResponse
 )
 from portfolio_controller import PortfolioController
-from typing import Optional
+from responses import RowsJSONResponse
+from dependencies import get_portfolio_controller
+from routers.params import ListOrder, list_order, list_total_mode, field_selection, id_batch, relation_expansion
+from database.count_cache import TotalMode
+from database.entities.filters import MatchMode, TextMatch, FullTextSearch
+from typing import Optional, Tuple, Union
 
 router = APIRouter()
 
 @router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED, summary="Create a new project")
-async def create_project(project: ProjectCreate) -> dict:
+async def create_project(project: ProjectCreate, controller: PortfolioController = Depends(get_portfolio_controller)) -> dict:
     """Create a new project"""
-    result = PortfolioController.create_entity(project)
+    result = await controller.create_entity_async(project)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     return result
 
 
-@router.get("/", response_model=dict, summary="Get all projects")
+@router.get("/", response_model=Union[ListResponse[ProjectResponse], BatchResponse[ProjectResponse]], summary="Get all projects")
 async def get_projects(
     name: Optional[str] = Query(None, description="Filter by project name"),
+    name_match: MatchMode = Query(MatchMode.CONTAINS, description="How name is matched: contains, prefix or exact (prefix and exact use idx_name)"),
+    search: Optional[str] = Query(None, min_length=1, description="Full-text search on description (FULLTEXT index), most relevant first"),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(10, ge=1, le=100, description="Max number of records to return")
-) -> dict:
+    limit: int = Query(10, ge=1, le=100, description="Max number of records to return"),
+    order: ListOrder = Depends(list_order(ProjectCreate)),
+    total_mode: TotalMode = Depends(list_total_mode),
+    fields: Optional[Tuple[str, ...]] = Depends(field_selection(ProjectCreate)),
+    ids: Optional[Tuple[int, ...]] = Depends(id_batch),
+    expand: Optional[Tuple[str, ...]] = Depends(relation_expansion(ProjectCreate)),
+    controller: PortfolioController = Depends(get_portfolio_controller)
+) -> RowsJSONResponse:
     """Get all projects with optional filters"""
-    filters = {"name": name} if name else None
+    if ids is not None:
+        result = await controller.get_entities_by_ids_async(ProjectCreate, ids, fields, expand)
+        if not result["success"]:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
+        return RowsJSONResponse(result)
 
-    result = PortfolioController.get_entities(ProjectCreate, filters, skip, limit)
+    filters = {}
+    if name:
+        filters["name"] = TextMatch(name, name_match)
+    if search:
+        filters["description"] = FullTextSearch(search)
+
+    result = await controller.get_entities_async(ProjectCreate, filters if filters else None, skip, limit, order.after, total_mode, fields, order.sort, expand)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
-    return result
+    return RowsJSONResponse(result)
 
 
-@router.get("/{project_id}", response_model=dict, summary="Get project by ID")
-async def get_project(project_id: int) -> dict:
+@router.get("/{project_id}", response_model=ItemResponse[ProjectResponse], summary="Get project by ID")
+async def get_project(project_id: int, fields: Optional[Tuple[str, ...]] = Depends(field_selection(ProjectCreate)), controller: PortfolioController = Depends(get_portfolio_controller)) -> RowsJSONResponse:
     """Get a single project by ID"""
-    result = PortfolioController.get_entity_by_id(ProjectCreate, project_id)
+    result = await controller.get_entity_by_id_async(ProjectCreate, project_id, fields)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
     if not result["data"]:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-    return result
+    return RowsJSONResponse(result)
 
 
 @router.put("/{project_id}", response_model=dict, summary="Update project")
-async def update_project(project_id: int, project: ProjectUpdate) -> dict:
+async def update_project(project_id: int, project: ProjectUpdate, controller: PortfolioController = Depends(get_portfolio_controller)) -> dict:
     """Update an existing project"""
-    result = PortfolioController.update_entity(project, project_id)
+    result = await controller.update_entity_async(project, project_id)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     return result
 
 
 @router.delete("/{project_id}", response_model=MessageResponse, summary="Delete project")
-async def delete_project(project_id: int) -> MessageResponse:
+async def delete_project(project_id: int, controller: PortfolioController = Depends(get_portfolio_controller)) -> MessageResponse:
     """Delete a project by ID"""
-    result = PortfolioController.delete_entity(ProjectCreate, project_id)
+    result = await controller.delete_entity_async(ProjectCreate, project_id)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     return MessageResponse(message=result["message"])
@@ -2,67 +2,92 @@
 Responsibilities router - CRUD endpoints for responsibilities
 """
 
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from schemas import (
     ResponsibilityCreate,
     ResponsibilityUpdate,
     ResponsibilityResponse,
-    MessageResponse
+    MessageResponse,
+    ListResponse,
+    BatchResponse,
+    ItemResponse
 )
 from portfolio_controller import PortfolioController
-from typing import Optional
+from responses import RowsJSONResponse
+from dependencies import get_portfolio_controller
+from routers.params import ListOrder, list_order, list_total_mode, field_selection, id_batch, relation_expansion
+from database.count_cache import TotalMode
+from database.entities.filters import FullTextSearch
+from typing import Optional, Tuple, Union
 
 router = APIRouter()
 
 
 @router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED, summary="Create a new responsibility")
-async def create_responsibility(responsibility: ResponsibilityCreate) -> dict:
+async def create_responsibility(responsibility: ResponsibilityCreate, controller: PortfolioController = Depends(get_portfolio_controller)) -> dict:
     """Create a new responsibility"""
-    result = PortfolioController.create_entity(responsibility)
+    result = await controller.create_entity_async(responsibility)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     return result
 
 
-@router.get("/", response_model=dict, summary="Get all responsibilities")
+@router.get("/", response_model=Union[ListResponse[ResponsibilityResponse], BatchResponse[ResponsibilityResponse]], summary="Get all responsibilities")
 async def get_responsibilities(
     experience_id: Optional[int] = Query(None, description="Filter by experience ID"),
+    search: Optional[str] = Query(None, min_length=1, description="Full-text search on description (FULLTEXT index), most relevant first"),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(10, ge=1, le=100, description="Max number of records to return")
-) -> dict:
+    limit: int = Query(10, ge=1, le=100, description="Max number of records to return"),
+    order: ListOrder = Depends(list_order(ResponsibilityCreate)),
+    total_mode: TotalMode = Depends(list_total_mode),
+    fields: Optional[Tuple[str, ...]] = Depends(field_selection(ResponsibilityCreate)),
+    ids: Optional[Tuple[int, ...]] = Depends(id_batch),
+    expand: Optional[Tuple[str, ...]] = Depends(relation_expansion(ResponsibilityCreate)),
+    controller: PortfolioController = Depends(get_portfolio_controller)
+) -> RowsJSONResponse:
     """Get all responsibilities with optional filters"""
-    filters = {"experience_id": experience_id} if experience_id is not None else None
+    if ids is not None:
+        result = await controller.get_entities_by_ids_async(ResponsibilityCreate, ids, fields, expand)
+        if not result["success"]:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
+        return RowsJSONResponse(result)
 
-    result = PortfolioController.get_entities(ResponsibilityCreate, filters, skip, limit)
+    filters = {}
+    if experience_id is not None:
+        filters["experience_id"] = experience_id
+    if search:
+        filters["description"] = FullTextSearch(search)
+
+    result = await controller.get_entities_async(ResponsibilityCreate, filters if filters else None, skip, limit, order.after, total_mode, fields, order.sort, expand)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
-    return result
+    return RowsJSONResponse(result)
 
 
-@router.get("/{responsibility_id}", response_model=dict, summary="Get responsibility by ID")
-async def get_responsibility(responsibility_id: int) -> dict:
+@router.get("/{responsibility_id}", response_model=ItemResponse[ResponsibilityResponse], summary="Get responsibility by ID")
+async def get_responsibility(responsibility_id: int, fields: Optional[Tuple[str, ...]] = Depends(field_selection(ResponsibilityCreate)), controller: PortfolioController = Depends(get_portfolio_controller)) -> RowsJSONResponse:
     """Get a single responsibility by ID"""
-    result = PortfolioController.get_entity_by_id(ResponsibilityCreate, responsibility_id)
+    result = await controller.get_entity_by_id_async(ResponsibilityCreate, responsibility_id, fields)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
     if not result["data"]:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Responsibility not found")
-    return result
+    return RowsJSONResponse(result)
 
 
 @router.put("/{responsibility_id}", response_model=dict, summary="Update responsibility")
-async def update_responsibility(responsibility_id: int, responsibility: ResponsibilityUpdate) -> dict:
+async def update_responsibility(responsibility_id: int, responsibility: ResponsibilityUpdate, controller: PortfolioController = Depends(get_portfolio_controller)) -> dict:
     """Update an existing responsibility"""
-    result = PortfolioController.update_entity(responsibility, responsibility_id)
+    result = await controller.update_entity_async(responsibility, responsibility_id)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     return result
 
 
 @router.delete("/{responsibility_id}", response_model=MessageResponse, summary="Delete responsibility")
-async def delete_responsibility(responsibility_id: int) -> MessageResponse:
+async def delete_responsibility(responsibility_id: int, controller: PortfolioController = Depends(get_portfolio_controller)) -> MessageResponse:
     """Delete a responsibility by ID"""
-    result = PortfolioController.delete_entity(ResponsibilityCreate, responsibility_id)
+    result = await controller.delete_entity_async(ResponsibilityCreate, responsibility_id)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     return MessageResponse(message=result["message"])
@@ -2,72 +2,94 @@
 Technologies router - CRUD endpoints for technologies
 """
 
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from schemas import (
     TechnologyCreate,
     TechnologyUpdate,
     TechnologyResponse,
-    MessageResponse
+    MessageResponse,
+    ListResponse,
+    BatchResponse,
+    ItemResponse
 )
 from portfolio_controller import PortfolioController
-from typing import Optional
+from responses import RowsJSONResponse
+from dependencies import get_portfolio_controller
+from routers.params import ListOrder, list_order, list_total_mode, field_selection, id_batch, relation_expansion
+from database.count_cache import TotalMode
+from database.entities.filters import MatchMode, TextMatch
+from typing import Optional, Tuple, Union
 
 router = APIRouter()
 
 
 @router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED, summary="Create a new technology")
-async def create_technology(technology: TechnologyCreate) -> dict:
+async def create_technology(technology: TechnologyCreate, controller: PortfolioController = Depends(get_portfolio_controller)) -> dict:
     """Create a new technology"""
-    result = PortfolioController.create_entity(technology)
+    result = await controller.create_entity_async(technology)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     return result
 
 
-@router.get("/", response_model=dict, summary="Get all technologies")
+@router.get("/", response_model=Union[ListResponse[TechnologyResponse], BatchResponse[TechnologyResponse]], summary="Get all technologies")
 async def get_technologies(
     name: Optional[str] = Query(None, description="Filter by technology name"),
     abbr: Optional[str] = Query(None, description="Filter by technology abbreviation"),
+    name_match: MatchMode = Query(MatchMode.CONTAINS, description="How name is matched: contains, prefix or exact (prefix and exact use idx_name)"),
+    abbr_match: MatchMode = Query(MatchMode.CONTAINS, description="How abbr is matched: contains, prefix or exact (prefix and exact use idx_abbr)"),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(10, ge=1, le=100, description="Max number of records to return")
-) -> dict:
+    limit: int = Query(10, ge=1, le=100, description="Max number of records to return"),
+    order: ListOrder = Depends(list_order(TechnologyCreate)),
+    total_mode: TotalMode = Depends(list_total_mode),
+    fields: Optional[Tuple[str, ...]] = Depends(field_selection(TechnologyCreate)),
+    ids: Optional[Tuple[int, ...]] = Depends(id_batch),
+    expand: Optional[Tuple[str, ...]] = Depends(relation_expansion(TechnologyCreate)),
+    controller: PortfolioController = Depends(get_portfolio_controller)
+) -> RowsJSONResponse:
     """Get all technologies with optional filters"""
+    if ids is not None:
+        result = await controller.get_entities_by_ids_async(TechnologyCreate, ids, fields, expand)
+        if not result["success"]:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
+        return RowsJSONResponse(result)
+
     filters = {}
     if name:
-        filters["name"] = name
+        filters["name"] = TextMatch(name, name_match)
     if abbr:
-        filters["abbr"] = abbr
+        filters["abbr"] = TextMatch(abbr, abbr_match)
 
-    result = PortfolioController.get_entities(TechnologyCreate, filters if filters else None, skip, limit)
+    result = await controller.get_entities_async(TechnologyCreate, filters if filters else None, skip, limit, order.after, total_mode, fields, order.sort, expand)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
-    return result
+    return RowsJSONResponse(result)
 
 
-@router.get("/{technology_id}", response_model=dict, summary="Get technology by ID")
-async def get_technology(technology_id: int) -> dict:
+@router.get("/{technology_id}", response_model=ItemResponse[TechnologyResponse], summary="Get technology by ID")
+async def get_technology(technology_id: int, fields: Optional[Tuple[str, ...]] = Depends(field_selection(TechnologyCreate)), controller: PortfolioController = Depends(get_portfolio_controller)) -> RowsJSONResponse:
     """Get a single technology by ID"""
-    result = PortfolioController.get_entity_by_id(TechnologyCreate, technology_id)
+    result = await controller.get_entity_by_id_async(TechnologyCreate, technology_id, fields)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
     if not result["data"]:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Technology not found")
-    return result
+    return RowsJSONResponse(result)
 
 
 @router.put("/{technology_id}", response_model=dict, summary="Update technology")
-async def update_technology(technology_id: int, technology: TechnologyUpdate) -> dict:
+async def update_technology(technology_id: int, technology: TechnologyUpdate, controller: PortfolioController = Depends(get_portfolio_controller)) -> dict:
     """Update an existing technology"""
-    result = PortfolioController.update_entity(technology, technology_id)
+    result = await controller.update_entity_async(technology, technology_id)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     return result
 
 
 @router.delete("/{technology_id}", response_model=MessageResponse, summary="Delete technology")
-async def delete_technology(technology_id: int) -> MessageResponse:
+async def delete_technology(technology_id: int, controller: PortfolioController = Depends(get_portfolio_controller)) -> MessageResponse:
     """Delete a technology by ID"""
-    result = PortfolioController.delete_entity(TechnologyCreate, technology_id)
+    result = await controller.delete_entity_async(TechnologyCreate, technology_id)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     return MessageResponse(message=result["message"])
@@ -2,62 +2,81 @@
 Technology Experiences router - CRUD endpoints for technology-experience relationships
 """
 
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from schemas import (
     TechnologyExperienceCreate,
     TechnologyExperienceResponse,
-    MessageResponse
+    MessageResponse,
+    ListResponse,
+    BatchResponse,
+    ItemResponse
 )
 from portfolio_controller import PortfolioController
-from typing import Optional
+from responses import RowsJSONResponse
+from dependencies import get_portfolio_controller
+from routers.params import ListOrder, list_order, list_total_mode, field_selection, id_batch, relation_expansion
+from database.count_cache import TotalMode
+from typing import Optional, Tuple, Union
 
 router = APIRouter()
 
 
 @router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED, summary="Create a new technology-experience relationship")
-async def create_technology_experience(technology_experience: TechnologyExperienceCreate) -> dict:
+async def create_technology_experience(technology_experience: TechnologyExperienceCreate, controller: PortfolioController = Depends(get_portfolio_controller)) -> dict:
     """Create a new technology-experience relationship"""
-    result = PortfolioController.create_entity(technology_experience)
+    result = await controller.create_entity_async(technology_experience)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     return result
 
 
-@router.get("/", response_model=dict, summary="Get all technology-experience relationships")
+@router.get("/", response_model=Union[ListResponse[TechnologyExperienceResponse], BatchResponse[TechnologyExperienceResponse]], summary="Get all technology-experience relationships")
 async def get_technology_experiences(
     technology_id: Optional[int] = Query(None, description="Filter by technology ID"),
     experience_id: Optional[int] = Query(None, description="Filter by experience ID"),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(10, ge=1, le=100, description="Max number of records to return")
-) -> dict:
+    limit: int = Query(10, ge=1, le=100, description="Max number of records to return"),
+    order: ListOrder = Depends(list_order(TechnologyExperienceCreate)),
+    total_mode: TotalMode = Depends(list_total_mode),
+    fields: Optional[Tuple[str, ...]] = Depends(field_selection(TechnologyExperienceCreate)),
+    ids: Optional[Tuple[int, ...]] = Depends(id_batch),
+    expand: Optional[Tuple[str, ...]] = Depends(relation_expansion(TechnologyExperienceCreate)),
+    controller: PortfolioController = Depends(get_portfolio_controller)
+) -> RowsJSONResponse:
     """Get all technology-experience relationships with optional filters"""
+    if ids is not None:
+        result = await controller.get_entities_by_ids_async(TechnologyExperienceCreate, ids, fields, expand)
+        if not result["success"]:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
+        return RowsJSONResponse(result)
+
     filters = {}
     if technology_id is not None:
         filters["technology_id"] = technology_id
     if experience_id is not None:
         filters["experience_id"] = experience_id
 
-    result = PortfolioController.get_entities(TechnologyExperienceCreate, filters if filters else None, skip, limit)
+    result = await controller.get_entities_async(TechnologyExperienceCreate, filters if filters else None, skip, limit, order.after, total_mode, fields, order.sort, expand)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
-    return result
+    return RowsJSONResponse(result)
 
 
-@router.get("/{technology_experience_id}", response_model=dict, summary="Get technology-experience relationship by ID")
-async def get_technology_experience(technology_experience_id: int) -> dict:
+@router.get("/{technology_experience_id}", response_model=ItemResponse[TechnologyExperienceResponse], summary="Get technology-experience relationship by ID")
+async def get_technology_experience(technology_experience_id: int, fields: Optional[Tuple[str, ...]] = Depends(field_selection(TechnologyExperienceCreate)), controller: PortfolioController = Depends(get_portfolio_controller)) -> RowsJSONResponse:
     """Get a single technology-experience relationship by ID"""
-    result = PortfolioController.get_entity_by_id(TechnologyExperienceCreate, technology_experience_id)
+    result = await controller.get_entity_by_id_async(TechnologyExperienceCreate, technology_experience_id, fields)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
     if not result["data"]:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Technology-experience relationship not found")
-    return result
+    return RowsJSONResponse(result)
 
 
 @router.delete("/{technology_experience_id}", response_model=MessageResponse, summary="Delete technology-experience relationship")
-async def delete_technology_experience(technology_experience_id: int) -> MessageResponse:
+async def delete_technology_experience(technology_experience_id: int, controller: PortfolioController = Depends(get_portfolio_controller)) -> MessageResponse:
     """Delete a technology-experience relationship by ID"""
-    result = PortfolioController.delete_entity(TechnologyExperienceCreate, technology_experience_id)
+    result = await controller.delete_entity_async(TechnologyExperienceCreate, technology_experience_id)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     return MessageResponse(message=result["message"])
@@ -2,62 +2,81 @@
 Technology Projects router - CRUD endpoints for technology-project relationships
 """
 
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from schemas import (
     TechnologyProjectCreate,
     TechnologyProjectResponse,
-    MessageResponse
+    MessageResponse,
+    ListResponse,
+    BatchResponse,
+    ItemResponse
 )
 from portfolio_controller import PortfolioController
-from typing import Optional
+from responses import RowsJSONResponse
+from dependencies import get_portfolio_controller
+from routers.params import ListOrder, list_order, list_total_mode, field_selection, id_batch, relation_expansion
+from database.count_cache import TotalMode
+from typing import Optional, Tuple, Union
 
 router = APIRouter()
 
 
 @router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED, summary="Create a new technology-project relationship")
-async def create_technology_project(technology_project: TechnologyProjectCreate) -> dict:
+async def create_technology_project(technology_project: TechnologyProjectCreate, controller: PortfolioController = Depends(get_portfolio_controller)) -> dict:
     """Create a new technology-project relationship"""
-    result = PortfolioController.create_entity(technology_project)
+    result = await controller.create_entity_async(technology_project)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     return result
 
 
-@router.get("/", response_model=dict, summary="Get all technology-project relationships")
+@router.get("/", response_model=Union[ListResponse[TechnologyProjectResponse], BatchResponse[TechnologyProjectResponse]], summary="Get all technology-project relationships")
 async def get_technology_projects(
     technology_id: Optional[int] = Query(None, description="Filter by technology ID"),
     project_id: Optional[int] = Query(None, description="Filter by project ID"),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(10, ge=1, le=100, description="Max number of records to return")
-) -> dict:
+    limit: int = Query(10, ge=1, le=100, description="Max number of records to return"),
+    order: ListOrder = Depends(list_order(TechnologyProjectCreate)),
+    total_mode: TotalMode = Depends(list_total_mode),
+    fields: Optional[Tuple[str, ...]] = Depends(field_selection(TechnologyProjectCreate)),
+    ids: Optional[Tuple[int, ...]] = Depends(id_batch),
+    expand: Optional[Tuple[str, ...]] = Depends(relation_expansion(TechnologyProjectCreate)),
+    controller: PortfolioController = Depends(get_portfolio_controller)
+) -> RowsJSONResponse:
     """Get all technology-project relationships with optional filters"""
+    if ids is not None:
+        result = await controller.get_entities_by_ids_async(TechnologyProjectCreate, ids, fields, expand)
+        if not result["success"]:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
+        return RowsJSONResponse(result)
+
     filters = {}
     if technology_id is not None:
         filters["technology_id"] = technology_id
     if project_id is not None:
         filters["project_id"] = project_id
 
-    result = PortfolioController.get_entities(TechnologyProjectCreate, filters if filters else None, skip, limit)
+    result = await controller.get_entities_async(TechnologyProjectCreate, filters if filters else None, skip, limit, order.after, total_mode, fields, order.sort, expand)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
-    return result
+    return RowsJSONResponse(result)
 
 
-@router.get("/{technology_project_id}", response_model=dict, summary="Get technology-project relationship by ID")
-async def get_technology_project(technology_project_id: int) -> dict:
+@router.get("/{technology_project_id}", response_model=ItemResponse[TechnologyProjectResponse], summary="Get technology-project relationship by ID")
+async def get_technology_project(technology_project_id: int, fields: Optional[Tuple[str, ...]] = Depends(field_selection(TechnologyProjectCreate)), controller: PortfolioController = Depends(get_portfolio_controller)) -> RowsJSONResponse:
     """Get a single technology-project relationship by ID"""
-    result = PortfolioController.get_entity_by_id(TechnologyProjectCreate, technology_project_id)
+    result = await controller.get_entity_by_id_async(TechnologyProjectCreate, technology_project_id, fields)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["message"])
     if not result["data"]:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Technology-project relationship not found")
-    return result
+    return RowsJSONResponse(result)
 
 
 @router.delete("/{technology_project_id}", response_model=MessageResponse, summary="Delete technology-project relationship")
-async def delete_technology_project(technology_project_id: int) -> MessageResponse:
+async def delete_technology_project(technology_project_id: int, controller: PortfolioController = Depends(get_portfolio_controller)) -> MessageResponse:
     """Delete a technology-project relationship by ID"""
-    result = PortfolioController.delete_entity(TechnologyProjectCreate, technology_project_id)
+    result = await controller.delete_entity_async(TechnologyProjectCreate, technology_project_id)
     if not result["success"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     return MessageResponse(message=result["message"])
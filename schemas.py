@@ -4,7 +4,7 @@ Pydantic schemas for data validation
 
 from pydantic import BaseModel, Field
 from datetime import datetime, date
-from typing import Optional, List, Tuple, Dict, Any
+from typing import Optional, List, Tuple, Dict, Any, Generic, TypeVar
 from database.entities.mysql_entity import MySQLEntity
 
 
@@ -53,6 +53,10 @@ class CompanyCreate(MySQLEntity):
     def get_field_mappings(cls) -> Dict[str, str]:
         return {"name": "name", "logo_path": "logo_path"}
 
+    @classmethod
+    def get_sortable_fields(cls) -> Dict[str, Optional[str]]:
+        return {"id": "PRIMARY", "name": "idx_name"}
+
     def get_insert_query(self) -> Tuple[str, tuple]:
         query = "INSERT INTO companies (name, logo_path) VALUES (%s, %s)"
         params = (self.name, self.logo_path)
@@ -130,6 +134,10 @@ class TechnologyCreate(MySQLEntity):
     def get_field_mappings(cls) -> Dict[str, str]:
         return {"name": "name", "abbr": "abbr"}
 
+    @classmethod
+    def get_sortable_fields(cls) -> Dict[str, Optional[str]]:
+        return {"id": "PRIMARY", "name": "idx_name", "abbr": "idx_abbr"}
+
     def get_insert_query(self) -> Tuple[str, tuple]:
         query = "INSERT INTO technologies (name, abbr) VALUES (%s, %s)"
         params = (self.name, self.abbr)
@@ -220,6 +228,26 @@ class ProfessionalExperienceCreate(MySQLEntity):
             "is_current": "is_current"
         }
 
+    @classmethod
+    def get_fulltext_fields(cls) -> Tuple[str, ...]:
+        return ("description",)
+
+    @classmethod
+    def get_sortable_fields(cls) -> Dict[str, Optional[str]]:
+        return {
+            "id": "PRIMARY",
+            "title": "idx_title",
+            # idx_dates (start_date, end_date) cannot serve the (start_date, id) order, end_date sits in between
+            "start_date": None,
+            "end_date": None,
+            "is_current": "idx_is_current"
+        }
+
+    @classmethod
+    def get_nullable_fields(cls) -> Tuple[str, ...]:
+        # Current positions may be stored without an end date, keyset pages must not skip them
+        return ("end_date",)
+
     def get_insert_query(self) -> Tuple[str, tuple]:
         query = "INSERT INTO professional_experiences (title, description, start_date, end_date, is_current) VALUES (%s, %s, %s, %s, %s)"
         params = (self.title, self.description, self.start_date, self.end_date, self.is_current)
@@ -318,6 +346,14 @@ class ProjectCreate(MySQLEntity):
     def get_field_mappings(cls) -> Dict[str, str]:
         return {"name": "name", "description": "description", "github_uri": "github_uri"}
 
+    @classmethod
+    def get_fulltext_fields(cls) -> Tuple[str, ...]:
+        return ("description",)
+
+    @classmethod
+    def get_sortable_fields(cls) -> Dict[str, Optional[str]]:
+        return {"id": "PRIMARY", "name": "idx_name"}
+
     def get_insert_query(self) -> Tuple[str, tuple]:
         query = "INSERT INTO projects (name, description, github_uri) VALUES (%s, %s, %s)"
         params = (self.name, self.description, self.github_uri)
@@ -401,6 +437,14 @@ class ProjectTaskCreate(MySQLEntity):
     def get_field_mappings(cls) -> Dict[str, str]:
         return {"name": "name", "description": "description", "project_id": "project_id"}
 
+    @classmethod
+    def get_fulltext_fields(cls) -> Tuple[str, ...]:
+        return ("description",)
+
+    @classmethod
+    def get_sortable_fields(cls) -> Dict[str, Optional[str]]:
+        return {"id": "PRIMARY", "name": "idx_name", "project_id": "idx_project_id"}
+
     def get_insert_query(self) -> Tuple[str, tuple]:
         query = "INSERT INTO project_tasks (name, description, project_id) VALUES (%s, %s, %s)"
         params = (self.name, self.description, self.project_id)
@@ -483,6 +527,14 @@ class ResponsibilityCreate(MySQLEntity):
     def get_field_mappings(cls) -> Dict[str, str]:
         return {"experience_id": "experience_id", "description": "description"}
 
+    @classmethod
+    def get_fulltext_fields(cls) -> Tuple[str, ...]:
+        return ("description",)
+
+    @classmethod
+    def get_sortable_fields(cls) -> Dict[str, Optional[str]]:
+        return {"id": "PRIMARY", "experience_id": "idx_experience_id"}
+
     def get_insert_query(self) -> Tuple[str, tuple]:
         query = "INSERT INTO responsibilities (experience_id, description) VALUES (%s, %s)"
         params = (self.experience_id, self.description)
@@ -560,6 +612,10 @@ class TechnologyProjectCreate(MySQLEntity):
     def get_field_mappings(cls) -> Dict[str, str]:
         return {"technology_id": "technology_id", "project_id": "project_id"}
 
+    @classmethod
+    def get_sortable_fields(cls) -> Dict[str, Optional[str]]:
+        return {"id": "PRIMARY", "technology_id": "idx_technology_id", "project_id": "idx_project_id"}
+
     def get_insert_query(self) -> Tuple[str, tuple]:
         query = "INSERT INTO technology_projects (technology_id, project_id) VALUES (%s, %s)"
         params = (self.technology_id, self.project_id)
@@ -604,6 +660,10 @@ class CompanyExperienceCreate(MySQLEntity):
     def get_field_mappings(cls) -> Dict[str, str]:
         return {"company_id": "company_id", "experience_id": "experience_id"}
 
+    @classmethod
+    def get_sortable_fields(cls) -> Dict[str, Optional[str]]:
+        return {"id": "PRIMARY", "company_id": "idx_company_id", "experience_id": "idx_experience_id"}
+
     def get_insert_query(self) -> Tuple[str, tuple]:
         query = "INSERT INTO company_experiences (company_id, experience_id) VALUES (%s, %s)"
         params = (self.company_id, self.experience_id)
@@ -648,6 +708,10 @@ class TechnologyExperienceCreate(MySQLEntity):
     def get_field_mappings(cls) -> Dict[str, str]:
         return {"technology_id": "technology_id", "experience_id": "experience_id"}
 
+    @classmethod
+    def get_sortable_fields(cls) -> Dict[str, Optional[str]]:
+        return {"id": "PRIMARY", "technology_id": "idx_technology_id", "experience_id": "idx_experience_id"}
+
     def get_insert_query(self) -> Tuple[str, tuple]:
         query = "INSERT INTO technology_experiences (technology_id, experience_id) VALUES (%s, %s)"
         params = (self.technology_id, self.experience_id)
@@ -725,3 +789,28 @@ class PaginatedResponse(BaseModel):
 class MessageResponse(BaseModel):
     message: str
     detail: Optional[str] = None
+
+
+# Envelopes returned by the data routes; documentation only, the rows are sent without validation (see responses.py)
+# and may hold only the fields= columns or extra expand= relations
+
+T = TypeVar("T")
+
+
+class ListResponse(BaseModel, Generic[T]):
+    success: bool
+    data: List[T]
+    total: Optional[int] = None
+    total_estimated: Optional[bool] = None
+    next_cursor: Optional[str] = None
+
+
+class BatchResponse(BaseModel, Generic[T]):
+    success: bool
+    data: Dict[int, T]
+    missing: List[int]
+
+
+class ItemResponse(BaseModel, Generic[T]):
+    success: bool
+    data: Optional[T] = None
@@ -0,0 +1,138 @@
+"""
+Shared fixtures: the app runs against an in-memory SQLite database standing in for MySQL
+pymysql.connect is replaced by FakeConnection, which translates the few MySQL-only constructs the queries use
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import uuid
+
+import jwt
+import pymysql
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Read by the settings classes when main is imported
+os.environ.update(
+    HOST="localhost",
+    DB_PORT="3306",
+    USERNAME="test",
+    PASSWORD="test",
+    DATABASE="portfolio",
+    SECRET_KEY="test-secret-key-of-at-least-32-bytes",
+    WHITE_LIST_IPS="",
+    DB_INVALIDATION_BACKEND="process",
+)
+
+SCHEMA = """
+CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT, email TEXT, password TEXT, created_at TEXT DEFAULT CURRENT_TIMESTAMP, updated_at TEXT DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE api_keys (id INTEGER PRIMARY KEY, name TEXT, key_prefix TEXT, key_hash TEXT UNIQUE, is_active INT DEFAULT 1, created_at TEXT DEFAULT CURRENT_TIMESTAMP, revoked_at TEXT);
+CREATE TABLE companies (id INTEGER PRIMARY KEY, name TEXT, logo_path TEXT, created_at TEXT DEFAULT CURRENT_TIMESTAMP, updated_at TEXT DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE technologies (id INTEGER PRIMARY KEY, name TEXT, abbr TEXT, created_at TEXT DEFAULT CURRENT_TIMESTAMP, updated_at TEXT DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE professional_experiences (id INTEGER PRIMARY KEY, title TEXT, description TEXT, start_date TEXT, end_date TEXT, is_current INT DEFAULT 0, created_at TEXT DEFAULT CURRENT_TIMESTAMP, updated_at TEXT DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE projects (id INTEGER PRIMARY KEY, name TEXT, description TEXT, github_uri TEXT, created_at TEXT DEFAULT CURRENT_TIMESTAMP, updated_at TEXT DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE project_tasks (id INTEGER PRIMARY KEY, name TEXT, description TEXT, project_id INT, created_at TEXT DEFAULT CURRENT_TIMESTAMP, updated_at TEXT DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE responsibilities (id INTEGER PRIMARY KEY, experience_id INT, description TEXT, created_at TEXT DEFAULT CURRENT_TIMESTAMP, updated_at TEXT DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE technology_projects (id INTEGER PRIMARY KEY, technology_id INT, project_id INT, created_at TEXT DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE company_experiences (id INTEGER PRIMARY KEY, company_id INT, experience_id INT, created_at TEXT DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE technology_experiences (id INTEGER PRIMARY KEY, technology_id INT, experience_id INT, created_at TEXT DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE table_versions (table_name TEXT PRIMARY KEY, version INT NOT NULL DEFAULT 0);
+INSERT INTO table_versions (table_name) VALUES ('companies'), ('technologies'), ('professional_experiences'), ('projects'),
+    ('project_tasks'), ('responsibilities'), ('technology_projects'), ('company_experiences'), ('technology_experiences');
+"""
+
+
+def translate(query: str) -> str:
+    """MySQL query as SQLite understands it"""
+    if "information_schema.TABLES" in query:
+        # No table statistics, estimated totals fall back to an exact count
+        return "SELECT NULL AS total FROM (SELECT 1 WHERE ? IS NOT NULL)"
+    query = query.replace("%s", "?")
+    query = re.sub(r"MATCH\((\w+)\) AGAINST \(\? IN NATURAL LANGUAGE MODE\)", r"instr(\1, ?)", query)
+    # MySQL escapes LIKE wildcards with a backslash by default, SQLite needs it spelled out
+    return query.replace("LIKE ?", "LIKE ? ESCAPE '\\'")
+
+
+class FakeCursor:
+    """DictCursor over a SQLite cursor"""
+
+    def __init__(self, connection: "FakeConnection"):
+        self._cursor = connection.raw.cursor()
+        self.lastrowid = None
+        self.rowcount = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._cursor.close()
+
+    def execute(self, query: str, params=()):
+        self._cursor.execute(translate(query), [int(value) if isinstance(value, bool) else value for value in params or ()])
+        self.lastrowid = self._cursor.lastrowid
+        self.rowcount = self._cursor.rowcount
+
+    def fetchall(self):
+        columns = [column[0] for column in self._cursor.description]
+        return [dict(zip(columns, row)) for row in self._cursor.fetchall()]
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip([column[0] for column in self._cursor.description], row))
+
+
+class FakeConnection:
+    """The subset of a pymysql connection used by MySQLConnection and MySQLConnectionPool"""
+
+    def __init__(self, uri: str):
+        self.raw = sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None)
+        self.open = True
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def ping(self, reconnect: bool = False):
+        pass
+
+    def close(self):
+        self.open = False
+        self.raw.close()
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """A fresh database, kept alive for the test by its own connection which is also returned for seeding"""
+    uri = f"file:portfolio-{uuid.uuid4().hex}?mode=memory&cache=shared"
+    keep = sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None)
+    keep.executescript(SCHEMA)
+    monkeypatch.setattr(pymysql, "connect", lambda *args, **kwargs: FakeConnection(uri))
+    yield keep
+    keep.close()
+
+
+@pytest.fixture
+def token() -> str:
+    return jwt.encode({"username": "test"}, os.environ["SECRET_KEY"], algorithm="HS256")
+
+
+@pytest.fixture
+def client(database, token):
+    """TestClient running the app lifespan, authenticated with a bearer token"""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as client:
+        client.headers["Authorization"] = f"Bearer {token}"
+        yield client
@@ -0,0 +1,62 @@
+"""
+IP allowlist: CIDR ranges and IPv6, with the client address taken from X-Forwarded-For only behind trusted proxies
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from middleware.allowlist import IPAllowlist
+
+
+def test_ranges_addresses_and_literals():
+    allowlist = IPAllowlist(["10.0.0.0/16", "10.1.0.0/16", "192.168.1.7", "2001:db8::/32", "testclient", " "])
+    assert "10.0.255.255" in allowlist
+    assert "10.1.3.4" in allowlist
+    assert "10.2.0.1" not in allowlist
+    assert "192.168.1.7" in allowlist and "192.168.1.8" not in allowlist
+    assert "2001:db8::1" in allowlist and "2001:db9::1" not in allowlist
+    assert "::ffff:10.0.0.1" in allowlist
+    assert "testclient" in allowlist
+    assert None not in allowlist
+    # The two adjacent /16 ranges are merged into one
+    assert len(allowlist) == 4
+
+
+def from_peer(host):
+    """
+    main.app seen from a given peer address, Starlette's TestClient sends no client address
+    The token is not valid: the allowlist skips its verification, the HTTPBearer dependency of the routes only needs one
+    """
+    async def app(scope, receive, send):
+        await main.app({**scope, "client": (host, 50000)}, receive, send)
+    return TestClient(app, headers={"Authorization": "Bearer not-a-valid-token"})
+
+
+@pytest.fixture
+def proxied(client, monkeypatch):
+    """Requests coming through a trusted proxy, with 203.0.113.0/24 and 2001:db8::/32 allowed"""
+    monkeypatch.setattr(main.app.state, "white_list_ips", IPAllowlist(["203.0.113.0/24", "2001:db8::/32"]))
+    monkeypatch.setattr(main.app.state, "trusted_proxies", IPAllowlist(["10.0.0.0/8"]))
+    return from_peer("10.0.0.2")
+
+
+def test_allowed_range_needs_no_valid_token(proxied):
+    assert proxied.get("/companies/", headers={"X-Forwarded-For": "203.0.113.42"}).status_code == 200
+    assert proxied.get("/companies/", headers={"X-Forwarded-For": "2001:db8::7, 10.0.0.3"}).status_code == 200
+
+
+def test_other_addresses_need_a_valid_token(proxied):
+    assert proxied.get("/companies/", headers={"X-Forwarded-For": "198.51.100.1"}).status_code == 401
+    assert proxied.get("/companies/").status_code == 401
+
+
+def test_spoofed_forwarded_for_is_ignored(proxied):
+    # The client prepends an allowed address, the proxy appends the real one: the rightmost untrusted hop wins
+    assert proxied.get("/companies/", headers={"X-Forwarded-For": "203.0.113.42, 198.51.100.1"}).status_code == 401
+
+
+def test_forwarded_for_from_an_untrusted_peer_is_ignored(client, monkeypatch):
+    monkeypatch.setattr(main.app.state, "white_list_ips", IPAllowlist(["203.0.113.0/24"]))
+    assert from_peer("198.51.100.1").get("/companies/", headers={"X-Forwarded-For": "203.0.113.42"}).status_code == 401
+    assert from_peer("203.0.113.9").get("/companies/").status_code == 200
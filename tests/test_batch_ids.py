@@ -0,0 +1,32 @@
+"""
+ids= batch lookup: rows keyed by id, missing ids listed, filters and pagination ignored
+"""
+
+
+def seed(database):
+    database.executemany("INSERT INTO projects (name, description, github_uri) VALUES (?, ?, ?)", [(f"Project {i}", "Demo", f"https://github.com/p{i}") for i in range(4)])
+
+
+def test_rows_are_keyed_by_id_with_the_missing_ones_listed(client, database):
+    seed(database)
+    body = client.get("/projects/", params={"ids": "4,2,99"}).json()
+    assert body["success"]
+    assert {key: row["name"] for key, row in body["data"].items()} == {"4": "Project 3", "2": "Project 1"}
+    assert body["missing"] == [99]
+
+
+def test_filters_and_pagination_are_ignored(client, database):
+    seed(database)
+    body = client.get("/projects/", params={"ids": "1,3", "name": "nothing", "limit": 1, "skip": 5}).json()
+    assert sorted(body["data"]) == ["1", "3"]
+
+
+def test_projection_applies_to_the_batch(client, database):
+    seed(database)
+    assert client.get("/projects/", params={"ids": "2", "fields": "name"}).json()["data"] == {"2": {"id": 2, "name": "Project 1"}}
+
+
+def test_invalid_id_lists_are_rejected(client, database):
+    assert client.get("/projects/", params={"ids": "1,a"}).status_code == 400
+    assert client.get("/projects/", params={"ids": "0"}).status_code == 400
+    assert client.get("/projects/", params={"ids": ",".join(str(i) for i in range(1, 102))}).status_code == 400
@@ -0,0 +1,52 @@
+"""
+Response compression: negotiated with Accept-Encoding, skipped for small bodies, reused from the response cache
+"""
+
+import gzip
+
+import main
+from middleware.compression import accepted_encodings
+
+
+def seed(database, count=30):
+    database.executemany("INSERT INTO companies (name, logo_path) VALUES (?, ?)", [(f"Company {i}", f"/logos/company-{i}.png") for i in range(count)])
+
+
+def test_large_list_is_gzipped(client, database):
+    seed(database)
+    response = client.get("/companies/", params={"limit": 30}, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert len(response.json()["data"]) == 30
+
+
+def test_small_body_and_refused_coding_are_sent_as_is(client, database):
+    seed(database, count=1)
+    small = client.get("/companies/1", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+    seed(database)
+    refused = client.get("/companies/", params={"limit": 30}, headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert "content-encoding" not in refused.headers
+    assert accepted_encodings("gzip;q=0, br") == {"br"}
+
+
+def test_cached_response_reuses_its_compressed_variant(client, database):
+    seed(database)
+    params, headers = {"limit": 30}, {"Accept-Encoding": "gzip"}
+    first = client.get("/companies/", params=params, headers=headers)
+    cache = main.app.state.response_cache
+    variant_hits = cache.stats()["variant_hits"]
+
+    second = client.get("/companies/", params=params, headers=headers)
+    assert second.headers["x-cache"] == "HIT"
+    assert cache.stats()["variant_hits"] == variant_hits + 1
+    assert second.content == first.content
+
+
+def test_gzip_body_decodes_to_the_identity_body(client, database):
+    seed(database)
+    identity = client.get("/companies/", params={"limit": 30}, headers={"Accept-Encoding": "identity"})
+    with client.stream("GET", "/companies/", params={"limit": 30}, headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert gzip.decompress(raw) == identity.content
@@ -0,0 +1,68 @@
+"""
+ETag/Last-Modified of the entity routes: tokens depend on the database only and 304s still carry CORS headers
+"""
+
+from database.versions import TableVersionTracker
+
+
+def seed(database):
+    database.executemany("INSERT INTO technologies (name, abbr) VALUES (?, ?)", [("Python", "PY"), ("Rust", "RS")])
+
+
+def test_trackers_over_the_same_tables_agree():
+    rows = {"companies": (3, 7, "2024-05-01 10:00:00", 4), "projects": (2, 2, None, 0)}
+
+    def fetch(tables):
+        return {table: rows[table] for table in tables}
+
+    first = TableVersionTracker(fetch, ttl=0)
+    # A worker that saw writes of its own (or restarted) must still produce the same token
+    second = TableVersionTracker(fetch, ttl=0)
+    second.invalidate(["companies", "projects"])
+    second.invalidate(["companies"])
+    assert first.version(["companies", "projects"]).token == second.version(["projects", "companies"]).token
+
+
+def test_token_follows_deletes_and_inserts():
+    rows = {"companies": (3, 7, "2024-05-01 10:00:00", 1)}
+    tracker = TableVersionTracker(lambda tables: {table: rows[table] for table in tables}, ttl=0)
+    tokens = {tracker.version(["companies"]).token}
+
+    rows["companies"] = (2, 7, "2024-05-01 10:00:00", 2)  # a delete
+    tokens.add(tracker.version(["companies"]).token)
+    rows["companies"] = (3, 8, "2024-05-01 10:00:00", 3)  # an insert in the same second
+    tokens.add(tracker.version(["companies"]).token)
+    assert len(tokens) == 3
+
+
+def test_not_modified_keeps_cors_headers(client, database):
+    seed(database)
+    first = client.get("/technologies/")
+    etag = first.headers["etag"]
+
+    response = client.get("/technologies/", headers={"If-None-Match": etag, "Origin": "https://site.example"})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.headers["access-control-allow-origin"] == "*"
+
+
+def test_etag_changes_after_a_write(client, database):
+    seed(database)
+    etag = client.get("/technologies/").headers["etag"]
+    assert client.delete("/technologies/1").status_code == 200
+    response = client.get("/technologies/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_etag_changes_after_two_updates_in_the_same_second(client, database):
+    seed(database)
+    # updated_at is not touched by the test database, as if both updates landed within the same second
+    etag = client.get("/technologies/").headers["etag"]
+    assert client.put("/technologies/1", json={"abbr": "py"}).status_code == 200
+    first = client.get("/technologies/", headers={"If-None-Match": etag})
+    assert first.status_code == 200
+    assert client.put("/technologies/1", json={"abbr": "Py"}).status_code == 200
+    second = client.get("/technologies/", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 200
+    assert second.json()["data"][0]["abbr"] == "Py"
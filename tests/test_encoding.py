@@ -0,0 +1,39 @@
+"""
+Response encoding: orjson and the json module fallback give the same bytes for the column types pymysql returns
+"""
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from database.utils import encoding
+
+ROW = {
+    "id": 1,
+    "name": "Café ☕",
+    "start_date": date(2024, 5, 1),
+    "created_at": datetime(2024, 5, 1, 10, 30, 5),
+    "duration": timedelta(hours=1, seconds=30),
+    "rate": Decimal("12.50"),
+    "logo": b"/logo.png",
+    "end_date": None,
+}
+
+
+def test_fallback_gives_the_same_bytes(monkeypatch):
+    fast = encoding.dumps({"data": {1: ROW}})
+    monkeypatch.setattr(encoding, "orjson", None)
+    assert encoding.dumps({"data": {1: ROW}}) == fast
+
+
+def test_column_types_are_encoded_like_fastapi():
+    assert encoding.dumps(ROW) == (
+        '{"id":1,"name":"Café ☕","start_date":"2024-05-01","created_at":"2024-05-01T10:30:05",'
+        '"duration":3630.0,"rate":12.5,"logo":"/logo.png","end_date":null}'
+    ).encode("utf-8")
+
+
+def test_routes_send_compact_utf8_json(client, database):
+    database.execute("INSERT INTO companies (name, logo_path) VALUES ('Café', '/cafe.png')")
+    response = client.get("/companies/1", params={"fields": "name"})
+    assert response.headers["content-type"] == "application/json"
+    assert response.content == '{"success":true,"data":{"id":1,"name":"Café"}}'.encode("utf-8")
@@ -0,0 +1,72 @@
+"""
+expand= eager loading: related rows are embedded with one batched query per relation, whatever the page size
+"""
+
+import pytest
+
+from conftest import FakeCursor
+
+
+def seed(database):
+    database.executescript("""
+        INSERT INTO projects (id, name, description, github_uri) VALUES
+            (1, 'One', 'First', 'https://github.com/1'), (2, 'Two', 'Second', 'https://github.com/2'), (3, 'Three', 'Third', 'https://github.com/3');
+        INSERT INTO project_tasks (name, description, project_id) VALUES ('a', 'a', 1), ('b', 'b', 1), ('c', 'c', 3);
+        INSERT INTO technologies (id, name, abbr) VALUES (1, 'Python', 'PY'), (2, 'Rust', 'RS');
+        INSERT INTO technology_projects (technology_id, project_id) VALUES (1, 1), (2, 1), (2, 2);
+    """)
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    executed = []
+    execute = FakeCursor.execute
+
+    def counting(self, query, params=()):
+        # Table versions are read for the ETag, once per TTL, not per page
+        if "table_versions" not in query:
+            executed.append(query)
+        return execute(self, query, params)
+
+    monkeypatch.setattr(FakeCursor, "execute", counting)
+    return executed
+
+
+def test_relations_are_embedded(client, database):
+    seed(database)
+    rows = client.get("/projects/", params={"expand": "tasks,technologies"}).json()["data"]
+    assert [[task["name"] for task in row["tasks"]] for row in rows] == [["a", "b"], [], ["c"]]
+    assert [[technology["abbr"] for technology in row["technologies"]] for row in rows] == [["PY", "RS"], ["RS"], []]
+
+    tasks = client.get("/project-tasks/", params={"expand": "project"}).json()["data"]
+    assert [task["project"]["name"] for task in tasks] == ["One", "One", "Three"]
+
+
+def test_one_query_per_relation_whatever_the_page_size(client, database, queries):
+    seed(database)
+    client.get("/projects/", params={"expand": "tasks,technologies", "limit": 1, "include_total": "false"})
+    single = len(queries)
+    queries.clear()
+    client.get("/projects/", params={"expand": "tasks,technologies", "limit": 3, "include_total": "false"})
+    assert len(queries) == single == 3
+
+
+def test_projection_keeps_the_join_key(client, database):
+    seed(database)
+    tasks = client.get("/project-tasks/", params={"expand": "project", "fields": "name"}).json()["data"]
+    assert tasks[2]["project"]["name"] == "Three"
+
+
+def test_write_to_an_expanded_table_drops_the_cached_response(client, database):
+    seed(database)
+    client.get("/projects/", params={"expand": "tasks"})
+    assert client.get("/projects/", params={"expand": "tasks"}).headers["x-cache"] == "HIT"
+    assert client.post("/project-tasks/", json={"name": "d", "description": "d", "project_id": 2}).status_code == 201
+
+    response = client.get("/projects/", params={"expand": "tasks"})
+    assert response.headers["x-cache"] == "MISS"
+    assert [task["name"] for task in response.json()["data"][1]["tasks"]] == ["d"]
+
+
+def test_unknown_relation_is_a_bad_request(client, database):
+    assert client.get("/projects/", params={"expand": "owner"}).status_code == 400
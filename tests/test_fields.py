@@ -0,0 +1,32 @@
+"""
+fields= projection: only the requested columns (and id) are returned, on lists, keyset pages and single records
+"""
+
+
+def seed(database):
+    database.executemany("INSERT INTO technologies (name, abbr) VALUES (?, ?)", [("Python", "PY"), ("Rust", "RS"), ("Go", "GO")])
+
+
+def test_list_returns_only_the_requested_fields(client, database):
+    seed(database)
+    rows = client.get("/technologies/", params={"fields": "abbr"}).json()["data"]
+    assert rows == [{"id": 1, "abbr": "PY"}, {"id": 2, "abbr": "RS"}, {"id": 3, "abbr": "GO"}]
+
+
+def test_detail_returns_only_the_requested_fields(client, database):
+    seed(database)
+    assert client.get("/technologies/2", params={"fields": "name"}).json()["data"] == {"id": 2, "name": "Rust"}
+
+
+def test_sorted_keyset_pages_keep_working_with_a_projection(client, database):
+    seed(database)
+    first = client.get("/technologies/", params={"fields": "abbr", "sort": "name", "after": 0, "limit": 2}).json()
+    assert [row["abbr"] for row in first["data"]] == ["GO", "PY"]
+    second = client.get("/technologies/", params={"fields": "abbr", "cursor": first["next_cursor"], "limit": 2}).json()
+    assert [row["abbr"] for row in second["data"]] == ["RS"]
+
+
+def test_unknown_field_is_a_bad_request(client, database):
+    response = client.get("/technologies/", params={"fields": "name,password"})
+    assert response.status_code == 400
+    assert "password" in response.json()["detail"]
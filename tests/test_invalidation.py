@@ -0,0 +1,150 @@
+"""
+Invalidation bus: writes published by one worker reach the caches of the others, never the publisher itself
+"""
+
+import json
+import queue
+import time
+
+from database.client import MySQLService
+from database.invalidation import KNOWN_TABLES, InvalidationBus, RedisBus, SharedMemoryBus, create_invalidation_bus
+from database.settings import DatabaseSettings
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class FakeRedis:
+    """publish() and pubsub() of redis-py over in-memory queues, one per subscriber"""
+
+    def __init__(self):
+        self.subscribers = []
+
+    def publish(self, channel, message):
+        for subscriber in self.subscribers:
+            if channel in subscriber.channels:
+                subscriber.messages.put({"type": "message", "channel": channel, "data": message.encode("utf-8")})
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+
+class FakePubSub:
+    def __init__(self, client: FakeRedis):
+        self.channels = set()
+        self.messages = queue.Queue()
+        client.subscribers.append(self)
+
+    def subscribe(self, channel):
+        self.channels.add(channel)
+
+    def get_message(self, ignore_subscribe_messages=True, timeout=0.0):
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        pass
+
+
+def test_process_bus_delivers_nothing():
+    bus = create_invalidation_bus("process")
+    received = []
+    bus.subscribe(received.append)
+    bus.publish(["companies"])
+    assert type(bus) is InvalidationBus
+    assert received == []
+    assert bus.stats()["published"] == 1
+
+
+def test_api_keys_keeps_the_existing_shm_slots():
+    assert KNOWN_TABLES[-1] == "api_keys"
+    assert list(KNOWN_TABLES[:-1]) == sorted(KNOWN_TABLES[:-1])
+
+
+def test_shm_bus_reaches_other_workers_only(tmp_path):
+    path = str(tmp_path / "invalidation.bin")
+    first, second = SharedMemoryBus(path), SharedMemoryBus(path)
+    first_received, second_received = [], []
+    first.subscribe(first_received.append)
+    second.subscribe(second_received.append)
+    try:
+        first.publish(["companies", "company_experiences"])
+        first.poll()
+        second.poll()
+        assert first_received == []
+        assert second_received == [frozenset({"companies", "company_experiences"})]
+
+        # Tables outside KNOWN_TABLES use slot 0, which stands for every table
+        second.publish(["unknown_table"])
+        first.poll()
+        assert first_received == [frozenset(KNOWN_TABLES)]
+    finally:
+        first.close()
+        second.close()
+
+
+def test_shm_poll_thread(tmp_path):
+    path = str(tmp_path / "invalidation.bin")
+    first, second = SharedMemoryBus(path, poll_interval=0.005), SharedMemoryBus(path, poll_interval=0.005)
+    received = []
+    second.subscribe(received.append)
+    second.start()
+    try:
+        first.publish(["projects"])
+        assert wait_for(lambda: received == [frozenset({"projects"})])
+    finally:
+        first.close()
+        second.close()
+
+
+def test_redis_bus_skips_its_own_messages():
+    client = FakeRedis()
+    first, second = RedisBus(client=client), RedisBus(client=client)
+    first_received, second_received = [], []
+    first.subscribe(first_received.append)
+    second.subscribe(second_received.append)
+    first.start()
+    second.start()
+    try:
+        first.publish(["technologies"])
+        assert wait_for(lambda: second_received == [frozenset({"technologies"})])
+        time.sleep(0.05)
+        assert first_received == []
+
+        # Malformed messages are ignored
+        second.handle({"type": "message", "data": b"not json"})
+        second.handle({"type": "message", "data": json.dumps({"origin": "other", "tables": []})})
+        assert second.stats()["received"] == 1
+    finally:
+        first.close()
+        second.close()
+
+
+def test_write_in_one_service_invalidates_another(database, tmp_path):
+    settings = DatabaseSettings(db_invalidation_backend="shm", db_invalidation_path=str(tmp_path / "invalidation.bin"))
+    writer, reader = MySQLService(settings), MySQLService(settings)
+    for service in (writer, reader):
+        service.set_invalidation_bus(create_invalidation_bus("shm", path=settings.db_invalidation_path))
+    received = []
+    reader.add_write_listener(received.append)
+    try:
+        reader.count_cache.set("companies", "all", 3, reader.count_cache.generation("companies"))
+        created = writer.create_api_key("deploy bot")
+        writer.revoke_api_key(created["id"])
+        writer.invalidation_bus.publish(["companies"])
+        reader.invalidation_bus.poll()
+
+        assert reader.count_cache.get("companies", "all") is None
+        assert reader.api_key_cache.is_revoked(created["id"])
+        assert any("companies" in tables for tables in received)
+    finally:
+        writer.close()
+        reader.close()
@@ -0,0 +1,40 @@
+"""
+Text filters: contains, prefix and exact match modes, escaped wildcards and full-text search
+"""
+
+
+def names(client, **params):
+    return sorted(row["name"] for row in client.get("/companies/", params=params).json()["data"])
+
+
+def seed(database):
+    database.executemany(
+        "INSERT INTO companies (name, logo_path) VALUES (?, ?)",
+        [("Acme", "/a.png"), ("Acme Labs", "/b.png"), ("Big Acme", "/c.png"), ("100% Tech", "/d.png"), ("1000 Tech", "/e.png")],
+    )
+
+
+def test_match_modes(client, database):
+    seed(database)
+    assert names(client, name="Acme") == ["Acme", "Acme Labs", "Big Acme"]
+    assert names(client, name="Acme", name_match="prefix") == ["Acme", "Acme Labs"]
+    assert names(client, name="Acme", name_match="exact") == ["Acme"]
+
+
+def test_wildcards_in_the_value_are_literal(client, database):
+    seed(database)
+    assert names(client, name="100%") == ["100% Tech"]
+    assert names(client, name="100%", name_match="prefix") == ["100% Tech"]
+
+
+def test_unknown_match_mode_is_rejected(client, database):
+    assert client.get("/companies/", params={"name": "Acme", "name_match": "regex"}).status_code == 422
+
+
+def test_full_text_search_on_description(client, database):
+    database.executemany(
+        "INSERT INTO professional_experiences (title, description, start_date, end_date) VALUES (?, ?, ?, ?)",
+        [("Backend", "Built payment APIs", "2019-01-01", "2020-01-01"), ("Frontend", "Design system work", "2020-01-01", "2021-01-01")],
+    )
+    body = client.get("/experiences/", params={"search": "payment"}).json()
+    assert [row["title"] for row in body["data"]] == ["Backend"]
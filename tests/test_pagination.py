@@ -0,0 +1,41 @@
+"""
+Keyset pagination: after= and next_cursor walk the whole list once, whatever is inserted meanwhile
+"""
+
+
+def seed(database, count=5):
+    database.executemany("INSERT INTO companies (name, logo_path) VALUES (?, ?)", [(f"Company {i}", f"/{i}.png") for i in range(count)])
+
+
+def test_cursor_walks_every_row_once(client, database):
+    seed(database)
+    ids = []
+    body = client.get("/companies/", params={"after": 0, "limit": 2}).json()
+    while True:
+        ids.extend(row["id"] for row in body["data"])
+        if not body["next_cursor"]:
+            break
+        body = client.get("/companies/", params={"cursor": body["next_cursor"], "limit": 2}).json()
+    assert ids == [1, 2, 3, 4, 5]
+
+
+def test_insert_between_pages_does_not_shift_the_next_page(client, database):
+    seed(database)
+    first = client.get("/companies/", params={"after": 0, "limit": 2}).json()
+    # An insert before the cursor position would shift an OFFSET page, not a keyset one
+    database.execute("INSERT INTO companies (id, name, logo_path) VALUES (0, 'Early', '/early.png')")
+    second = client.get("/companies/", params={"cursor": first["next_cursor"], "limit": 2}).json()
+    assert [row["id"] for row in second["data"]] == [3, 4]
+
+
+def test_after_and_offset_pages_agree(client, database):
+    seed(database)
+    keyset = client.get("/companies/", params={"after": 2, "limit": 2}).json()["data"]
+    offset = client.get("/companies/", params={"skip": 2, "limit": 2}).json()["data"]
+    assert keyset == offset
+
+
+def test_malformed_cursor_is_a_bad_request(client, database):
+    seed(database)
+    assert client.get("/companies/", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/companies/", params={"cursor": "eyJhZnRlciI6Mn0", "after": 2}).status_code == 400
@@ -0,0 +1,85 @@
+"""
+PasswordPool: bounded queue, fail-fast saturation and slots held until the bcrypt thread is really done
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from database.utils.password import PasswordPool, PasswordPoolFull, get_password_hash
+
+
+def test_verify_and_hash():
+    async def main():
+        pool = PasswordPool(max_workers=1, max_queue=1)
+        try:
+            hashed = await pool.hash("secret")
+            assert await pool.verify("secret", hashed)
+            assert not await pool.verify("other", hashed)
+            assert pool.stats()["completed"] == 3
+        finally:
+            pool.close()
+
+    asyncio.run(main())
+
+
+def test_saturated_pool_rejects_instead_of_queueing():
+    release = threading.Event()
+
+    async def main():
+        pool = PasswordPool(max_workers=1, max_queue=1)
+        try:
+            running = [asyncio.ensure_future(pool.submit(release.wait)) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            with pytest.raises(PasswordPoolFull):
+                await pool.submit(release.wait)
+            assert pool.stats()["rejected"] == 1
+            assert pool.stats()["queued"] == 1
+
+            release.set()
+            await asyncio.gather(*running)
+            assert pool.stats()["in_flight"] == 0
+        finally:
+            release.set()
+            pool.close()
+
+    asyncio.run(main())
+
+
+def test_cancelled_caller_keeps_its_slot_until_the_thread_finishes():
+    release = threading.Event()
+
+    async def main():
+        pool = PasswordPool(max_workers=1, max_queue=0)
+        try:
+            task = asyncio.ensure_future(pool.submit(release.wait))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            # The thread is still busy, so the limit still counts it
+            assert pool.stats()["in_flight"] == 1
+            with pytest.raises(PasswordPoolFull):
+                await pool.submit(get_password_hash, "secret")
+
+            release.set()
+            for _ in range(100):
+                if pool.stats()["in_flight"] == 0:
+                    break
+                await asyncio.sleep(0.01)
+            assert pool.stats()["in_flight"] == 0
+            assert await pool.hash("secret")
+        finally:
+            release.set()
+            pool.close()
+
+    asyncio.run(main())
+
+
+def test_login_still_checks_the_password(client, database):
+    database.execute("INSERT INTO users (username, email, password) VALUES (?, ?, ?)", ("admin", "admin@example.com", get_password_hash("pw")))
+    ok = client.post("/auth/token", json={"api_user": {"username": "admin", "email": "admin@example.com", "password": "pw"}}).json()
+    assert ok["success"]
+    wrong = client.post("/auth/token", json={"api_user": {"username": "admin", "email": "admin@example.com", "password": "nope"}}).json()
+    assert not wrong["success"]
@@ -0,0 +1,66 @@
+"""
+Connection pool bounds: at most max_size connections, waiters time out, broken connections are replaced
+"""
+
+import threading
+
+import pytest
+
+from database.pool import MySQLConnectionPool, PoolClosedError, PoolTimeoutError
+from database.settings import DatabaseSettings
+
+
+def make_pool(**kwargs) -> MySQLConnectionPool:
+    return MySQLConnectionPool(DatabaseSettings().to_config(), **kwargs)
+
+
+def test_open_warms_min_size(database):
+    pool = make_pool(min_size=2, max_size=4)
+    pool.open()
+    assert pool.stats()["idle"] == 2
+    pool.close()
+
+
+def test_connections_are_reused(database):
+    pool = make_pool(min_size=0, max_size=2)
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    assert pool.stats()["created"] == 1
+
+
+def test_checkout_times_out_at_max_size(database):
+    pool = make_pool(min_size=0, max_size=1)
+    held = pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire(timeout=0.05)
+    pool.release(held)
+
+
+def test_waiter_gets_the_released_connection(database):
+    pool = make_pool(min_size=0, max_size=1)
+    held = pool.acquire()
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire(timeout=5)))
+    waiter.start()
+    pool.release(held)
+    waiter.join(timeout=5)
+    assert acquired == [held]
+    assert pool.stats()["waits"] >= 1
+
+
+def test_closed_connection_is_replaced(database):
+    pool = make_pool(min_size=0, max_size=1)
+    broken = pool.acquire()
+    broken.close()
+    pool.release(broken)
+    assert pool.stats()["size"] == 0
+    assert pool.acquire() is not broken
+
+
+def test_closed_pool_refuses_checkouts(database):
+    pool = make_pool(min_size=1, max_size=1)
+    pool.open()
+    pool.close()
+    with pytest.raises(PoolClosedError):
+        pool.acquire()
@@ -0,0 +1,58 @@
+"""
+GET /portfolio: the nested graph, served from the pre-encoded snapshot and rebuilt after writes
+"""
+
+import time
+
+import main
+
+
+def seed(database):
+    database.executescript("""
+        INSERT INTO companies (id, name, logo_path) VALUES (1, 'Acme', '/acme.png');
+        INSERT INTO technologies (id, name, abbr) VALUES (1, 'Python', 'PY'), (2, 'Rust', 'RS');
+        INSERT INTO professional_experiences (id, title, description, start_date, end_date) VALUES
+            (1, 'Backend', 'APIs', '2019-01-01', '2020-01-01'), (2, 'Lead', 'Team', '2021-01-01', '2023-01-01');
+        INSERT INTO responsibilities (experience_id, description) VALUES (1, 'Design the API'), (1, 'On call');
+        INSERT INTO company_experiences (company_id, experience_id) VALUES (1, 1);
+        INSERT INTO technology_experiences (technology_id, experience_id) VALUES (1, 1), (2, 2);
+        INSERT INTO projects (id, name, description, github_uri) VALUES (1, 'Portfolio', 'This API', 'https://github.com/p');
+        INSERT INTO project_tasks (name, description, project_id) VALUES ('Cache', 'Snapshot', 1);
+        INSERT INTO technology_projects (technology_id, project_id) VALUES (2, 1);
+    """)
+    # Seeded behind the API's back, rebuild as a write through the API would
+    assert main.app.state.portfolio_snapshot.refresh()
+
+
+def test_portfolio_is_nested(client, database):
+    seed(database)
+    data = client.get("/portfolio/").json()["data"]
+
+    assert [experience["title"] for experience in data["experiences"]] == ["Lead", "Backend"]
+    backend = data["experiences"][1]
+    assert [item["description"] for item in backend["responsibilities"]] == ["Design the API", "On call"]
+    assert [company["name"] for company in backend["companies"]] == ["Acme"]
+    assert [technology["abbr"] for technology in backend["technologies"]] == ["PY"]
+
+    project = data["projects"][0]
+    assert [task["name"] for task in project["tasks"]] == ["Cache"]
+    assert [technology["abbr"] for technology in project["technologies"]] == ["RS"]
+
+
+def test_unchanged_portfolio_answers_not_modified(client, database):
+    seed(database)
+    etag = client.get("/portfolio/").headers["etag"]
+    assert client.get("/portfolio/", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_write_through_the_api_rebuilds_the_portfolio(client, database):
+    seed(database)
+    etag = client.get("/portfolio/").headers["etag"]
+    assert client.put("/technologies/2", json={"name": "Rust", "abbr": "RUST"}).status_code == 200
+
+    deadline = time.monotonic() + 5
+    response = client.get("/portfolio/")
+    while response.headers["etag"] == etag and time.monotonic() < deadline:
+        time.sleep(0.05)
+        response = client.get("/portfolio/")
+    assert response.json()["data"]["projects"][0]["technologies"][0]["abbr"] == "RUST"
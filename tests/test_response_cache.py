@@ -0,0 +1,63 @@
+"""
+Response cache behind the CORS middleware: cached entries must not carry (or lose) the CORS headers of one origin
+"""
+
+import main
+from middleware.response_cache import ResponseCacheMiddleware
+from starlette.middleware.cors import CORSMiddleware
+
+
+def seed(database):
+    database.executemany("INSERT INTO companies (name, logo_path) VALUES (?, ?)", [("Acme", "/acme.png"), ("Globex", "/globex.png")])
+
+
+def test_cors_wraps_the_response_cache():
+    classes = [middleware.cls for middleware in main.app.user_middleware]
+    # user_middleware is outermost first
+    assert classes[0] is CORSMiddleware
+    assert classes.index(CORSMiddleware) < classes.index(ResponseCacheMiddleware)
+
+
+def test_hit_primed_without_origin_gets_cors_headers(client, database):
+    seed(database)
+    first = client.get("/companies/")
+    assert first.status_code == 200
+    assert first.headers["x-cache"] == "MISS"
+    assert "access-control-allow-origin" not in first.headers
+
+    second = client.get("/companies/", headers={"Origin": "https://site.example"})
+    assert second.headers["x-cache"] == "HIT"
+    assert second.headers["access-control-allow-origin"] == "*"
+
+
+def test_echoed_origin_is_not_replayed_to_another_origin(client, database):
+    seed(database)
+    # With credentials (a cookie) CORSMiddleware echoes the request origin instead of "*"
+    site = client.get("/companies/", headers={"Origin": "https://site.example", "Cookie": "session=1"})
+    assert site.headers["access-control-allow-origin"] == "https://site.example"
+
+    evil = client.get("/companies/", headers={"Origin": "https://evil.example", "Cookie": "session=1"})
+    assert evil.headers["x-cache"] == "HIT"
+    assert evil.headers["access-control-allow-origin"] == "https://evil.example"
+
+
+def test_write_drops_cached_list(client, database):
+    seed(database)
+    assert len(client.get("/companies/").json()["data"]) == 2
+    assert client.get("/companies/").headers["x-cache"] == "HIT"
+
+    created = client.post("/companies/", json={"name": "Initech", "logo_path": "/initech.png"})
+    assert created.status_code in (200, 201)
+
+    after = client.get("/companies/")
+    assert after.headers["x-cache"] == "MISS"
+    assert len(after.json()["data"]) == 3
+
+
+def test_preflight_is_answered_before_auth(client):
+    response = client.options(
+        "/companies/",
+        headers={"Origin": "https://site.example", "Access-Control-Request-Method": "GET", "Authorization": ""},
+    )
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == "https://site.example"
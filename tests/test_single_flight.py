@@ -0,0 +1,68 @@
+"""
+Single-flight: identical concurrent reads share one call, writes keep later readers off calls that predate them
+"""
+
+import asyncio
+
+from database.single_flight import SingleFlight, freeze
+
+
+def test_freeze_makes_arguments_hashable():
+    assert hash(freeze({"b": [1, 2], "a": {"x": 1}})) == hash(freeze({"a": {"x": 1}, "b": [1, 2]}))
+
+
+def test_concurrent_callers_share_one_call():
+    async def main():
+        flight = SingleFlight()
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"rows": [1, 2]}
+
+        results = await asyncio.gather(*(flight.do("key", {"companies"}, call) for _ in range(5)))
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert flight.stats()["coalesced"] == 4
+        assert flight.stats()["in_flight"] == 0
+
+    asyncio.run(main())
+
+
+def test_write_starts_a_fresh_call():
+    async def main():
+        flight = SingleFlight()
+        calls = []
+
+        async def call():
+            calls.append(1)
+            number = len(calls)
+            await asyncio.sleep(0.05)
+            return number
+
+        first = asyncio.ensure_future(flight.do("key", {"companies"}, call))
+        await asyncio.sleep(0)
+        flight.invalidate({"companies"})
+        second = await flight.do("key", {"companies"}, call)
+        assert await first == 1
+        assert second == 2
+
+    asyncio.run(main())
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    async def main():
+        flight = SingleFlight()
+
+        async def call():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        leader = asyncio.ensure_future(flight.do("key", {"companies"}, call))
+        follower = asyncio.ensure_future(flight.do("key", {"companies"}, call))
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert await follower == "done"
+
+    asyncio.run(main())
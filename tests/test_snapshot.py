@@ -0,0 +1,69 @@
+"""
+Shared portfolio snapshot: settings that cannot work are refused and a surviving worker takes the writer role over
+"""
+
+import gzip
+import os
+import time
+
+import pytest
+from pydantic import ValidationError
+
+from database.settings import DatabaseSettings
+from database.snapshot import PortfolioSnapshot, SharedSnapshotStore, compressed_variant, encode_snapshot
+
+
+def build():
+    return {"success": True, "data": {"companies": [{"id": 1, "name": "Acme"}]}}
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_shared_snapshot_needs_a_shared_bus(tmp_path):
+    with pytest.raises(ValidationError):
+        DatabaseSettings(db_snapshot_path=str(tmp_path / "snapshot.bin"), db_invalidation_backend="process")
+    DatabaseSettings(db_snapshot_path=str(tmp_path / "snapshot.bin"), db_invalidation_backend="shm")
+
+
+def test_reader_takes_over_when_the_writer_exits(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    writer = PortfolioSnapshot(build, store=SharedSnapshotStore(path))
+    reader = PortfolioSnapshot(build, store=SharedSnapshotStore(path), takeover_interval=0.02)
+    try:
+        assert writer.refresh()
+        assert not reader.refresh()
+        assert reader.current.etag == writer.current.etag
+
+        reader.start()
+        time.sleep(0.1)
+        assert not reader.store.writer
+
+        writer.close()
+        assert wait_for(lambda: reader.store.writer and reader.stats()["builds"] == 1)
+    finally:
+        reader.close()
+
+
+def test_small_or_incompressible_bodies_get_no_gzip_variant():
+    small = encode_snapshot({"success": True, "data": {"companies": []}})
+    assert small.gzip is None
+
+    large = encode_snapshot({"success": True, "data": {"companies": [{"id": i, "name": "Acme"} for i in range(100)]}})
+    assert large.gzip is not None and len(large.gzip) < len(large.body)
+
+    incompressible = os.urandom(2048)
+    assert compressed_variant(incompressible, lambda data: gzip.compress(data), minimum_size=0) is None
+
+
+def test_portfolio_is_sent_uncompressed_when_gzip_would_not_help(client):
+    response = client.get("/portfolio/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.json()["success"]
@@ -0,0 +1,44 @@
+"""
+sort= with keyset pagination: paging through next_cursor returns every row once, in the order of the sort
+"""
+
+
+def seed_experiences(database):
+    database.executemany(
+        "INSERT INTO professional_experiences (title, description, start_date, end_date, is_current) VALUES (?, ?, ?, ?, ?)",
+        [
+            ("Backend", "APIs", "2019-01-01", "2020-06-30", 0),
+            ("Lead", "Team", "2023-02-01", None, 1),
+            ("Intern", "Tests", "2018-05-01", "2018-12-31", 0),
+            ("Consultant", "Audits", "2022-01-01", None, 1),
+            ("Platform", "Infra", "2020-07-01", "2021-12-31", 0),
+        ],
+    )
+
+
+def page_through(client, path, sort, limit=2):
+    ids = []
+    response = client.get(path, params={"sort": sort, "after": 0, "limit": limit})
+    while True:
+        assert response.status_code == 200, response.text
+        body = response.json()
+        ids.extend(row["id"] for row in body["data"])
+        if not body.get("next_cursor"):
+            return ids
+        response = client.get(path, params={"cursor": body["next_cursor"], "limit": limit})
+
+
+def test_keyset_pages_through_null_end_dates(client, database):
+    seed_experiences(database)
+    # NULL sorts first ascending and last descending, as in MySQL; id breaks the tie between them
+    assert page_through(client, "/experiences/", "end_date") == [2, 4, 3, 1, 5]
+    assert page_through(client, "/experiences/", "-end_date") == [5, 1, 3, 4, 2]
+    assert page_through(client, "/experiences/", "-end_date", limit=1) == [5, 1, 3, 4, 2]
+
+
+def test_null_cursor_value_is_rejected_for_a_not_null_field(client, database):
+    from database.utils.pagination import encode_cursor
+
+    seed_experiences(database)
+    cursor = encode_cursor([None, 2], "title")
+    assert client.get("/experiences/", params={"cursor": cursor}).status_code == 400
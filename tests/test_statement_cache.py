@@ -0,0 +1,34 @@
+"""
+Statement cache: requests of the same shape reuse one SQL template and only bind different params
+"""
+
+from database.statement_cache import pad_in_params, statement_cache
+
+
+def seed(database):
+    database.executemany("INSERT INTO companies (name, logo_path) VALUES (?, ?)", [("Acme", "/a.png"), ("Globex", "/g.png"), ("Initech", "/i.png")])
+
+
+def test_same_shape_reuses_the_template_with_new_params(client, database):
+    seed(database)
+    assert [row["name"] for row in client.get("/companies/", params={"name": "Acme", "name_match": "exact"}).json()["data"]] == ["Acme"]
+    before = statement_cache.stats()
+
+    response = client.get("/companies/", params={"name": "Globex", "name_match": "exact"})
+    assert [row["name"] for row in response.json()["data"]] == ["Globex"]
+    after = statement_cache.stats()
+    assert after["misses"] == before["misses"]
+    assert after["hits"] > before["hits"]
+
+
+def test_padded_id_lists_return_each_row_once(client, database):
+    seed(database)
+    assert pad_in_params([1, 2, 3]) == (4, [1, 2, 3, 3])
+    body = client.get("/companies/", params={"ids": "1,3,3"}).json()
+    assert sorted(body["data"]) == ["1", "3"]
+
+
+def test_metrics_report_the_cache(client, database):
+    seed(database)
+    client.get("/companies/")
+    assert client.get("/metrics").json()["statement_cache"]["entries"] > 0
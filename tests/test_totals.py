@@ -0,0 +1,44 @@
+"""
+List totals: optional, cached per (table, filter) and dropped when the table is written
+"""
+
+import main
+
+
+def seed(database):
+    database.executemany("INSERT INTO companies (name, logo_path) VALUES (?, ?)", [(f"Company {i}", f"/{i}.png") for i in range(5)])
+
+
+def count_cache():
+    return main.app.state.db_service.service.count_cache
+
+
+def test_total_can_be_skipped(client, database):
+    seed(database)
+    body = client.get("/companies/", params={"include_total": "false", "limit": 2}).json()
+    assert len(body["data"]) == 2
+    assert body.get("total") is None
+
+
+def test_total_is_counted_once_per_filter(client, database):
+    seed(database)
+    assert client.get("/companies/", params={"limit": 2}).json()["total"] == 5
+    hits = count_cache().stats()["hits"]
+    # Another page of the same list reuses the cached total
+    assert client.get("/companies/", params={"limit": 2, "skip": 2}).json()["total"] == 5
+    assert count_cache().stats()["hits"] == hits + 1
+    # A different filter is counted on its own
+    assert client.get("/companies/", params={"name": "Company 1"}).json()["total"] == 1
+
+
+def test_write_drops_the_cached_total(client, database):
+    seed(database)
+    assert client.get("/companies/", params={"limit": 2}).json()["total"] == 5
+    assert client.delete("/companies/1").status_code == 200
+    assert client.get("/companies/", params={"limit": 2, "skip": 2}).json()["total"] == 4
+
+
+def test_estimate_falls_back_to_a_count_without_statistics(client, database):
+    seed(database)
+    body = client.get("/companies/", params={"total_mode": "estimate"}).json()
+    assert body["total"] == 5